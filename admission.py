@@ -0,0 +1,201 @@
+"""Control de admisión: límites de concurrencia por prefijo y límite de peticiones por cliente.
+
+Cada prefijo configurado (/auth, /ejercicios, /progreso) tiene un número máximo de
+peticiones en curso y una cola de espera acotada. Si la cola está llena, o la espera
+supera queue_timeout, se responde 503 con Retry-After en lugar de dejar que las
+peticiones se acumulen hasta agotar los timeouts. Además, cada cliente tiene un token
+bucket por prefijo; al vaciarse se responde 429 con el tiempo hasta el siguiente token.
+"""
+import asyncio
+import ipaddress
+import math
+import time
+from collections import OrderedDict, deque
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+
+
+class ConcurrencyLimit:
+    """Máximo de peticiones simultáneas con una cola FIFO acotada"""
+
+    def __init__(self, limit: int, queue_size: int):
+        self.limit = limit
+        self.queue_size = queue_size
+        self.active = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self._waiters = deque()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self, timeout: float) -> bool:
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return True
+        if len(self._waiters) >= self.queue_size:
+            self.rejected += 1
+            return False
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout)
+            return True
+        except asyncio.TimeoutError:
+            if waiter.done():
+                # El hueco llegó justo al vencer el plazo: devolverlo
+                self.release()
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+            self.timeouts += 1
+            return False
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+
+    def release(self):
+        # El hueco pasa directamente al primero de la cola, sin bajar active
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def stats(self) -> dict:
+        return {
+            "limite": self.limit, "en_curso": self.active, "en_cola": self.waiting,
+            "cola_maxima": self.queue_size, "rechazadas": self.rejected, "expiradas": self.timeouts,
+        }
+
+
+class MemoryBucketStore:
+    """Token buckets en la memoria del proceso, con un máximo de clientes (LRU).
+
+    Cualquier objeto con un método async take(key, rate, burst) puede sustituirlo,
+    por ejemplo para compartir los límites entre procesos.
+    """
+
+    def __init__(self, maxsize: int = 100000):
+        self.maxsize = maxsize
+        self._buckets = OrderedDict()
+
+    async def take(self, key, rate: float, burst: int) -> float:
+        """Consumir un token; devuelve 0 si se admite o los segundos hasta el siguiente token"""
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated) * rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / rate
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.maxsize:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+def _match(path: str, table: dict):
+    """Entrada del prefijo más largo que contiene la ruta"""
+    best = None
+    for prefix in table:
+        if (path == prefix or path.startswith(prefix.rstrip("/") + "/")) and (best is None or len(prefix) > len(best)):
+            best = prefix
+    return best
+
+
+class AdmissionControl:
+    """Límites de admisión compartidos por el middleware y por /estado/admision.
+
+    concurrency: {prefijo: (peticiones_simultáneas, tamaño_de_cola)}
+    rate_limits: {prefijo: (peticiones_por_segundo, ráfaga)}
+    """
+
+    def __init__(self, concurrency=None, rate_limits=None, queue_timeout: float = 5,
+                 retry_after: int = 1, store=None, trusted_proxies=()):
+        self.limits = {prefix: ConcurrencyLimit(*values) for prefix, values in (concurrency or {}).items()}
+        self.rate_limits = dict(rate_limits or {})
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.store = store or MemoryBucketStore()
+        self.trusted_proxies = [ipaddress.ip_network(proxy, strict=False) for proxy in trusted_proxies]
+        self.rate_limited = 0
+
+    def _trusted(self, address: str) -> bool:
+        try:
+            ip = ipaddress.ip_address(address)
+        except ValueError:
+            return False
+        return any(ip in network for network in self.trusted_proxies)
+
+    def client_key(self, scope) -> str:
+        """IP del cliente: la de la conexión o, si esta es un proxy de confianza, la de X-Forwarded-For.
+
+        Solo se cree el salto más a la derecha que no sea un proxy de confianza: los de su
+        izquierda los escribe el propio cliente y podría cambiarlos en cada petición.
+        """
+        client = scope.get("client")
+        address = client[0] if client else "desconocido"
+        if not self._trusted(address):
+            return address
+        forwarded = Headers(scope=scope).get("x-forwarded-for")
+        hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()] if forwarded else []
+        while hops:
+            address = hops.pop()
+            if not self._trusted(address):
+                break
+        return address
+
+    def stats(self) -> dict:
+        return {
+            "concurrencia": {prefix: limit.stats() for prefix, limit in self.limits.items()},
+            "limitadas_por_cliente": self.rate_limited,
+        }
+
+
+class AdmissionMiddleware:
+    """Middleware ASGI que aplica un AdmissionControl antes de llegar a los routers"""
+
+    def __init__(self, app, control: AdmissionControl):
+        self.app = app
+        self.control = control
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+        control = self.control
+        path = scope["path"]
+
+        prefix = _match(path, control.rate_limits)
+        if prefix is not None:
+            rate, burst = control.rate_limits[prefix]
+            wait = await control.store.take((prefix, control.client_key(scope)), rate, burst)
+            if wait > 0:
+                control.rate_limited += 1
+                await _reject(429, "Demasiadas peticiones, inténtalo más tarde", math.ceil(wait), scope, receive, send)
+                return
+
+        prefix = _match(path, control.limits)
+        if prefix is None:
+            await self.app(scope, receive, send)
+            return
+        limit = control.limits[prefix]
+        if not await limit.acquire(control.queue_timeout):
+            await _reject(503, "Servicio saturado, inténtalo más tarde", control.retry_after, scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limit.release()
+
+
+async def _reject(status_code: int, detail: str, retry_after: int, scope, receive, send):
+    response = JSONResponse({"detail": detail}, status_code=status_code, headers={"Retry-After": str(retry_after)})
+    await response(scope, receive, send)
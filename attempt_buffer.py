@@ -0,0 +1,160 @@
+import logging
+import queue
+import threading
+import time
+from sqlalchemy import insert
+from database import SessionLocal
+from models import ExerciseAttempt
+from code_store import with_code_hash
+from attempt_rollup import record_attempts
+from config import (
+    ATTEMPT_BUFFER_BATCH_SIZE, ATTEMPT_BUFFER_FLUSH_MS, ATTEMPT_BUFFER_MAX_PENDING,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AttemptBufferFull(Exception):
+    """La cola de intentos pendientes de escribir está llena"""
+
+
+class AttemptBuffer:
+    """Cola acotada de intentos que un hilo escribe en INSERT multi-fila (write-behind).
+
+    Un lote se escribe al reunir batch_size filas o al pasar flush_interval segundos
+    desde la primera. Si la cola tiene max_pending filas, submit() falla de inmediato
+    para que el cliente reintente (backpressure) en lugar de crecer sin límite.
+    """
+
+    # Reintentos del lote completo antes de escribir fila a fila
+    WRITE_RETRIES = 3
+
+    def __init__(self, batch_size: int, flush_interval: float, max_pending: int, session_factory=SessionLocal):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._session_factory = session_factory
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._stopping = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.written = 0
+        self.batches = 0
+        self.rejected = 0
+        self.dropped = 0
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="attempt-buffer", daemon=True)
+                    self._thread.start()
+
+    def submit(self, row: dict):
+        """Encolar un intento (columnas de exercise_attempts); no bloquea"""
+        if self._stopping.is_set():
+            raise AttemptBufferFull()
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            raise AttemptBufferFull()
+
+    def _collect(self) -> list:
+        """Esperar la primera fila y reunir hasta batch_size o hasta que venza el intervalo"""
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            # Vencido el intervalo solo se recoge lo que ya está en la cola
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch:
+                self._write(batch)
+            elif self._stopping.is_set():
+                return
+
+    def _write(self, batch: list):
+        statement = insert(ExerciseAttempt.__table__)
+        db = self._session_factory()
+        try:
+            for attempt in range(1, self.WRITE_RETRIES + 1):
+                try:
+                    db.execute(statement, with_code_hash(db, batch))
+                    record_attempts(db, batch)
+                    db.commit()
+                    self._record(written=len(batch))
+                    return
+                except Exception:
+                    db.rollback()
+                    logger.warning("Fallo al escribir un lote de %s intentos (intento %s)", len(batch), attempt, exc_info=True)
+                    time.sleep(0.2 * attempt)
+            # Una fila inválida (p. ej. usuario borrado) no debe hacer perder el lote entero
+            for row in batch:
+                try:
+                    db.execute(statement, with_code_hash(db, [row]))
+                    record_attempts(db, [row])
+                    db.commit()
+                    self._record(written=1)
+                except Exception:
+                    db.rollback()
+                    self._record(dropped=1)
+                    logger.exception("Intento descartado: %s", {k: v for k, v in row.items() if k != "code_submitted"})
+        finally:
+            db.close()
+
+    def _record(self, written: int = 0, dropped: int = 0):
+        with self._lock:
+            self.written += written
+            self.dropped += dropped
+            self.batches += bool(written)
+
+    def flush(self):
+        """Escribir en este hilo todo lo pendiente (útil en scripts y pruebas)"""
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+            if len(batch) >= self.batch_size:
+                self._write(batch)
+                batch = []
+        if batch:
+            self._write(batch)
+
+    def shutdown(self):
+        """Dejar de aceptar intentos y esperar a que se escriban todos los pendientes"""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+        # Vacía, vuelve a aceptar intentos (p. ej. si la aplicación se arranca de nuevo en el mismo proceso)
+        self._stopping.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "pendientes": self._queue.qsize(),
+                "capacidad": self.max_pending,
+                "escritos": self.written,
+                "lotes": self.batches,
+                "rechazados": self.rejected,
+                "descartados": self.dropped,
+            }
+
+
+attempt_buffer = AttemptBuffer(ATTEMPT_BUFFER_BATCH_SIZE, ATTEMPT_BUFFER_FLUSH_MS / 1000, ATTEMPT_BUFFER_MAX_PENDING)
@@ -0,0 +1,113 @@
+from sqlalchemy import case, delete, func, insert, select, union_all, update
+from sqlalchemy.orm import Session
+from compaction import archive_tables
+from models import AttemptSummary, ExerciseAttempt
+from upsert import upsert
+
+_summaries = AttemptSummary.__table__
+
+
+def _all_attempts(db: Session, user_id: int = None, lesson_id: int = None):
+    """Intentos de exercise_attempts y de las tablas de archivo, como subconsulta.
+
+    Archivar mueve intentos fuera de la tabla caliente sin tocar el resumen: el primer
+    intento (o el primero correcto, o el anterior al último) puede estar ya en el archivo.
+    """
+    selects = []
+    for table in [ExerciseAttempt.__table__, *archive_tables(db.get_bind())]:
+        query = select(table.c.id, table.c.user_id, table.c.lesson_id, table.c.is_correct, table.c.attempt_date)
+        if user_id is not None:
+            query = query.where(table.c.user_id == user_id, table.c.lesson_id == lesson_id)
+        selects.append(query)
+    return (union_all(*selects) if len(selects) > 1 else selects[0]).subquery()
+
+
+def _later(column, proposed):
+    """Valor propuesto si es más reciente que el actual (o no hay actual)"""
+    current, new = _summaries.c.last_attempt_date, proposed.last_attempt_date
+    return case((current.is_(None) | (new >= current), proposed[column.key]), else_=column)
+
+
+def record_attempts(db: Session, rows: list):
+    """Sumar intentos al resumen de cada (usuario, lección), en la transacción de db.
+
+    rows son filas de exercise_attempts con user_id, lesson_id, is_correct y attempt_date.
+    """
+    summaries = {}
+    for row in sorted(rows, key=lambda r: r["attempt_date"]):
+        key = (row["user_id"], row["lesson_id"])
+        summary = summaries.setdefault(key, {
+            "user_id": row["user_id"], "lesson_id": row["lesson_id"], "attempts": 0, "correct_attempts": 0,
+            "first_attempt_date": row["attempt_date"], "first_correct_date": None,
+        })
+        summary["attempts"] += 1
+        if row["is_correct"]:
+            summary["correct_attempts"] += 1
+            summary["first_correct_date"] = summary["first_correct_date"] or row["attempt_date"]
+        summary["last_attempt_date"] = row["attempt_date"]
+        summary["last_is_correct"] = row["is_correct"]
+    if not summaries:
+        return
+    c = _summaries.c
+    upsert(db, _summaries, list(summaries.values()), ["user_id", "lesson_id"], lambda proposed: {
+        "attempts": c.attempts + proposed.attempts,
+        "correct_attempts": c.correct_attempts + proposed.correct_attempts,
+        "first_attempt_date": func.coalesce(c.first_attempt_date, proposed.first_attempt_date),
+        "first_correct_date": func.coalesce(c.first_correct_date, proposed.first_correct_date),
+        # MySQL evalúa las asignaciones en orden y ve last_attempt_date ya actualizado; con >= el
+        # resultado es el mismo que con los valores anteriores (SQLite)
+        "last_is_correct": _later(c.last_is_correct, proposed),
+        "last_attempt_date": _later(c.last_attempt_date, proposed),
+    })
+
+
+def forget_attempt(db: Session, attempt):
+    """Descontar un intento borrado del resumen de su (usuario, lección), en la transacción de db"""
+    summary = db.get(AttemptSummary, (attempt.user_id, attempt.lesson_id), with_for_update=True)
+    if summary is None:
+        return
+    summary.attempts -= 1
+    summary.correct_attempts -= int(bool(attempt.is_correct))
+    if summary.attempts <= 0:
+        db.delete(summary)
+        return
+    if attempt.attempt_date not in (summary.last_attempt_date, summary.first_attempt_date, summary.first_correct_date):
+        return
+    attempts = _all_attempts(db, attempt.user_id, attempt.lesson_id)
+    remaining = select(attempts).where(attempts.c.id != attempt.id)
+    # Los datos del último intento se toman del intento anterior, esté en la tabla o en el archivo
+    if attempt.attempt_date == summary.last_attempt_date:
+        previous = db.execute(remaining.with_only_columns(attempts.c.attempt_date, attempts.c.is_correct).order_by(
+            attempts.c.attempt_date.desc(), attempts.c.id.desc()
+        ).limit(1)).first()
+        if previous is not None:
+            summary.last_attempt_date, summary.last_is_correct = previous
+    # Si el intento borrado era el primero (o el primer correcto), se busca el siguiente
+    if attempt.attempt_date == summary.first_attempt_date:
+        summary.first_attempt_date = db.scalar(remaining.with_only_columns(func.min(attempts.c.attempt_date)))
+    if summary.correct_attempts <= 0:
+        summary.first_correct_date = None
+    elif attempt.is_correct and attempt.attempt_date == summary.first_correct_date:
+        summary.first_correct_date = db.scalar(remaining.where(attempts.c.is_correct == True).with_only_columns(  # noqa: E712
+            func.min(attempts.c.attempt_date)
+        ))
+
+
+def rebuild_summaries(db: Session):
+    """Recalcular attempt_summaries desde exercise_attempts y sus tablas de archivo, en la transacción de db"""
+    attempts = _all_attempts(db)
+    correct = attempts.c.is_correct == True  # noqa: E712
+    por_leccion = select(
+        attempts.c.user_id, attempts.c.lesson_id, func.count(attempts.c.id),
+        func.sum(case((correct, 1), else_=0)), func.min(attempts.c.attempt_date),
+        func.min(case((correct, attempts.c.attempt_date))), func.max(attempts.c.attempt_date),
+    ).group_by(attempts.c.user_id, attempts.c.lesson_id)
+    db.execute(delete(_summaries))
+    db.execute(insert(_summaries).from_select([
+        "user_id", "lesson_id", "attempts", "correct_attempts",
+        "first_attempt_date", "first_correct_date", "last_attempt_date",
+    ], por_leccion))
+    ultimo = select(attempts.c.is_correct).where(
+        attempts.c.user_id == _summaries.c.user_id, attempts.c.lesson_id == _summaries.c.lesson_id,
+    ).order_by(attempts.c.attempt_date.desc(), attempts.c.id.desc()).limit(1).scalar_subquery()
+    db.execute(update(_summaries).values(last_is_correct=ultimo))
@@ -1,29 +1,45 @@
+import hashlib
+import time
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, make_transient_to_detached
 from database import get_db
 from models import User
-import os
-from dotenv import load_dotenv
+from cache import TTLCache
+from passlib.hash import bcrypt
+from hashing import hash_password_async, verify_and_update_async, HashingOverloaded, HASH_RETRY_AFTER_SECONDS
+from config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, AUTH_CACHE_SIZE, AUTH_CACHE_TTL_SECONDS
 
-load_dotenv()
+token_cache = TTLCache(AUTH_CACHE_SIZE, AUTH_CACHE_TTL_SECONDS)
+user_cache = TTLCache(AUTH_CACHE_SIZE, AUTH_CACHE_TTL_SECONDS)
 
-SECRET_KEY = os.getenv("SECRET_KEY")
-ALGORITHM = os.getenv("ALGORITHM", "HS256")
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+def _hashing_overloaded():
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Servicio de autenticación saturado, inténtelo de nuevo",
+        headers={"Retry-After": str(HASH_RETRY_AFTER_SECONDS)},
+    )
+
+async def verify_password_and_update(plain_password, hashed_password):
+    """Verificar en el pool de hashing; devuelve (valida, nuevo_hash) si hay que regenerar el hash"""
+    try:
+        return await verify_and_update_async(plain_password, hashed_password)
+    except HashingOverloaded:
+        raise _hashing_overloaded()
+
+async def verify_password(plain_password, hashed_password):
+    return (await verify_password_and_update(plain_password, hashed_password))[0]
 
-def get_password_hash(password):
-    return pwd_context.hash(password)
+async def get_password_hash(password):
+    try:
+        return await hash_password_async(password)
+    except HashingOverloaded:
+        raise _hashing_overloaded()
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -35,26 +51,90 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    credentials_exception = HTTPException(
+def _password_salt(hashed: Optional[str]) -> str:
+    try:
+        return bcrypt.from_string(hashed).salt
+    except (TypeError, ValueError):
+        return hashed or ""
+
+def user_token_version(user: User) -> str:
+    """Versión de credenciales del usuario; cambia si cambian el email o la contraseña.
+
+    Se deriva de la sal del hash y no del hash completo: regenerarlo con otro coste al
+    iniciar sesión conserva la sal y no cierra las demás sesiones del usuario.
+    """
+    material = f"{user.email}:{_password_salt(user.password)}".encode()
+    return hashlib.sha256(material).hexdigest()[:12]
+
+def create_user_access_token(user: User, expires_delta: Optional[timedelta] = None):
+    """Token con el id de usuario (uid) y la versión de credenciales (ver)"""
+    return create_access_token(
+        data={"sub": user.email, "uid": user.id, "ver": user_token_version(user)},
+        expires_delta=expires_delta,
+    )
+
+def _credentials_exception():
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def decode_token(token: str) -> dict:
+    """Decodificar y validar un JWT, reutilizando el resultado mientras el token siga vigente"""
+    payload = token_cache.get(token)
+    if payload is not None and payload["exp"] > time.time():
+        return payload
     try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     except JWTError:
-        raise credentials_exception
-    return email
+        raise _credentials_exception()
+    if payload.get("sub") is None:
+        raise _credentials_exception()
+    ttl = min(AUTH_CACHE_TTL_SECONDS, payload["exp"] - time.time())
+    token_cache.set(token, payload, ttl=ttl)
+    return payload
+
+def get_token_claims(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    return decode_token(credentials.credentials)
 
-def get_current_user(db: Session = Depends(get_db), email: str = Depends(verify_token)):
-    user = db.query(User).filter(User.email == email).first()
+def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    return decode_token(credentials.credentials)["sub"]
+
+def _detached_copy(user: User) -> User:
+    """Copia desvinculada de la sesión, para no compartir la misma instancia entre peticiones"""
+    copy = User(**{column.key: getattr(user, column.key) for column in User.__table__.columns})
+    make_transient_to_detached(copy)
+    return copy
+
+def invalidate_user(user_id: int):
+    """Eliminar un usuario de la caché de autenticación (tras actualizarlo o borrarlo)"""
+    user_cache.delete(user_id)
+
+def get_current_user(db: Session = Depends(get_db), claims: dict = Depends(get_token_claims)):
+    user_id = claims.get("uid")
+    # Tokens antiguos sin uid: búsqueda por email
+    if user_id is None:
+        user = db.query(User).filter(User.email == claims["sub"]).first()
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found"
+            )
+        return user
+    
+    user = user_cache.get(user_id)
     if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found"
-        )
+        user = db.query(User).filter(User.id == user_id).first()
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found"
+            )
+        user_cache.set(user_id, _detached_copy(user))
+    else:
+        user = _detached_copy(user)
+    
+    if claims.get("ver") != user_token_version(user) or claims["sub"] != user.email:
+        raise _credentials_exception()
     return user
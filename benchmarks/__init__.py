@@ -0,0 +1,10 @@
+"""Benchmarks reproducibles de la API.
+
+1. Generar un dataset sintético en la base de DATABASE_URL (esquema ya creado):
+       python scripts/init_db.py --create-all
+       python -m benchmarks.generate --preset small
+2. Reproducir un escenario de tráfico contra la API (o arrancarla con --start-server):
+       python -m benchmarks.run --scenario mixto --duration 30 --start-server
+3. Comparar dos informes (por ejemplo, de dos commits):
+       python -m benchmarks.compare benchmarks/results/abc123-mixto.json benchmarks/results/def456-mixto.json
+"""
@@ -0,0 +1,62 @@
+"""Comparar dos informes de benchmarks.run (por ejemplo, antes y después de un commit).
+
+Muestra, por ruta y en total, el throughput y las latencias p50/p95/p99 de ambos
+informes con la variación en porcentaje. Una ruta empeora si su p95 sube más de
+--threshold por ciento; con --fail-on-regression el script termina con código 1.
+
+Uso:
+    python -m benchmarks.compare benchmarks/results/abc123-mixto.json benchmarks/results/def456-mixto.json
+"""
+import argparse
+import json
+import sys
+
+METRICS = ("rps", "p50_ms", "p95_ms", "p99_ms")
+
+
+def _change(old: float, new: float) -> float:
+    return (new - old) / old * 100 if old else 0.0
+
+
+def compare(old: dict, new: dict, threshold: float):
+    """Filas (ruta, {métrica: (antes, después, %)}, empeora) de las rutas presentes en ambos informes"""
+    rows = []
+    routes = [r for r in old["rutas"] if r in new["rutas"]]
+    for label, before, after in [(r, old["rutas"][r], new["rutas"][r]) for r in routes] + [
+        ("TOTAL", old["total"], new["total"])
+    ]:
+        changes = {m: (before[m], after[m], _change(before[m], after[m])) for m in METRICS}
+        rows.append((label, changes, changes["p95_ms"][2] > threshold))
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=10, help="subida del p95 (%%) considerada regresión")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    with open(args.old, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)
+    if old.get("escenario") != new.get("escenario") or old.get("dataset") != new.get("dataset"):
+        print("Aviso: los informes usan escenarios o datasets distintos", file=sys.stderr)
+
+    print(f"{old['commit']} -> {new['commit']} ({new['escenario']})")
+    print(f"{'ruta':<60} " + " ".join(f"{m:>24}" for m in METRICS))
+    regressions = 0
+    for label, changes, regressed in compare(old, new, args.threshold):
+        cells = " ".join(f"{f'{a} -> {b} ({pct:+.1f}%)':>24}" for a, b, pct in changes.values())
+        print(f"{label:<60} {cells}{'  EMPEORA' if regressed else ''}")
+        regressions += regressed
+    only = sorted(set(old["rutas"]) ^ set(new["rutas"]))
+    if only:
+        print("Rutas presentes en un solo informe: " + ", ".join(only))
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,259 @@
+"""Sembrar la base de DATABASE_URL con un dataset sintético de escala configurable.
+
+Los identificadores son deterministas (cursos c0.., módulos c0m0.., lecciones y usuarios
+desde 1) y los datos aleatorios salen de --seed, así que dos ejecuciones con los mismos
+parámetros producen la misma base. Los intentos se generan en orden cronológico y los
+resúmenes (attempt_summaries, contadores de progreso) se recalculan al final con las
+mismas funciones que los scripts de mantenimiento. Al terminar escribe el manifiesto que lee benchmarks.run.
+
+Uso:
+    python -m benchmarks.generate --preset small
+    python -m benchmarks.generate --preset large --reset
+    python -m benchmarks.generate --users 50000 --attempts 1000000
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+import zlib
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from sqlalchemy import func, insert, select  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from database import Base, engine  # noqa: E402
+from models import Course, Module, Lesson, User, UserProgress, CodeBlob, ExerciseAttempt  # noqa: E402
+from code_store import code_hash, COMPRESSION_LEVEL  # noqa: E402
+from attempt_rollup import rebuild_summaries  # noqa: E402
+from progress_aggregates import rebuild_aggregates  # noqa: E402
+from hashing import hash_password, hashing_pool  # noqa: E402
+
+DEFAULT_MANIFEST = os.path.join(ROOT, "benchmarks", "dataset.json")
+PASSWORD = "bench-password"
+# Variantes incorrectas de la solución de cada lección
+WRONG_VARIANTS = 3
+
+PRESETS = {
+    "small": {"courses": 10, "modules": 5, "lessons": 500, "users": 10_000, "attempts": 100_000, "progress": 3},
+    "medium": {"courses": 50, "modules": 8, "lessons": 4_000, "users": 100_000, "attempts": 2_000_000, "progress": 4},
+    "large": {"courses": 100, "modules": 10, "lessons": 10_000, "users": 1_000_000, "attempts": 50_000_000, "progress": 5},
+}
+
+_WORDS = (
+    "variable función bucle lista diccionario clase objeto método módulo paquete excepción "
+    "iterador generador cadena entero decimal condición índice rango tupla conjunto archivo"
+).split()
+
+
+def course_id(c: int) -> str:
+    return f"c{c}"
+
+
+def module_id(c: int, m: int) -> str:
+    return f"c{c}m{m}"
+
+
+def lesson_module(lesson_id: int, manifest: dict) -> str:
+    """Módulo de una lección: las lecciones se reparten en bloques consecutivos por módulo"""
+    index = (lesson_id - 1) // manifest["lessons_per_module"]
+    return module_id(index // manifest["modules"], index % manifest["modules"])
+
+
+def user_email(user_id: int) -> str:
+    # .local y .test son dominios de uso especial que EmailStr rechaza
+    return f"usuario{user_id}@bench.example.com"
+
+
+def solution_code(lesson_id: int) -> str:
+    return f"def solucion(x):\n    return x * {lesson_id} + 1\n"
+
+
+def wrong_code(lesson_id: int, variant: int) -> str:
+    return f"def solucion(x):\n    return x * {lesson_id} - {variant + 1}\n"
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(words))
+
+
+def _insert(db: Session, table, rows: list):
+    if rows:
+        db.execute(insert(table), rows)
+
+
+def _batches(generator, size: int):
+    batch = []
+    for row in generator:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _reset(db: Session):
+    for table in reversed(Base.metadata.sorted_tables):
+        db.execute(table.delete())
+    db.commit()
+
+
+def _catalog(db: Session, rng: random.Random, manifest: dict, now: datetime):
+    courses, modules = manifest["courses"], manifest["modules"]
+    _insert(db, Course.__table__, [{
+        "id": course_id(c), "title": f"Curso {c}", "description": _text(rng, 30),
+        "icon": "🐍", "color_class": "bg-blue-500", "created_at": now, "updated_at": now,
+    } for c in range(courses)])
+    _insert(db, Module.__table__, [{
+        "id": module_id(c, m), "course_id": course_id(c), "title": f"Módulo {m} del curso {c}",
+        "description": _text(rng, 20), "position": m, "created_at": now, "updated_at": now,
+    } for c in range(courses) for m in range(modules)])
+
+    def lessons():
+        for lesson_id in range(1, manifest["lessons"] + 1):
+            yield {
+                "id": lesson_id, "module_id": lesson_module(lesson_id, manifest), "title": f"Lección {lesson_id}",
+                "theory": _text(rng, 300), "practice_instructions": _text(rng, 40),
+                "practice_initial_code": "def solucion(x):\n    pass\n", "practice_solution": solution_code(lesson_id),
+                "position": (lesson_id - 1) % manifest["lessons_per_module"], "created_at": now, "updated_at": now,
+            }
+
+    for batch in _batches(lessons(), 1000):
+        _insert(db, Lesson.__table__, batch)
+
+    def blobs():
+        for lesson_id in range(1, manifest["lessons"] + 1):
+            for code in [solution_code(lesson_id)] + [wrong_code(lesson_id, v) for v in range(WRONG_VARIANTS)]:
+                raw = code.encode("utf-8")
+                yield {"hash": code_hash(code), "data": zlib.compress(raw, COMPRESSION_LEVEL), "size": len(raw)}
+
+    for batch in _batches(blobs(), 5000):
+        _insert(db, CodeBlob.__table__, batch)
+    db.commit()
+
+
+def _users(db: Session, rng: random.Random, manifest: dict, now: datetime, batch_size: int):
+    # Un único hash para todos: bcrypt de un millón de contraseñas llevaría horas
+    hashed = hash_password(PASSWORD)
+    total_modules = manifest["courses"] * manifest["modules"]
+
+    def users():
+        for user_id in range(1, manifest["users"] + 1):
+            yield {
+                "id": user_id, "name": f"Usuario {user_id}", "email": user_email(user_id),
+                "password": hashed, "created_at": now, "updated_at": now,
+            }
+
+    def progress():
+        for user_id in range(1, manifest["users"] + 1):
+            started = min(total_modules, int(rng.expovariate(1 / manifest["progress"])))
+            for index in rng.sample(range(total_modules), started):
+                completed = rng.random() < 0.5
+                yield {
+                    "user_id": user_id, "module_id": module_id(index // manifest["modules"], index % manifest["modules"]),
+                    "completed": completed, "completion_date": now if completed else None,
+                    "created_at": now, "updated_at": now,
+                }
+
+    for batch in _batches(users(), batch_size):
+        _insert(db, User.__table__, batch)
+        db.commit()
+    for batch in _batches(progress(), batch_size):
+        _insert(db, UserProgress.__table__, batch)
+        db.commit()
+    rebuild_aggregates(db)
+    db.commit()
+
+
+def _attempts(db: Session, rng: random.Random, manifest: dict, now: datetime, batch_size: int, days: int):
+    total, users, lessons = manifest["attempts"], manifest["users"], manifest["lessons"]
+    if not total:
+        return
+    start = now - timedelta(days=days)
+    step = timedelta(days=days) / total
+    hashes = {}
+
+    def attempts():
+        for i in range(total):
+            # Pocos usuarios muy activos y las primeras lecciones más visitadas
+            user_id = int(users * rng.random() ** 2) + 1
+            lesson_id = int(lessons * rng.random() ** 1.5) + 1
+            correct = rng.random() < 0.35
+            variant = -1 if correct else rng.randrange(WRONG_VARIANTS)
+            key = (lesson_id, variant)
+            digest = hashes.get(key)
+            if digest is None:
+                code = solution_code(lesson_id) if correct else wrong_code(lesson_id, variant)
+                digest = hashes[key] = code_hash(code)
+            yield {
+                "user_id": user_id, "lesson_id": lesson_id, "code_hash": digest,
+                "is_correct": correct, "attempt_date": start + step * i,
+            }
+
+    started = time.perf_counter()
+    done = 0
+    for batch in _batches(attempts(), batch_size):
+        _insert(db, ExerciseAttempt.__table__, batch)
+        db.commit()
+        done += len(batch)
+        if done % (batch_size * 20) == 0 or done == total:
+            rate = done / (time.perf_counter() - started)
+            print(f"  intentos: {done}/{total} ({rate:,.0f}/s)", flush=True)
+    # Un solo recálculo por conjuntos: mucho más rápido que mantener el resumen lote a lote
+    rebuild_summaries(db)
+    db.commit()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="small")
+    for name in ("courses", "modules", "lessons", "users", "attempts", "progress"):
+        parser.add_argument(f"--{name}", type=int, help=f"sobrescribe el valor de {name} del preset")
+    parser.add_argument("--days", type=int, default=365, help="días que abarcan los intentos")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--reset", action="store_true", help="vaciar todas las tablas antes de generar")
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST)
+    args = parser.parse_args()
+
+    manifest = dict(PRESETS[args.preset])
+    for name in manifest:
+        if getattr(args, name) is not None:
+            manifest[name] = getattr(args, name)
+    manifest["lessons_per_module"] = math.ceil(manifest["lessons"] / (manifest["courses"] * manifest["modules"]))
+    manifest.update({"seed": args.seed, "password": PASSWORD, "preset": args.preset})
+
+    rng = random.Random(args.seed)
+    # Fecha fija para que los datos no dependan del momento de la generación
+    now = datetime(2024, 1, 1)
+    started = time.perf_counter()
+    try:
+        with Session(engine) as db:
+            if args.reset:
+                _reset(db)
+            elif db.scalar(select(func.count()).select_from(Course)):
+                print("La base ya tiene datos; usar --reset para vaciarla", file=sys.stderr)
+                return 1
+            print("Generando catálogo...", flush=True)
+            _catalog(db, rng, manifest, now)
+            print("Generando usuarios y progreso...", flush=True)
+            _users(db, rng, manifest, now, args.batch_size)
+            print("Generando intentos...", flush=True)
+            _attempts(db, rng, manifest, now, args.batch_size, args.days)
+    finally:
+        hashing_pool.shutdown()
+
+    with open(args.manifest, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    print(f"Dataset generado en {time.perf_counter() - started:.1f} s; manifiesto en {args.manifest}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
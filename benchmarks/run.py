@@ -0,0 +1,192 @@
+"""Reproducir un escenario de tráfico contra la API y guardar un informe por ruta.
+
+Lanza --concurrency workers con httpx durante --duration segundos (tras --warmup
+segundos que no se miden). Cada worker tiene su propio generador aleatorio derivado
+de --seed, así que la secuencia de peticiones es la misma entre ejecuciones. El
+informe JSON incluye el commit, la configuración y, por ruta y en total, el
+throughput y las latencias p50/p95/p99; benchmarks.compare compara dos informes.
+
+Con --start-server se arranca uvicorn contra DATABASE_URL sin límites por cliente
+(RATE_LIMITS vacío): todas las peticiones salen de la misma IP.
+
+Uso:
+    python -m benchmarks.run --scenario catalogo --duration 30 --concurrency 50
+    python -m benchmarks.run --scenario mixto --start-server --workers 4
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.generate import DEFAULT_MANIFEST  # noqa: E402
+from benchmarks.scenarios import SCENARIOS, picker  # noqa: E402
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+
+def percentile(sorted_values: list, p: float) -> float:
+    """Percentil por rango más cercano sobre valores ya ordenados"""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(0, math.ceil(p / 100 * len(sorted_values)) - 1)]
+
+
+def summarize(latencies: list, errors: int, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "peticiones": len(latencies),
+        "errores": errors,
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+    }
+
+
+def git_commit() -> str:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                               capture_output=True, text=True).stdout.strip()
+        return commit + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "desconocido"
+
+
+async def run_load(base_url: str, scenario: str, manifest: dict, concurrency: int, duration: float,
+                   warmup: float, seed: int) -> dict:
+    pick = picker(scenario)
+    latencies, errors, statuses = {}, {}, {}
+    measuring = False
+
+    async def worker(client, rng, deadline):
+        while time.perf_counter() < deadline:
+            label, method, path, kwargs, expected = pick(rng, manifest)
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, **kwargs)
+                status = response.status_code
+            except httpx.HTTPError:
+                status = "error_red"
+            elapsed = time.perf_counter() - start
+            if not measuring:
+                continue
+            latencies.setdefault(label, []).append(elapsed)
+            statuses.setdefault(label, {}).setdefault(str(status), 0)
+            statuses[label][str(status)] += 1
+            if status not in expected:
+                errors[label] = errors.get(label, 0) + 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        rngs = [random.Random(seed * 1000 + i) for i in range(concurrency)]
+        if warmup > 0:
+            deadline = time.perf_counter() + warmup
+            await asyncio.gather(*(worker(client, rng, deadline) for rng in rngs))
+        measuring = True
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client, rng, start + duration) for rng in rngs))
+        elapsed = time.perf_counter() - start
+
+    routes = {
+        label: {**summarize(values, errors.get(label, 0), elapsed), "estados": statuses[label]}
+        for label, values in sorted(latencies.items())
+    }
+    everything = [value for values in latencies.values() for value in values]
+    return {"total": summarize(everything, sum(errors.values()), elapsed), "rutas": routes}
+
+
+def start_server(port: int, workers: int) -> subprocess.Popen:
+    env = dict(os.environ, RATE_LIMITS="")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--workers", str(workers),
+         "--log-level", "warning"],
+        cwd=ROOT, env=env,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/salud/listo", timeout=1).status_code == 200:
+                return proc
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("El servidor no arrancó a tiempo")
+
+
+def print_report(report: dict):
+    print(f"{'ruta':<60} {'pet.':>7} {'err.':>5} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for label, stats in list(report["rutas"].items()) + [("TOTAL", report["total"])]:
+        print(f"{label:<60} {stats['peticiones']:>7} {stats['errores']:>5} {stats['rps']:>8} "
+              f"{stats['p50_ms']:>8} {stats['p95_ms']:>8} {stats['p99_ms']:>8}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="mixto")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--start-server", action="store_true", help="arrancar uvicorn en un puerto libre")
+    parser.add_argument("--port", type=int, default=8765, help="puerto de --start-server")
+    parser.add_argument("--workers", type=int, default=1, help="procesos de uvicorn con --start-server")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--warmup", type=float, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST)
+    parser.add_argument("--output", help="ruta del informe JSON (por defecto benchmarks/results/<commit>-<escenario>.json)")
+    args = parser.parse_args()
+
+    with open(args.manifest, encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    proc = None
+    base_url = args.base_url
+    if args.start_server:
+        proc = start_server(args.port, args.workers)
+        base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        results = asyncio.run(run_load(
+            base_url, args.scenario, manifest, args.concurrency, args.duration, args.warmup, args.seed,
+        ))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "escenario": args.scenario,
+        "configuracion": {
+            "concurrencia": args.concurrency, "duracion_s": args.duration, "calentamiento_s": args.warmup,
+            "semilla": args.seed, "workers": args.workers if args.start_server else None,
+        },
+        "dataset": {k: v for k, v in manifest.items() if k != "password"},
+        **results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit}-{args.scenario}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print_report(report)
+    print(f"Informe guardado en {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
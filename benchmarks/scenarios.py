@@ -0,0 +1,126 @@
+"""Mezclas de tráfico para benchmarks.run.
+
+Cada escenario es una lista de (peso, petición); una petición recibe el generador
+aleatorio del worker y el manifiesto del dataset y devuelve
+(etiqueta, método, ruta, kwargs de httpx, códigos esperados). La etiqueta es la
+plantilla de la ruta, para agrupar la latencia sin una serie por cada id.
+"""
+from benchmarks.generate import course_id, module_id, user_email, solution_code, wrong_code, WRONG_VARIANTS
+
+OK = (200,)
+
+
+def _course(rng, ds):
+    return course_id(rng.randrange(ds["courses"]))
+
+
+def _module(rng, ds):
+    return module_id(rng.randrange(ds["courses"]), rng.randrange(ds["modules"]))
+
+
+def _lesson(rng, ds):
+    # Las primeras lecciones reciben más visitas, como en el generador
+    return int(ds["lessons"] * rng.random() ** 1.5) + 1
+
+
+def _user(rng, ds):
+    return int(ds["users"] * rng.random() ** 2) + 1
+
+
+# Catálogo
+
+def cursos(rng, ds):
+    return "GET /cursos/", "GET", "/cursos/", {}, OK
+
+
+def curso(rng, ds):
+    return "GET /cursos/{course_id}", "GET", f"/cursos/{_course(rng, ds)}", {}, OK
+
+
+def arbol(rng, ds):
+    return "GET /cursos/{course_id}/arbol", "GET", f"/cursos/{_course(rng, ds)}/arbol", {}, OK
+
+
+def modulos_curso(rng, ds):
+    return ("GET /modulos/cursos/{course_id}/modulos/", "GET",
+            f"/modulos/cursos/{_course(rng, ds)}/modulos/", {}, OK)
+
+
+def lecciones_modulo(rng, ds):
+    return ("GET /lecciones/modulos/{module_id}/lecciones/?resumen=true", "GET",
+            f"/lecciones/modulos/{_module(rng, ds)}/lecciones/", {"params": {"resumen": "true"}}, OK)
+
+
+def leccion(rng, ds):
+    return "GET /lecciones/{lesson_id}", "GET", f"/lecciones/{_lesson(rng, ds)}", {}, OK
+
+
+# Autenticación
+
+def login(rng, ds):
+    user_id = rng.randint(1, ds["users"])
+    body = {"email": user_email(user_id), "password": ds["password"]}
+    return "POST /auth/login", "POST", "/auth/login", {"json": body}, OK
+
+
+# Envíos de ejercicios
+
+def enviar(rng, ds):
+    lesson_id = _lesson(rng, ds)
+    if rng.random() < 0.35:
+        code = solution_code(lesson_id)
+    else:
+        code = wrong_code(lesson_id, rng.randrange(WRONG_VARIANTS))
+    return ("POST /ejercicios/{lesson_id}/enviar", "POST", f"/ejercicios/{lesson_id}/enviar",
+            {"params": {"user_id": _user(rng, ds)}, "json": {"code_submitted": code}}, (200, 202))
+
+
+# Panel del estudiante
+
+def resumen_progreso(rng, ds):
+    return "GET /progreso/resumen/{user_id}", "GET", f"/progreso/resumen/{_user(rng, ds)}", {}, OK
+
+
+def progreso_usuario(rng, ds):
+    return "GET /progreso/{user_id}", "GET", f"/progreso/{_user(rng, ds)}", {}, OK
+
+
+def resumen_intentos(rng, ds):
+    return ("GET /ejercicios/resumen", "GET", "/ejercicios/resumen",
+            {"params": {"user_id": _user(rng, ds)}}, OK)
+
+
+def intentos_usuario(rng, ds):
+    return ("GET /ejercicios/intentos", "GET", "/ejercicios/intentos",
+            {"params": {"user_id": _user(rng, ds), "limit": 20}}, OK)
+
+
+def ultimo_intento(rng, ds):
+    lesson_id = _lesson(rng, ds)
+    # 404 es una respuesta válida: el usuario puede no haber intentado la lección
+    return ("GET /ejercicios/{lesson_id}/ultimo-intento", "GET", f"/ejercicios/{lesson_id}/ultimo-intento",
+            {"params": {"user_id": _user(rng, ds)}}, (200, 404))
+
+
+SCENARIOS = {
+    "catalogo": [(10, cursos), (10, curso), (20, arbol), (15, modulos_curso), (20, lecciones_modulo), (25, leccion)],
+    "login": [(1, login)],
+    "envios": [(1, enviar)],
+    "panel": [(25, resumen_progreso), (15, progreso_usuario), (25, resumen_intentos), (20, intentos_usuario),
+              (15, ultimo_intento)],
+}
+SCENARIOS["mixto"] = (
+    [(weight * 0.6, request) for weight, request in SCENARIOS["catalogo"]]
+    + [(weight * 0.25, request) for weight, request in SCENARIOS["panel"]]
+    + [(10, enviar), (5, login)]
+)
+
+
+def picker(name: str):
+    """Función (rng, manifiesto) -> petición que elige según los pesos del escenario"""
+    weights, requests = zip(*SCENARIOS[name])
+
+    def pick(rng, ds):
+        return rng.choices(requests, weights)[0](rng, ds)
+
+    return pick
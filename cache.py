@@ -0,0 +1,157 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+MISSING = object()
+
+
+class TTLCache:
+    """Caché LRU acotada en memoria con expiración por entrada y contadores de aciertos.
+
+    Con stale_ttl > 0 las entradas caducadas siguen sirviéndose durante esa ventana
+    mientras se recargan en segundo plano (stale-while-revalidate). Con max_bytes el
+    límite es la suma de len() de los valores (p. ej. bytes) en lugar del número de
+    entradas; maxsize=None deja las entradas sin límite propio.
+    """
+
+    _refresh_executor = None
+    _refresh_executor_lock = threading.Lock()
+
+    def __init__(self, maxsize, ttl: float, stale_ttl: float = 0, max_bytes: int = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_bytes = max_bytes
+        self._bytes = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        # Se incrementa en cada invalidación; una carga iniciada antes no debe escribir su resultado
+        self._generation = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.refreshes = 0
+
+    def get(self, key, default=None):
+        value = self.peek(key)
+        return default if value is MISSING else value
+
+    def peek(self, key, refresh=None):
+        """Devolver el valor o MISSING; si está obsoleto y hay refresh, recargarlo en segundo plano"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[2] <= now:
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return MISSING
+            self._data.move_to_end(key)
+            if entry[1] > now:
+                self.hits += 1
+                return entry[0]
+            if refresh is None:
+                self.misses += 1
+                return MISSING
+            self.stale_hits += 1
+            schedule = key not in self._refreshing
+            if schedule:
+                self._refreshing.add(key)
+                generation = self._generation
+        if schedule:
+            self._get_refresh_executor().submit(self._refresh, key, refresh, generation)
+        return entry[0]
+
+    def get_or_load(self, key, load, refresh=None):
+        """Obtener de la caché o cargar con load(); los valores None no se guardan"""
+        value = self.peek(key, refresh)
+        if value is not MISSING:
+            return value
+        generation = self.generation()
+        value = load()
+        if value is not None:
+            self.set(key, value, generation=generation)
+        return value
+
+    def generation(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def set(self, key, value, ttl: float = None, generation: int = None):
+        if self.maxsize is not None and self.maxsize <= 0:
+            return
+        size = len(value) if self.max_bytes is not None else 0
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        now = time.monotonic()
+        fresh_until = now + (self.ttl if ttl is None else ttl)
+        stale_until = fresh_until + self.stale_ttl
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._remove(key)
+            self._data[key] = (value, fresh_until, stale_until, size)
+            self._bytes += size
+            while self._over_limit():
+                self._remove(next(iter(self._data)))
+                self.evictions += 1
+
+    def _over_limit(self) -> bool:
+        if self.maxsize is not None and len(self._data) > self.maxsize:
+            return True
+        return self.max_bytes is not None and self._bytes > self.max_bytes
+
+    def _remove(self, key):
+        """Quitar key (si está) y descontar su tamaño; se llama con _lock tomado"""
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[3]
+
+    def delete(self, *keys):
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._data.clear()
+            self._bytes = 0
+
+    def _refresh(self, key, refresh, generation):
+        try:
+            value = refresh()
+            if value is not None:
+                self.set(key, value, generation=generation)
+            else:
+                self.delete(key)
+            with self._lock:
+                self.refreshes += 1
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    @classmethod
+    def _get_refresh_executor(cls) -> ThreadPoolExecutor:
+        with cls._refresh_executor_lock:
+            if cls._refresh_executor is None:
+                cls._refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cache-refresh")
+            return cls._refresh_executor
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = {
+                "entradas": len(self._data),
+                "aciertos": self.hits,
+                "aciertos_obsoletos": self.stale_hits,
+                "fallos": self.misses,
+                "desalojos": self.evictions,
+                "recargas": self.refreshes,
+            }
+            if self.max_bytes is not None:
+                stats["bytes"] = self._bytes
+            return stats
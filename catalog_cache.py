@@ -0,0 +1,166 @@
+import threading
+import time
+from sqlalchemy.orm import Session, selectinload, load_only
+from cache import TTLCache, MISSING
+import database
+from database import SessionLocal, ReadSessionLocal, READ_YOUR_WRITES_SECONDS
+from models import Course, Module, Lesson
+from schemas import Course as CourseSchema, Module as ModuleSchema, Lesson as LessonSchema, LessonSummary, CourseTree
+
+from config import CATALOG_CACHE_SIZE, CATALOG_CACHE_TTL_SECONDS, CATALOG_CACHE_STALE_SECONDS
+
+catalog_cache = TTLCache(CATALOG_CACHE_SIZE, CATALOG_CACHE_TTL_SECONDS, CATALOG_CACHE_STALE_SECONDS)
+
+# Claves de la caché
+def course_key(course_id):
+    return ("curso", course_id)
+
+COURSES_KEY = ("cursos",)
+
+def course_tree_key(course_id):
+    return ("arbol_curso", course_id)
+
+def course_modules_key(course_id):
+    return ("modulos_curso", course_id)
+
+def module_key(module_id):
+    return ("modulo", module_id)
+
+def module_lessons_key(module_id):
+    return ("lecciones_modulo", module_id)
+
+def module_lessons_summary_key(module_id):
+    return ("lecciones_modulo_resumen", module_id)
+
+def lesson_key(lesson_id):
+    return ("leccion", lesson_id)
+
+
+# Columnas de los listados; los Text grandes de Lesson solo se cargan en /lecciones/{id}
+LESSON_SUMMARY_COLUMNS = (
+    Lesson.id, Lesson.module_id, Lesson.title, Lesson.position, Lesson.created_at, Lesson.updated_at,
+)
+
+# Cargadores: devuelven esquemas ya validados (seguros para compartir entre hilos) o None si no existe
+def load_courses(db: Session):
+    return [CourseSchema.model_validate(c) for c in db.query(Course).all()]
+
+def load_course(db: Session, course_id: str):
+    curso = db.query(Course).filter(Course.id == course_id).first()
+    return CourseSchema.model_validate(curso) if curso is not None else None
+
+def load_course_tree(db: Session, course_id: str):
+    """Curso con módulos y lecciones en tres consultas (selectinload), ordenados por posición"""
+    curso = db.query(Course).options(
+        selectinload(Course.modules).selectinload(Module.lessons).load_only(*LESSON_SUMMARY_COLUMNS)
+    ).filter(Course.id == course_id).first()
+    return CourseTree.model_validate(curso) if curso is not None else None
+
+def load_course_modules(db: Session, course_id: str):
+    if db.query(Course.id).filter(Course.id == course_id).first() is None:
+        return None
+    modulos = db.query(Module).filter(Module.course_id == course_id).order_by(Module.position).all()
+    return [ModuleSchema.model_validate(m) for m in modulos]
+
+def load_module(db: Session, module_id: str):
+    modulo = db.query(Module).filter(Module.id == module_id).first()
+    return ModuleSchema.model_validate(modulo) if modulo is not None else None
+
+def load_module_lessons(db: Session, module_id: str):
+    if db.query(Module.id).filter(Module.id == module_id).first() is None:
+        return None
+    lecciones = db.query(Lesson).filter(Lesson.module_id == module_id).order_by(Lesson.position).all()
+    return [LessonSchema.model_validate(l) for l in lecciones]
+
+def load_module_lessons_summary(db: Session, module_id: str):
+    if db.query(Module.id).filter(Module.id == module_id).first() is None:
+        return None
+    lecciones = db.query(Lesson).options(load_only(*LESSON_SUMMARY_COLUMNS)).filter(
+        Lesson.module_id == module_id
+    ).order_by(Lesson.position).all()
+    return [LessonSummary.model_validate(l) for l in lecciones]
+
+def load_lesson(db: Session, lesson_id: int):
+    leccion = db.query(Lesson).filter(Lesson.id == lesson_id).first()
+    return LessonSchema.model_validate(leccion) if leccion is not None else None
+
+
+# Claves invalidadas por una escritura y hasta cuándo (monotonic) se recargan desde el
+# primario: la réplica puede no tener aún la escritura y su versión quedaría en caché
+# durante todo el TTL, sin que la cookie de read-your-writes sirva de nada.
+_written = {}
+_written_lock = threading.Lock()
+
+
+def _mark_written(keys):
+    deadline = time.monotonic() + READ_YOUR_WRITES_SECONDS
+    with _written_lock:
+        if len(_written) > CATALOG_CACHE_SIZE:
+            now = time.monotonic()
+            for key in [k for k, until in _written.items() if until <= now]:
+                del _written[key]
+        for key in keys:
+            _written[key] = deadline
+
+
+def reads_from_primary(key) -> bool:
+    until = _written.get(key)
+    return until is not None and until > time.monotonic()
+
+
+def _refresh_in_new_session(loader, key):
+    """Las recargas en segundo plano no pueden usar la sesión de la petición, que ya estará cerrada"""
+    def refresh():
+        db = SessionLocal() if reads_from_primary(key) else ReadSessionLocal()
+        try:
+            return loader(db)
+        finally:
+            db.close()
+    return refresh
+
+
+def cached(key, loader, db):
+    """Obtener key de la caché o calcularla con loader(db); loader devuelve None si no existe.
+
+    Tras una escritura que invalida key, la carga usa el primario en lugar de db.
+    """
+    refresh = _refresh_in_new_session(loader, key)
+    load = refresh if reads_from_primary(key) else (lambda: loader(db))
+    return catalog_cache.get_or_load(key, load, refresh)
+
+
+async def cached_async(key, loader, db):
+    """Versión para AsyncSession: loader recibe una Session síncrona vía run_sync"""
+    value = catalog_cache.peek(key, _refresh_in_new_session(loader, key))
+    if value is not MISSING:
+        return value
+    generation = catalog_cache.generation()
+    if reads_from_primary(key):
+        async with database.AsyncSessionLocal() as primary:
+            value = await primary.run_sync(loader)
+    else:
+        value = await db.run_sync(loader)
+    if value is not None:
+        catalog_cache.set(key, value, generation=generation)
+    return value
+
+
+# Invalidación precisa tras escrituras
+def _invalidate(*keys):
+    _mark_written(keys)
+    catalog_cache.delete(*keys)
+
+def invalidate_course(course_id):
+    _invalidate(COURSES_KEY, course_key(course_id), course_modules_key(course_id), course_tree_key(course_id))
+
+def invalidate_module(module_id, course_id):
+    _invalidate(
+        module_key(module_id), course_modules_key(course_id), module_lessons_key(module_id),
+        module_lessons_summary_key(module_id), course_tree_key(course_id),
+    )
+
+def invalidate_lesson(lesson_id, module_id, course_id):
+    _invalidate(
+        lesson_key(lesson_id), module_lessons_key(module_id), module_lessons_summary_key(module_id),
+        course_tree_key(course_id),
+    )
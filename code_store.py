@@ -0,0 +1,92 @@
+import hashlib
+import zlib
+from sqlalchemy import bindparam, event, select, update
+from sqlalchemy.orm import Session
+from cache import TTLCache
+from models import CodeBlob, ExerciseAttempt
+from upsert import insert_ignore
+
+# Hashes que este proceso ya sabe guardados, para no repetir el INSERT de código popular
+_known_hashes = TTLCache(maxsize=100000, ttl=3600)
+# Clave de Session.info con los hashes insertados en la transacción en curso
+_PENDING_KEY = "pending_code_hashes"
+
+COMPRESSION_LEVEL = 6
+
+
+def code_hash(code: str) -> str:
+    return hashlib.sha256(code.encode("utf-8")).hexdigest()
+
+
+def decompress(data: bytes) -> str:
+    return zlib.decompress(data).decode("utf-8")
+
+
+def store_codes(db: Session, codes) -> list:
+    """Guardar los textos en code_blobs (una vez cada uno) y devolver sus hashes en el mismo orden.
+
+    Se ejecuta en la transacción de db: si se revierte, el blob tampoco queda. Los hashes
+    pasan a _known_hashes solo cuando la transacción se confirma (after_commit).
+    """
+    hashes = [code_hash(code) for code in codes]
+    pending = {}
+    for digest, code in zip(hashes, codes):
+        if digest not in pending and _known_hashes.get(digest) is None:
+            raw = code.encode("utf-8")
+            pending[digest] = {"hash": digest, "data": zlib.compress(raw, COMPRESSION_LEVEL), "size": len(raw)}
+    if pending:
+        insert_ignore(db, CodeBlob.__table__, list(pending.values()))
+        db.info.setdefault(_PENDING_KEY, set()).update(pending)
+    return hashes
+
+
+def store_code(db: Session, code: str) -> str:
+    return store_codes(db, [code])[0]
+
+
+@event.listens_for(Session, "after_commit")
+def _remember_committed(session: Session):
+    """Marcar como conocidos los hashes insertados en la transacción recién confirmada"""
+    for digest in session.info.pop(_PENDING_KEY, ()):
+        _known_hashes.set(digest, True)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back(session: Session):
+    """Los blobs de una transacción revertida no llegaron a guardarse"""
+    session.info.pop(_PENDING_KEY, None)
+
+
+def with_code_hash(db: Session, rows: list) -> list:
+    """Filas de exercise_attempts con code_submitted sustituido por code_hash"""
+    hashes = store_codes(db, [row["code_submitted"] for row in rows])
+    return [
+        {**{k: v for k, v in row.items() if k != "code_submitted"}, "code_hash": digest}
+        for row, digest in zip(rows, hashes)
+    ]
+
+
+def migrate_legacy_batch(db: Session, batch_size: int, after_id: int = 0):
+    """Mover a code_blobs el siguiente lote de intentos con el código en línea.
+
+    Recorre la tabla por id a partir de after_id; devuelve (filas movidas, último id) o None al terminar.
+    """
+    legacy = ExerciseAttempt.__table__.c.code_submitted
+    rows = db.execute(
+        select(ExerciseAttempt.id, legacy).where(ExerciseAttempt.id > after_id)
+        .order_by(ExerciseAttempt.id).limit(batch_size)
+    ).all()
+    if not rows:
+        return None
+    last_id = rows[-1][0]
+    rows = [row for row in rows if row[1] is not None]
+    if not rows:
+        return 0, last_id
+    hashes = store_codes(db, [code for _, code in rows])
+    db.execute(
+        update(ExerciseAttempt.__table__).where(ExerciseAttempt.__table__.c.id == bindparam("attempt_id"))
+        .values(code_hash=bindparam("digest"), code_submitted=None),
+        [{"attempt_id": attempt_id, "digest": digest} for (attempt_id, _), digest in zip(rows, hashes)],
+    )
+    db.commit()
+    return len(rows), last_id
@@ -0,0 +1,128 @@
+"""Archivado de intentos antiguos en tablas por mes (exercise_attempts_archive_YYYYMM).
+
+Los intentos con attempt_date anterior al corte se copian a la tabla de archivo de
+su mes y se borran de exercise_attempts en lotes pequeños, cada uno en su propia
+transacción, para no mantener bloqueos largos sobre la tabla caliente. El último
+intento de cada (usuario, lección) nunca se archiva: /ejercicios/{id}/ultimo-intento
+sigue encontrándolo. Los contadores de attempt_summaries no cambian al archivar.
+"""
+import logging
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import (
+    Boolean, Column, DateTime, Integer, MetaData, String, Table, Text, and_, delete, exists, insert, inspect, or_, select,
+)
+from sqlalchemy.orm import Session, aliased
+from models import ExerciseAttempt
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_PREFIX = "exercise_attempts_archive_"
+
+_archive_metadata = MetaData()
+
+
+def archive_table(month: str) -> Table:
+    """Tabla de archivo del mes YYYYMM (mismas columnas que exercise_attempts, sin claves foráneas)"""
+    name = ARCHIVE_PREFIX + month
+    if name in _archive_metadata.tables:
+        return _archive_metadata.tables[name]
+    return Table(
+        name, _archive_metadata,
+        Column("id", Integer, primary_key=True, autoincrement=False),
+        Column("user_id", Integer, nullable=False, index=True),
+        Column("lesson_id", Integer, nullable=False),
+        Column("code_submitted", Text, nullable=True),
+        Column("code_hash", String(64), nullable=True),
+        Column("is_correct", Boolean, nullable=False),
+        Column("attempt_date", DateTime(timezone=True)),
+    )
+
+
+def archive_tables(bind) -> list:
+    """Tablas de archivo que existen en la base de datos, de la más antigua a la más reciente"""
+    names = inspect(bind).get_table_names()
+    return [archive_table(name[len(ARCHIVE_PREFIX):]) for name in sorted(names) if name.startswith(ARCHIVE_PREFIX)]
+
+
+_COLUMNS = ["id", "user_id", "lesson_id", "code_submitted", "code_hash", "is_correct", "attempt_date"]
+
+
+def _candidates(cutoff: datetime, batch_size: int, after=None):
+    """Ids y fechas de los intentos anteriores a cutoff que no son el último de su (usuario, lección).
+
+    after es la clave (attempt_date, id) del último intento del lote anterior: cada lote
+    sigue donde acabó el anterior en vez de recorrer otra vez desde el intento más antiguo
+    las filas que se saltaron por ser el último intento.
+    """
+    newer = aliased(ExerciseAttempt)
+    query = select(ExerciseAttempt.id, ExerciseAttempt.attempt_date).where(
+        ExerciseAttempt.attempt_date < cutoff,
+        exists().where(and_(
+            newer.user_id == ExerciseAttempt.user_id,
+            newer.lesson_id == ExerciseAttempt.lesson_id,
+            newer.id > ExerciseAttempt.id,
+        )),
+    )
+    if after is not None:
+        after_date, after_id = after
+        query = query.where(or_(
+            ExerciseAttempt.attempt_date > after_date,
+            and_(ExerciseAttempt.attempt_date == after_date, ExerciseAttempt.id > after_id),
+        ))
+    return query.order_by(ExerciseAttempt.attempt_date, ExerciseAttempt.id).limit(batch_size)
+
+
+def _create_archive_tables(bind, months):
+    """Crear las tablas de archivo que falten, fuera de la transacción que mueve las filas.
+
+    En MySQL cada CREATE TABLE confirma implícitamente la transacción abierta: si se hiciera
+    entre la copia y el borrado, un fallo posterior dejaría filas copiadas y sin borrar.
+    """
+    with bind.begin() as connection:
+        for month in months:
+            archive_table(month).create(connection, checkfirst=True)
+
+
+def compact_batch(db: Session, cutoff: datetime, batch_size: int, after=None):
+    """Archivar un lote a partir de after; devuelve cuántos intentos movió (0 cuando no quedan)
+    y la clave (attempt_date, id) del último, que es el after del lote siguiente"""
+    rows = db.execute(_candidates(cutoff, batch_size, after)).all()
+    if not rows:
+        return 0, after
+    source = ExerciseAttempt.__table__
+    by_month = {}
+    for attempt_id, attempt_date in rows:
+        by_month.setdefault(attempt_date.strftime("%Y%m"), []).append(attempt_id)
+    _create_archive_tables(db.get_bind(), by_month)
+    for month, ids in by_month.items():
+        db.execute(insert(archive_table(month)).from_select(
+            _COLUMNS, select(*(source.c[name] for name in _COLUMNS)).where(source.c.id.in_(ids))
+        ))
+    db.execute(delete(source).where(source.c.id.in_([attempt_id for attempt_id, _ in rows])))
+    db.commit()
+    last_id, last_date = rows[-1]
+    return len(rows), (last_date, last_id)
+
+
+def compact(session_factory, retention_days: int, batch_size: int = 500, pause: float = 0.1,
+            max_batches: int = None) -> int:
+    """Archivar todos los intentos fuera de la ventana de retención; devuelve el total movido"""
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    total, batches, after = 0, 0, None
+    while max_batches is None or batches < max_batches:
+        db = session_factory()
+        try:
+            moved, after = compact_batch(db, cutoff, batch_size, after)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        if not moved:
+            break
+        total += moved
+        batches += 1
+        logger.info("Archivados %s intentos (total %s)", moved, total)
+        time.sleep(pause)
+    return total
@@ -0,0 +1,122 @@
+import gzip
+import hashlib
+import zlib
+from starlette.datastructures import Headers, MutableHeaders
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """Si la cabecera Accept-Encoding admite gzip, respetando los valores q (gzip;q=0 lo rechaza)"""
+    qualities = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+    # Una mención explícita de gzip manda sobre el comodín
+    for coding in ("gzip", "x-gzip", "*"):
+        if coding in qualities:
+            return qualities[coding] > 0
+    return False
+
+
+class CompressionMiddleware:
+    """Compresión gzip de respuestas (middleware ASGI).
+
+    Solo se comprimen los content-types de content_types y, si la respuesta llega
+    completa, a partir de minimum_size bytes. Las respuestas en streaming (exportaciones
+    NDJSON/CSV) se comprimen trozo a trozo, vaciando el compresor en cada trozo para que
+    el cliente los reciba sin esperar al final. Las respuestas GET de rutas con un
+    prefijo de cache_prefixes guardan el resultado comprimido en cache, indexado por el
+    hash del cuerpo: la misma lección no se vuelve a comprimir en cada petición.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, level: int = 6, content_types=(),
+                 cache=None, cache_prefixes=()):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+        self.content_types = frozenset(content_types)
+        self.cache = cache
+        self.cache_prefixes = tuple(cache_prefixes)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not accepts_gzip(Headers(scope=scope).get("accept-encoding", "")):
+            await self.app(scope, receive, send)
+            return
+        cacheable = (
+            self.cache is not None and scope["method"] == "GET" and scope["path"].startswith(self.cache_prefixes)
+        )
+        await self.app(scope, receive, _GzipResponder(self, send, cacheable).send)
+
+    def compress(self, body: bytes, cacheable: bool) -> bytes:
+        # mtime=0 hace la salida determinista: el mismo cuerpo da siempre los mismos bytes
+        if not cacheable:
+            return gzip.compress(body, self.level, mtime=0)
+        key = hashlib.blake2b(body, digest_size=16).digest()
+        compressed = self.cache.get(key)
+        if compressed is None:
+            compressed = gzip.compress(body, self.level, mtime=0)
+            self.cache.set(key, compressed)
+        return compressed
+
+
+class _GzipResponder:
+    def __init__(self, middleware: CompressionMiddleware, send, cacheable: bool):
+        self.middleware = middleware
+        self._send = send
+        self.cacheable = cacheable
+        self.start = None
+        self.compressor = None
+        self.passthrough = False
+
+    def _compressible(self, message, headers: Headers, body: bytes, more_body: bool) -> bool:
+        if message["status"] < 200 or message["status"] in (204, 304) or "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        if content_type not in self.middleware.content_types:
+            return False
+        return more_body or len(body) >= self.middleware.minimum_size
+
+    async def send(self, message):
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.start is not None:
+            start, self.start = self.start, None
+            headers = MutableHeaders(raw=start["headers"])
+            if not self._compressible(start, headers, body, more_body):
+                self.passthrough = True
+                await self._send(start)
+                await self._send(message)
+                return
+            headers["Content-Encoding"] = "gzip"
+            headers.add_vary_header("Accept-Encoding")
+            if not more_body:
+                body = self.middleware.compress(body, self.cacheable)
+                headers["Content-Length"] = str(len(body))
+                await self._send(start)
+                await self._send({"type": "http.response.body", "body": body})
+                return
+            if "content-length" in headers:
+                del headers["Content-Length"]
+            self.compressor = zlib.compressobj(self.middleware.level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+            await self._send(start)
+
+        data = self.compressor.compress(body)
+        data += self.compressor.flush(zlib.Z_SYNC_FLUSH if more_body else zlib.Z_FINISH)
+        await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
@@ -0,0 +1,78 @@
+"""Validadores HTTP (ETag / Last-Modified) del catálogo.
+
+La ETag es un digest del JSON de los datos que devuelve la caché del catálogo: cambia
+con cualquier escritura que cambie la respuesta, aunque ocurra en el mismo segundo que
+la anterior (updated_at solo tiene precisión de segundos en MySQL y SQLite). El digest
+se calcula una vez por objeto cacheado, así que una petición condicional que acierta en
+la caché responde 304 sin consultar la base de datos ni serializar. Las ETag son
+débiles: la compresión cambia los bytes pero no el contenido. Last-Modified (y con él
+If-Modified-Since) solo se usa en elementos sueltos, no en listas ni árboles.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import Request, Response
+from pydantic_core import to_json
+from cache import TTLCache
+from config import CATALOG_CACHE_SIZE, CATALOG_CACHE_TTL_SECONDS, CATALOG_CACHE_STALE_SECONDS
+
+# Clave de la caché del catálogo -> (objeto cacheado, ETag); vale mientras la caché devuelva ese objeto
+_etags = TTLCache(CATALOG_CACHE_SIZE, CATALOG_CACHE_TTL_SECONDS + CATALOG_CACHE_STALE_SECONDS)
+
+
+def last_modified_of(data):
+    """updated_at de un elemento suelto; None para listas y árboles.
+
+    En una colección el máximo updated_at de las filas que quedan no cambia al borrar
+    una que no era la más reciente, así que Last-Modified daría 304 con la lista antigua:
+    ahí solo se valida con la ETag.
+    """
+    if isinstance(data, list) or hasattr(data, "modules"):
+        return None
+    return data.updated_at
+
+
+def make_etag(data) -> str:
+    digest = hashlib.blake2b(to_json(data), digest_size=16).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_for(key, data) -> str:
+    """ETag de data, el valor de key en la caché del catálogo"""
+    entry = _etags.get(key)
+    if entry is not None and entry[0] is data:
+        return entry[1]
+    etag = make_etag(data)
+    _etags.set(key, (data, etag))
+    return etag
+
+
+def _utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def _matches(request: Request, etag: str, last_modified) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match manda sobre If-Modified-Since; la comparación de ETag débiles ignora W/
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag.removeprefix("W/") in tags
+    if last_modified is None or "if-modified-since" not in request.headers:
+        return False
+    try:
+        since = parsedate_to_datetime(request.headers["if-modified-since"])
+    except (TypeError, ValueError):
+        return False
+    return _utc(last_modified).replace(microsecond=0) <= _utc(since)
+
+
+def conditional_response(request: Request, response: Response, key, data):
+    """Añadir ETag y Last-Modified; devolver 304 si el cliente ya tiene data, o data si no"""
+    last_modified = last_modified_of(data)
+    headers = {"ETag": etag_for(key, data)}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_utc(last_modified).replace(microsecond=0), usegmt=True)
+    if _matches(request, headers["ETag"], last_modified):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return data
@@ -0,0 +1,83 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from database import ReadSessionLocal, SessionLocal, wants_primary
+
+EXPORT_BATCH_SIZE = 1000
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Tipo no serializable: {type(value).__name__}")
+
+
+def _csv_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _iter_batches(statement, factory):
+    """Filas en lotes con cursor de servidor; la sesión es propia porque vive más que el handler"""
+    db = factory()
+    try:
+        result = db.execute(statement.execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE))
+        for batch in result.partitions():
+            yield batch
+    finally:
+        db.close()
+
+
+def _iter_rows(statement, factory, transform):
+    for batch in _iter_batches(statement, factory):
+        yield batch if transform is None else [transform(row) for row in batch]
+
+
+def _ndjson(statement, factory, names, transform=None):
+    for batch in _iter_rows(statement, factory, transform):
+        yield "".join(
+            json.dumps(dict(zip(names, row)), default=_json_default, ensure_ascii=False) + "\n"
+            for row in batch
+        )
+
+
+def _csv(statement, factory, names, transform=None):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(names)
+    for batch in _iter_rows(statement, factory, transform):
+        writer.writerows([_csv_value(v) for v in row] for row in batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def stream_export(request: Request, statement, formato: str, filename: str, names=None,
+                  transform=None) -> StreamingResponse:
+    """Respuesta en streaming (NDJSON o CSV) con memoria constante independiente del número de filas.
+
+    statement debe ser un select() de columnas, no de entidades ORM, para no llenar el
+    identity map de la sesión. transform(fila) permite convertir cada fila antes de
+    serializarla; en ese caso names da los nombres de las columnas resultantes. Como en
+    get_read_db, se lee de la réplica salvo que la petición pida el primario.
+    """
+    names = names or [column.key for column in statement.selected_columns]
+    factory = SessionLocal if wants_primary(request) else ReadSessionLocal
+    writer = _csv if formato == "csv" else _ndjson
+    generator = writer(statement, factory, names, transform)
+    return StreamingResponse(
+        generator,
+        media_type=MEDIA_TYPES[formato],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{formato}"'},
+    )
@@ -0,0 +1,80 @@
+from datetime import date, datetime
+from functools import lru_cache
+from typing import List, Union, get_args, get_origin
+from fastapi import Response
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import BaseModel, TypeAdapter
+from pydantic_core import to_json
+from config import ORJSON_RESPONSES
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional
+    orjson = None
+
+# Clase de respuesta por defecto de la aplicación: orjson si se pidió y está instalado
+DefaultJSONResponse = ORJSONResponse if ORJSON_RESPONSES and orjson is not None else JSONResponse
+
+
+def _has_models(annotation) -> bool:
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return True
+    return any(_has_models(arg) for arg in get_args(annotation))
+
+
+# Tipos cuyo valor de columna se serializa igual que después de validarlo
+_PLAIN_TYPES = (int, float, str, bool, datetime, date, type(None))
+
+
+def _is_plain(annotation) -> bool:
+    if annotation in _PLAIN_TYPES:
+        return True
+    return get_origin(annotation) is Union and all(_is_plain(arg) for arg in get_args(annotation))
+
+
+@lru_cache(maxsize=None)
+def _plan(schema):
+    """(adaptador, campos, plano, conversores): un esquema plano no tiene modelos anidados.
+
+    conversores valida solo los campos que cambian el valor al validarlo (p. ej. EmailStr
+    normaliza el dominio), para que el JSON sea el mismo que con response_model.
+    """
+    fields = schema.model_fields
+    flat = not any(_has_models(field.annotation) for field in fields.values())
+    converters = {
+        name: TypeAdapter(field.annotation).validate_python
+        for name, field in fields.items() if not _is_plain(field.annotation)
+    }
+    return TypeAdapter(List[schema]), tuple(fields), flat, converters
+
+
+def dump_list(schema, items) -> bytes:
+    """Serializar items (objetos ORM) con schema a JSON en pydantic-core, sin pasar por json.dumps.
+
+    Las filas que vienen de la base de datos ya tienen los tipos de sus columnas, así que
+    en esquemas planos se serializan directamente los valores de los campos, en el orden
+    del esquema; la validación completa, que es lo más caro, solo se hace si hay modelos
+    anidados. Los campos con tipos que transforman el valor se validan uno a uno.
+    """
+    adapter, fields, flat, converters = _plan(schema)
+    if not flat:
+        return adapter.dump_json(adapter.validate_python(items, from_attributes=True))
+    if not converters:
+        return to_json([{name: getattr(item, name) for name in fields} for item in items])
+    return to_json([
+        {name: converters[name](getattr(item, name)) if name in converters else getattr(item, name) for name in fields}
+        for item in items
+    ])
+
+
+def list_response(schema, items, response: Response = None) -> Response:
+    """Respuesta JSON ya serializada para endpoints de listas grandes.
+
+    FastAPI no valida ni vuelve a serializar una Response devuelta por el handler, así
+    que el response_model del decorador sirve solo para la documentación. Las cabeceras
+    puestas en response (p. ej. X-Next-Cursor) se copian a la respuesta final.
+    """
+    headers = None
+    if response is not None:
+        headers = {k: v for k, v in response.headers.items() if k != "content-length"}
+    return Response(content=dump_list(schema, items), media_type="application/json", headers=headers)
@@ -0,0 +1,212 @@
+"""Corrección de ejercicios.
+
+Cada estrategia recibe (código enviado, solución) y devuelve True/False si puede
+decidir o None si no concluye y debe probarse la siguiente. El orden se configura
+con GRADER_STRATEGIES y se pueden registrar estrategias nuevas con register_grader.
+Los resultados se cachean por (lección, hash del código normalizado, hash de la
+solución), así que un envío idéntico de otro alumno no se vuelve a corregir.
+"""
+import ast
+import hashlib
+import io
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import tokenize
+from cache import TTLCache, MISSING
+from config import (
+    GRADER_STRATEGIES, GRADER_WORKERS, GRADER_TIMEOUT_SECONDS, GRADER_MEMORY_MB,
+    GRADER_CACHE_SIZE, GRADER_CACHE_TTL_SECONDS,
+)
+
+try:
+    import resource
+except ImportError:  # Windows: sin límites de CPU/memoria, solo el timeout
+    resource = None
+
+grade_cache = TTLCache(GRADER_CACHE_SIZE, GRADER_CACHE_TTL_SECONDS)
+
+
+class GradingOverloaded(Exception):
+    """No hay procesos de sandbox libres"""
+
+
+def _string_lines(code: str) -> set:
+    """Números de línea (desde 1) cuyo salto de línea queda dentro de un literal de cadena"""
+    lines, starts = set(), []
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(code).readline):
+            if token.type == tokenize.STRING:
+                lines.update(range(token.start[0], token.end[0]))
+            elif token.type == getattr(tokenize, "FSTRING_START", None):
+                starts.append(token.start[0])
+            elif token.type == getattr(tokenize, "FSTRING_END", None) and starts:
+                lines.update(range(starts.pop(), token.end[0]))
+    except (tokenize.TokenError, SyntaxError):
+        # No es Python válido: se normaliza línea a línea sin excepciones
+        return set()
+    return lines
+
+
+def normalize_code(code: str) -> str:
+    """Unificar saltos de línea, quitar espacios finales y líneas vacías.
+
+    Las líneas dentro de cadenas de varias líneas se conservan tal cual: ahí los espacios
+    y las líneas vacías forman parte del valor.
+    """
+    code = code.replace("\r\n", "\n").replace("\r", "\n")
+    inside_strings = _string_lines(code)
+    normalized = []
+    for number, line in enumerate(code.split("\n"), start=1):
+        if number in inside_strings:
+            normalized.append(line)
+        elif line.rstrip():
+            normalized.append(line.rstrip())
+    return "\n".join(normalized)
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def _ast_dump(code: str):
+    try:
+        return ast.dump(ast.parse(code))
+    except (SyntaxError, ValueError):
+        return None
+
+
+def grade_exact(code: str, solution: str):
+    """Texto idéntico tras normalizar"""
+    return True if normalize_code(code) == normalize_code(solution) else None
+
+
+def grade_ast(code: str, solution: str):
+    """Mismo árbol sintáctico de Python (ignora formato y comentarios)"""
+    expected = _ast_dump(solution)
+    if expected is None:
+        return None
+    submitted = _ast_dump(code)
+    if submitted is None:
+        return False
+    return True if submitted == expected else None
+
+
+# Arranque del proceso hijo: fija los límites y sustituye el proceso por un intérprete
+# limpio que ejecuta el envío (los límites se heredan a través de exec). Evita preexec_fn,
+# que no es seguro con hilos y el servidor lanza el sandbox desde varios a la vez.
+# RLIMIT_NPROC cuenta todos los procesos e hilos del usuario, así que el único valor que
+# no depende de lo que ya esté corriendo es 0: el envío no puede crear procesos ni hilos
+# (no se aplica si el servidor corre como root; ahí solo queda matar el grupo de procesos).
+_BOOTSTRAP = """\
+import os, resource, sys
+cpu, memory, code = int(sys.argv[1]), int(sys.argv[2]), sys.argv[3]
+resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu))
+resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+resource.setrlimit(resource.RLIMIT_FSIZE, (0, 0))
+resource.setrlimit(resource.RLIMIT_NPROC, (0, 0))
+os.execv(sys.executable, [sys.executable, "-I", "-c", code])
+"""
+
+
+def _command(code: str) -> list:
+    """Línea de órdenes del proceso hijo para ejecutar code con los límites configurados"""
+    if resource is None:
+        return [sys.executable, "-I", "-c", code]
+    limits = [str(GRADER_TIMEOUT_SECONDS), str(GRADER_MEMORY_MB * 1024 * 1024)]
+    return [sys.executable, "-I", "-c", _BOOTSTRAP, *limits, code]
+
+
+def _kill_group(proc: subprocess.Popen):
+    """Matar el proceso y cualquier descendiente que siga vivo en su grupo, y recoger el hijo"""
+    if hasattr(os, "killpg"):
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+    else:
+        proc.kill()
+    proc.communicate()
+
+
+class Sandbox:
+    """Ejecuta código en procesos Python aislados, con como máximo workers a la vez"""
+
+    def __init__(self, workers: int, timeout: float):
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(workers)
+
+    def run(self, code: str):
+        """Devolver la salida estándar o None si falla, excede los límites o no termina a tiempo"""
+        if not self._slots.acquire(timeout=self.timeout):
+            raise GradingOverloaded()
+        try:
+            with tempfile.TemporaryDirectory() as cwd:
+                # Sesión propia: el envío y todo lo que lance forman un grupo que se mata entero
+                proc = subprocess.Popen(
+                    _command(code),
+                    cwd=cwd, env={"PATH": os.defpath}, stdin=subprocess.DEVNULL,
+                    stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+                    start_new_session=hasattr(os, "killpg"),
+                )
+                try:
+                    stdout, _ = proc.communicate(timeout=self.timeout)
+                except subprocess.TimeoutExpired:
+                    return None
+                finally:
+                    _kill_group(proc)
+        finally:
+            self._slots.release()
+        return stdout if proc.returncode == 0 else None
+
+
+sandbox = Sandbox(GRADER_WORKERS, GRADER_TIMEOUT_SECONDS)
+
+
+def _normalize_output(output: str) -> str:
+    return "\n".join(line.rstrip() for line in output.strip().splitlines())
+
+
+def grade_output(code: str, solution: str):
+    """Ejecutar envío y solución en el sandbox y comparar la salida estándar"""
+    key = ("salida", _digest(solution))
+    expected = grade_cache.get(key, MISSING)
+    if expected is MISSING:
+        expected = sandbox.run(solution)
+        grade_cache.set(key, expected)
+    if expected is None:
+        return None
+    submitted = sandbox.run(code)
+    return submitted is not None and _normalize_output(submitted) == _normalize_output(expected)
+
+
+GRADERS = {
+    "exacto": grade_exact,
+    "ast": grade_ast,
+    "salida": grade_output,
+}
+
+
+def register_grader(name: str, grader):
+    """Añadir una estrategia; se usa si su nombre aparece en GRADER_STRATEGIES"""
+    GRADERS[name] = grader
+
+
+def grade(lesson_id: int, code: str, solution: str) -> bool:
+    """Corregir un envío aplicando las estrategias configuradas en orden"""
+    key = (lesson_id, _digest(normalize_code(code)), _digest(solution))
+    result = grade_cache.get(key, MISSING)
+    if result is not MISSING:
+        return result
+    result = False
+    for name in GRADER_STRATEGIES:
+        verdict = GRADERS[name](code, solution)
+        if verdict is not None:
+            result = verdict
+            break
+    grade_cache.set(key, result)
+    return result
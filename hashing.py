@@ -0,0 +1,102 @@
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from passlib.context import CryptContext
+from passlib.hash import bcrypt
+from starlette.concurrency import run_in_threadpool
+from config import BCRYPT_ROUNDS, HASH_WORKERS, HASH_MAX_PENDING, HASH_RETRY_AFTER_SECONDS
+
+
+class HashingOverloaded(Exception):
+    """La cola de hashing está llena"""
+
+
+@lru_cache(maxsize=None)
+def _context(rounds: int) -> CryptContext:
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+
+
+# Funciones ejecutadas dentro de los procesos del pool (deben ser importables a nivel de módulo)
+def _hash(password: str, rounds: int) -> str:
+    return _context(rounds).hash(password)
+
+
+def _verify_and_update(password: str, hashed: str, rounds: int):
+    context = _context(rounds)
+    if not context.verify(password, hashed):
+        return False, None
+    if not context.needs_update(hashed):
+        return True, None
+    # Nuevo coste con la misma sal: la versión de los tokens se deriva de la sal y no cambia
+    return True, bcrypt.using(rounds=rounds, salt=bcrypt.from_string(hashed).salt).hash(password)
+
+
+class HashingPool:
+    """Pool de procesos acotado para bcrypt, con límite de operaciones pendientes"""
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def run(self, fn, *args):
+        """Ejecutar fn en el pool y esperar el resultado; falla de inmediato si la cola está llena"""
+        if not self._slots.acquire(blocking=False):
+            raise HashingOverloaded()
+        try:
+            if self.workers <= 0:
+                return fn(*args)
+            return self._get_executor().submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    async def run_async(self, fn, *args):
+        """Como run, pero esperando sin ocupar un hilo del threadpool mientras trabaja el proceso"""
+        if not self._slots.acquire(blocking=False):
+            raise HashingOverloaded()
+        try:
+            if self.workers <= 0:
+                return await run_in_threadpool(fn, *args)
+            return await asyncio.wrap_future(self._get_executor().submit(fn, *args))
+        finally:
+            self._slots.release()
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+
+hashing_pool = HashingPool(HASH_WORKERS, HASH_MAX_PENDING)
+
+
+def hash_password(password: str) -> str:
+    return hashing_pool.run(_hash, password, BCRYPT_ROUNDS)
+
+
+def verify_and_update(password: str, hashed: str):
+    """Verificar la contraseña; devuelve (valida, nuevo_hash) con nuevo_hash si el coste cambió"""
+    if not hashed:
+        return False, None
+    return hashing_pool.run(_verify_and_update, password, hashed, BCRYPT_ROUNDS)
+
+
+async def hash_password_async(password: str) -> str:
+    return await hashing_pool.run_async(_hash, password, BCRYPT_ROUNDS)
+
+
+async def verify_and_update_async(password: str, hashed: str):
+    if not hashed:
+        return False, None
+    return await hashing_pool.run_async(_verify_and_update, password, hashed, BCRYPT_ROUNDS)
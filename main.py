@@ -1,14 +1,58 @@
-from fastapi import FastAPI
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
 from routers import auth
-from database import engine, Base
+from database import (
+    engine, read_engine, get_pool_status, pool_stats, read_pool_stats,
+    READ_PRIMARY_COOKIE, READ_YOUR_WRITES_SECONDS, DB_ASYNC, async_engine, async_read_engine,
+)
+from startup import warm_up, check_database, readiness
+from hashing import hashing_pool
+from pagination import NEXT_CURSOR_HEADER
+from auth import token_cache, user_cache
+from catalog_cache import catalog_cache
+from attempt_buffer import attempt_buffer
+from fast_json import DefaultJSONResponse
+from cache import TTLCache
+from compression import CompressionMiddleware
+from admission import AdmissionControl, AdmissionMiddleware
+from metrics import MetricsMiddleware, instrument_engine, registry as metrics_registry
+from profiler import ProfilerMiddleware, instrument_engine as profile_engine
+from config import (
+    STARTUP_WARMUP, STARTUP_WARMUP_CONNECTIONS, COMPRESSION_ENABLED, COMPRESSION_MIN_SIZE, COMPRESSION_LEVEL, COMPRESSION_CONTENT_TYPES,
+    COMPRESSION_CACHE_MAX_MB, CATALOG_CACHE_TTL_SECONDS, ADMISSION_ENABLED, ADMISSION_CONCURRENCY,
+    ADMISSION_QUEUE_TIMEOUT_SECONDS, ADMISSION_RETRY_AFTER_SECONDS, RATE_LIMITS, RATE_LIMIT_TRUSTED_PROXIES,
+    METRICS_ENABLED, SQL_PROFILER_ENABLED, SQL_SLOW_QUERY_MS, SQL_N_PLUS_ONE_THRESHOLD,
+)
 from routers import users, courses, modules, lessons, exercises, progress
 
+# En modo asíncrono los routers CRUD usan AsyncSession con handlers async def
+if DB_ASYNC:
+    from routers.aio import users, courses, modules, lessons
+
+# El esquema se crea con `alembic upgrade head` (o scripts/init_db.py); importar este
+# módulo no abre conexiones a la base de datos.
 
-# Crear tablas de la base de datos
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Precalentar pool y catálogo al arrancar; liberar pools al apagar"""
+    if STARTUP_WARMUP:
+        await run_in_threadpool(warm_up, STARTUP_WARMUP_CONNECTIONS)
+    yield
+    # Escribir los intentos pendientes antes de cerrar los pools
+    await run_in_threadpool(attempt_buffer.shutdown)
+    hashing_pool.shutdown()
+    if async_engine is not None:
+        await async_engine.dispose()
+    if async_read_engine is not None and async_read_engine is not async_engine:
+        await async_read_engine.dispose()
 
 app = FastAPI(
+    lifespan=lifespan,
+    default_response_class=DefaultJSONResponse,
     title="CodeMastery API",
     description="""
     ## API completa para la plataforma de aprendizaje CodeMastery
@@ -34,6 +78,18 @@ app = FastAPI(
     redoc_url="/redoc"  # ReDoc
 )
 
+# Control de admisión: por dentro de CORS para que los 429/503 lleven sus cabeceras
+admission = AdmissionControl(
+    concurrency=ADMISSION_CONCURRENCY,
+    rate_limits=RATE_LIMITS,
+    queue_timeout=ADMISSION_QUEUE_TIMEOUT_SECONDS,
+    retry_after=ADMISSION_RETRY_AFTER_SECONDS,
+    trusted_proxies=RATE_LIMIT_TRUSTED_PROXIES,
+)
+
+if ADMISSION_ENABLED:
+    app.add_middleware(AdmissionMiddleware, control=admission)
+
 # Configurar CORS
 app.add_middleware(
     CORSMiddleware,
@@ -41,8 +97,52 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag", "Retry-After"],
 )
 
+# Respuestas del catálogo ya comprimidas, indexadas por el hash del cuerpo y acotadas por bytes
+compressed_cache = TTLCache(None, CATALOG_CACHE_TTL_SECONDS, max_bytes=COMPRESSION_CACHE_MAX_MB * 1024 * 1024)
+
+if COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=COMPRESSION_MIN_SIZE,
+        level=COMPRESSION_LEVEL,
+        content_types=COMPRESSION_CONTENT_TYPES,
+        cache=compressed_cache,
+        cache_prefixes=("/cursos", "/modulos", "/lecciones"),
+    )
+
+# Métricas: por fuera de los demás middlewares para medir también los rechazos y la compresión
+if METRICS_ENABLED:
+    instrument_engine(engine, "primario")
+    if read_engine is not engine:
+        instrument_engine(read_engine, "lectura")
+    if async_engine is not None:
+        instrument_engine(async_engine, "primario_async")
+        if async_read_engine is not async_engine:
+            instrument_engine(async_read_engine, "lectura_async")
+    app.add_middleware(MetricsMiddleware, metrics=metrics_registry)
+
+# Perfilador de SQL (depuración): cada sentencia de la petición, consultas lentas y N+1
+if SQL_PROFILER_ENABLED:
+    for profiled_engine in {engine, read_engine, async_engine, async_read_engine} - {None}:
+        profile_engine(profiled_engine, SQL_SLOW_QUERY_MS / 1000)
+    app.add_middleware(ProfilerMiddleware, n_plus_one_threshold=SQL_N_PLUS_ONE_THRESHOLD)
+
+@app.middleware("http")
+async def read_your_writes(request: Request, call_next):
+    """Tras una escritura exitosa, dirigir las lecturas del cliente al primario durante unos segundos"""
+    response = await call_next(request)
+    if request.method in ("POST", "PUT", "PATCH", "DELETE") and response.status_code < 400 and READ_YOUR_WRITES_SECONDS > 0:
+        response.set_cookie(
+            READ_PRIMARY_COOKIE,
+            str(time.time() + READ_YOUR_WRITES_SECONDS),
+            max_age=READ_YOUR_WRITES_SECONDS,
+            httponly=True,
+        )
+    return response
+
 # Incluir routers
 app.include_router(auth.router)
 app.include_router(users.router)
@@ -69,6 +169,57 @@ def inicio():
         ]
     }
 
+@app.get("/salud/vivo", tags=["🏠 Inicio"])
+def salud_vivo():
+    """Liveness: el proceso responde"""
+    return {"estado": "vivo"}
+
+@app.get("/salud/listo", tags=["🏠 Inicio"])
+def salud_listo():
+    """Readiness: la base de datos responde y el precalentamiento terminó"""
+    base_datos = check_database()
+    listo = base_datos and (readiness["precalentado"] or not STARTUP_WARMUP)
+    return JSONResponse(
+        status_code=200 if listo else 503,
+        content={"estado": "listo" if listo else "no_listo", "base_datos": base_datos, **readiness},
+    )
+
+@app.get("/estado/pool", tags=["🏠 Inicio"])
+def estado_pool():
+    """Estadísticas del pool de conexiones a la base de datos"""
+    estado = {"primario": get_pool_status(engine, pool_stats)}
+    if read_engine is not engine:
+        estado["lectura"] = get_pool_status(read_engine, read_pool_stats)
+    return estado
+
+@app.get("/estado/cache", tags=["🏠 Inicio"])
+def estado_cache():
+    """Contadores de aciertos y fallos de las cachés en memoria"""
+    return {
+        "catalogo": catalog_cache.stats(),
+        "usuarios": user_cache.stats(),
+        "tokens": token_cache.stats(),
+        "compresion": compressed_cache.stats(),
+    }
+
+@app.get("/estado/intentos", tags=["🏠 Inicio"])
+def estado_intentos():
+    """Cola de intentos pendientes de escribir (modo write-behind)"""
+    return attempt_buffer.stats()
+
+@app.get("/estado/admision", tags=["🏠 Inicio"])
+def estado_admision():
+    """Peticiones en curso, en cola y rechazadas por prefijo"""
+    return admission.stats()
+
+@app.get("/metrics", include_in_schema=False)
+def metricas():
+    """Métricas en formato de texto de Prometheus"""
+    return Response(
+        metrics_registry.render(estado_pool()),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,258 @@
+"""Métricas de la aplicación en formato de texto de Prometheus (GET /metrics).
+
+Los contadores se guardan en un fragmento por hilo: cada hilo solo escribe en el suyo,
+sin locks, y /metrics suma los fragmentos al exportar. Las métricas HTTP se registran
+desde el middleware (hilo del event loop) y las de base de datos desde los eventos de
+SQLAlchemy en el hilo que ejecuta la consulta. Las consultas de cada petición se
+atribuyen a su ruta mediante un ContextVar, que se propaga al threadpool de los
+handlers síncronos y a los greenlets de las sesiones asíncronas.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from sqlalchemy import event
+from starlette.routing import Match
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+QUERIES_PER_REQUEST_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+# Rutas resueltas por (método, path); se vacía al llenarse para no crecer sin límite
+ROUTE_CACHE_SIZE = 10000
+UNMATCHED_ROUTE = "sin_ruta"
+
+# [consultas, segundos] de la petición en curso
+_request_db = ContextVar("request_db", default=None)
+
+
+class _Shard:
+    """Contadores escritos por un único hilo"""
+
+    def __init__(self):
+        self.requests = {}
+        self.latency = {}
+        self.queries_per_request = {}
+        self.db_time = {}
+        self.in_flight = {}
+        self.queries = {}
+        self.query_time = {}
+        self.checkouts = {}
+
+
+def _observe(histograms: dict, key, buckets, value: float):
+    histogram = histograms.get(key)
+    if histogram is None:
+        # Un contador por bucket más +Inf, suma y recuento
+        histogram = histograms[key] = [0] * (len(buckets) + 1) + [0.0, 0]
+    histogram[bisect_left(buckets, value)] += 1
+    histogram[-2] += value
+    histogram[-1] += 1
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._local = threading.local()
+        self._shards = []
+        self._shards_lock = threading.Lock()
+        self._routes = {}
+
+    def shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    # Peticiones HTTP
+
+    def route_for(self, app, scope) -> str:
+        """Plantilla de la ruta (/cursos/{course_id}) para no crear una serie por cada id"""
+        key = (scope["method"], scope["path"])
+        route = self._routes.get(key)
+        if route is None:
+            route = UNMATCHED_ROUTE
+            for candidate in app.router.routes:
+                match, _ = candidate.matches(scope)
+                if match == Match.FULL:
+                    route = candidate.path
+                    break
+            if len(self._routes) >= ROUTE_CACHE_SIZE:
+                self._routes.clear()
+            self._routes[key] = route
+        return route
+
+    def request_started(self, key):
+        in_flight = self.shard().in_flight
+        in_flight[key] = in_flight.get(key, 0) + 1
+
+    def request_finished(self, key, status: int, seconds: float, queries: int, db_seconds: float):
+        shard = self.shard()
+        shard.in_flight[key] -= 1
+        status_key = key + (str(status),)
+        shard.requests[status_key] = shard.requests.get(status_key, 0) + 1
+        _observe(shard.latency, key, LATENCY_BUCKETS, seconds)
+        _observe(shard.queries_per_request, key, QUERIES_PER_REQUEST_BUCKETS, queries)
+        _observe(shard.db_time, key, LATENCY_BUCKETS, db_seconds)
+
+    # Base de datos
+
+    def query_finished(self, engine_name: str, seconds: float):
+        shard = self.shard()
+        shard.queries[engine_name] = shard.queries.get(engine_name, 0) + 1
+        _observe(shard.query_time, engine_name, QUERY_BUCKETS, seconds)
+        current = _request_db.get()
+        if current is not None:
+            current[0] += 1
+            current[1] += seconds
+
+    def checkout(self, engine_name: str):
+        checkouts = self.shard().checkouts
+        checkouts[engine_name] = checkouts.get(engine_name, 0) + 1
+
+    # Exportación
+
+    def _merged(self, attribute: str) -> dict:
+        with self._shards_lock:
+            shards = list(self._shards)
+        merged = {}
+        for shard in shards:
+            # dict.copy() es atómico con el GIL aunque el hilo dueño siga escribiendo
+            for key, value in getattr(shard, attribute).copy().items():
+                if isinstance(value, list):
+                    total = merged.get(key)
+                    merged[key] = list(value) if total is None else [a + b for a, b in zip(total, value)]
+                else:
+                    merged[key] = merged.get(key, 0) + value
+        return merged
+
+    def render(self, pool_status=None) -> str:
+        lines = []
+        _counter(lines, "http_requests_total", "Peticiones HTTP atendidas", ("method", "route", "status"),
+                 self._merged("requests"))
+        _gauge(lines, "http_requests_in_flight", "Peticiones HTTP en curso", ("method", "route"),
+               self._merged("in_flight"))
+        _histogram(lines, "http_request_duration_seconds", "Latencia de las peticiones HTTP", ("method", "route"),
+                   LATENCY_BUCKETS, self._merged("latency"))
+        _histogram(lines, "http_request_db_queries", "Consultas SQL por petición", ("method", "route"),
+                   QUERIES_PER_REQUEST_BUCKETS, self._merged("queries_per_request"))
+        _histogram(lines, "http_request_db_seconds", "Tiempo en consultas SQL por petición", ("method", "route"),
+                   LATENCY_BUCKETS, self._merged("db_time"))
+        _counter(lines, "db_queries_total", "Consultas SQL ejecutadas", ("engine",), _keys(self._merged("queries")))
+        _histogram(lines, "db_query_duration_seconds", "Duración de las consultas SQL", ("engine",),
+                   QUERY_BUCKETS, _keys(self._merged("query_time")))
+        _counter(lines, "db_pool_checkouts_total", "Conexiones obtenidas del pool", ("engine",),
+                 _keys(self._merged("checkouts")))
+        if pool_status:
+            for field, name, help_text in (
+                ("en_uso", "db_pool_connections_in_use", "Conexiones del pool en uso"),
+                ("disponibles", "db_pool_connections_idle", "Conexiones del pool libres"),
+                ("overflow", "db_pool_overflow", "Conexiones abiertas por encima del tamaño del pool"),
+            ):
+                values = {(pool,): status[field] for pool, status in pool_status.items() if field in status}
+                _gauge(lines, name, help_text, ("engine",), values)
+        return "\n".join(lines) + "\n"
+
+
+def _keys(values: dict) -> dict:
+    return {(key,): value for key, value in values.items()}
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _counter(lines, name, help_text, label_names, values: dict, kind: str = "counter"):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+    for key in sorted(values):
+        lines.append(f"{name}{_labels(label_names, key)} {_number(values[key])}")
+
+
+def _gauge(lines, name, help_text, label_names, values: dict):
+    _counter(lines, name, help_text, label_names, values, kind="gauge")
+
+
+def _histogram(lines, name, help_text, label_names, buckets, values: dict):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for key in sorted(values):
+        histogram = values[key]
+        cumulative = 0
+        for bound, count in zip(buckets + ("+Inf",), histogram):
+            cumulative += count
+            le = 'le="%s"' % (bound if bound == "+Inf" else _number(float(bound)))
+            lines.append(f"{name}_bucket{_labels(label_names, key, le)} {cumulative}")
+        lines.append(f"{name}_sum{_labels(label_names, key)} {_number(histogram[-2])}")
+        lines.append(f"{name}_count{_labels(label_names, key)} {histogram[-1]}")
+
+
+registry = MetricsRegistry()
+
+
+def instrument_engine(engine, name: str, metrics: MetricsRegistry = registry):
+    """Registrar los eventos de consulta y de checkout del pool de un engine (síncrono o asíncrono)"""
+    engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["metrics_query_start"].pop()
+        metrics.query_finished(name, time.perf_counter() - started)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        # La consulta fallida no llega a after_cursor_execute
+        stack = context.connection.info.get("metrics_query_start") if context.connection is not None else None
+        if stack:
+            metrics.query_finished(name, time.perf_counter() - stack.pop())
+
+    @event.listens_for(engine, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.checkout(name)
+
+
+class MetricsMiddleware:
+    """Middleware ASGI que mide latencia, peticiones en curso y consultas por ruta"""
+
+    def __init__(self, app, metrics: MetricsRegistry = registry):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        key = (scope["method"], self.metrics.route_for(scope["app"], scope))
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        db_stats = [0, 0.0]
+        token = _request_db.set(db_stats)
+        self.metrics.request_started(key)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self.metrics.request_finished(key, status, time.perf_counter() - started, *db_stats)
+            _request_db.reset(token)
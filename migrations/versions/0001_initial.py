@@ -0,0 +1,122 @@
+"""Esquema inicial (tablas tal como las creaba Base.metadata.create_all)
+
+Revision ID: 0001_initial
+Revises:
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001_initial'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('email', sa.String(length=100), nullable=False),
+        sa.Column('password', sa.String(length=255), nullable=True),
+        sa.Column('google_id', sa.String(length=255), nullable=True),
+        sa.Column('image', sa.String(length=255), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+    op.create_index('ix_users_id', 'users', ['id'], unique=False)
+
+    op.create_table(
+        'courses',
+        sa.Column('id', sa.String(length=20), nullable=False),
+        sa.Column('title', sa.String(length=100), nullable=False),
+        sa.Column('description', sa.Text(), nullable=False),
+        sa.Column('icon', sa.String(length=50), nullable=False),
+        sa.Column('color_class', sa.String(length=50), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_courses_id', 'courses', ['id'], unique=False)
+
+    op.create_table(
+        'modules',
+        sa.Column('id', sa.String(length=50), nullable=False),
+        sa.Column('course_id', sa.String(length=20), nullable=False),
+        sa.Column('title', sa.String(length=100), nullable=False),
+        sa.Column('description', sa.Text(), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['course_id'], ['courses.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_modules_id', 'modules', ['id'], unique=False)
+
+    op.create_table(
+        'lessons',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('module_id', sa.String(length=50), nullable=False),
+        sa.Column('title', sa.String(length=100), nullable=False),
+        sa.Column('theory', sa.Text(), nullable=False),
+        sa.Column('practice_instructions', sa.Text(), nullable=False),
+        sa.Column('practice_initial_code', sa.Text(), nullable=False),
+        sa.Column('practice_solution', sa.Text(), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['module_id'], ['modules.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_lessons_id', 'lessons', ['id'], unique=False)
+
+    op.create_table(
+        'user_progress',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('module_id', sa.String(length=50), nullable=False),
+        sa.Column('completed', sa.Boolean(), nullable=True),
+        sa.Column('completion_date', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['module_id'], ['modules.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_user_progress_id', 'user_progress', ['id'], unique=False)
+
+    op.create_table(
+        'exercise_attempts',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('lesson_id', sa.Integer(), nullable=False),
+        sa.Column('code_submitted', sa.Text(), nullable=False),
+        sa.Column('is_correct', sa.Boolean(), nullable=False),
+        sa.Column('attempt_date', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['lesson_id'], ['lessons.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_exercise_attempts_id', 'exercise_attempts', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_exercise_attempts_id', table_name='exercise_attempts')
+    op.drop_table('exercise_attempts')
+    op.drop_index('ix_user_progress_id', table_name='user_progress')
+    op.drop_table('user_progress')
+    op.drop_index('ix_lessons_id', table_name='lessons')
+    op.drop_table('lessons')
+    op.drop_index('ix_modules_id', table_name='modules')
+    op.drop_table('modules')
+    op.drop_index('ix_courses_id', table_name='courses')
+    op.drop_table('courses')
+    op.drop_index('ix_users_id', table_name='users')
+    op.drop_index('ix_users_email', table_name='users')
+    op.drop_table('users')
@@ -0,0 +1,88 @@
+"""Índices compuestos para las consultas más frecuentes y unicidad de (user_id, module_id)
+
+Revision ID: 0002_hot_query_indexes
+Revises: 0001_initial
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+import logging
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_hot_query_indexes'
+down_revision = '0001_initial'
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+
+# Grupos (user_id, module_id) con más de un registro; la tabla derivada obliga a MySQL a
+# materializar la subconsulta sobre la misma tabla que se modifica
+_DUPLICATES = (
+    "SELECT user_id, module_id, MIN(id) AS keep_id, MAX(completed) AS completed, "
+    "MAX(completion_date) AS completion_date FROM user_progress "
+    "GROUP BY user_id, module_id HAVING COUNT(*) > 1"
+)
+
+
+def _merge_duplicate_progress() -> None:
+    """Fusionar el progreso duplicado de (user_id, module_id) en su registro más antiguo.
+
+    El registro conservado queda completado si alguno de los duplicados lo estaba y con la
+    fecha de completado más reciente; después se borran los demás.
+    """
+    if not context.is_offline_mode():
+        duplicated = op.get_bind().execute(sa.text(
+            "SELECT COUNT(*) FROM user_progress WHERE id NOT IN ("
+            "SELECT keep_id FROM (SELECT MIN(id) AS keep_id FROM user_progress GROUP BY user_id, module_id) AS keep)"
+        )).scalar()
+        logger.info("user_progress: %d registros duplicados se fusionan con su registro más antiguo", duplicated)
+
+    for column in ("completed", "completion_date"):
+        op.execute(
+            f"UPDATE user_progress SET {column} = ("
+            f"SELECT d.{column} FROM ({_DUPLICATES}) AS d WHERE d.keep_id = user_progress.id) "
+            f"WHERE id IN (SELECT keep_id FROM ({_DUPLICATES}) AS d)"
+        )
+    op.execute(
+        "DELETE FROM user_progress WHERE id NOT IN ("
+        "SELECT id FROM (SELECT MIN(id) AS id FROM user_progress GROUP BY user_id, module_id) AS keep)"
+    )
+
+
+def upgrade() -> None:
+    # Fusionar el progreso duplicado antes de exigir unicidad
+    _merge_duplicate_progress()
+    op.create_index('uq_user_progress_user_module', 'user_progress', ['user_id', 'module_id'], unique=True)
+    op.create_index('ix_user_progress_user_completed', 'user_progress', ['user_id', 'completed'])
+    op.create_index('ix_user_progress_module_completed', 'user_progress', ['module_id', 'completed'])
+    op.create_index('ix_user_progress_completed', 'user_progress', ['completed'])
+    op.create_index('ix_user_progress_completion_date', 'user_progress', ['completion_date'])
+
+    op.create_index('ix_exercise_attempts_user_lesson_date', 'exercise_attempts', ['user_id', 'lesson_id', 'attempt_date'])
+    op.create_index('ix_exercise_attempts_user_id_id', 'exercise_attempts', ['user_id', 'id'])
+    op.create_index('ix_exercise_attempts_lesson_id', 'exercise_attempts', ['lesson_id'])
+    op.create_index('ix_exercise_attempts_attempt_date', 'exercise_attempts', ['attempt_date'])
+
+    op.create_index('ix_modules_course_position', 'modules', ['course_id', 'position'])
+    op.create_index('ix_lessons_module_position', 'lessons', ['module_id', 'position'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_lessons_module_position', table_name='lessons')
+    op.drop_index('ix_modules_course_position', table_name='modules')
+
+    op.drop_index('ix_exercise_attempts_attempt_date', table_name='exercise_attempts')
+    op.drop_index('ix_exercise_attempts_lesson_id', table_name='exercise_attempts')
+    op.drop_index('ix_exercise_attempts_user_id_id', table_name='exercise_attempts')
+    op.drop_index('ix_exercise_attempts_user_lesson_date', table_name='exercise_attempts')
+
+    op.drop_index('ix_user_progress_completion_date', table_name='user_progress')
+    op.drop_index('ix_user_progress_completed', table_name='user_progress')
+    op.drop_index('ix_user_progress_module_completed', table_name='user_progress')
+    op.drop_index('ix_user_progress_user_completed', table_name='user_progress')
+    op.drop_index('uq_user_progress_user_module', table_name='user_progress')
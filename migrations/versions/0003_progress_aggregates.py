@@ -0,0 +1,56 @@
+"""Contadores de progreso por usuario y por usuario y curso
+
+Revision ID: 0003_progress_aggregates
+Revises: 0002_hot_query_indexes
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_progress_aggregates'
+down_revision = '0002_hot_query_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'user_progress_summary',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('modules_started', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('modules_completed', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id'),
+    )
+    op.create_table(
+        'user_course_progress',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('course_id', sa.String(length=20), nullable=False),
+        sa.Column('modules_started', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('modules_completed', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['course_id'], ['courses.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'course_id'),
+    )
+
+    # Rellenar los contadores con el progreso existente
+    op.execute(
+        "INSERT INTO user_progress_summary (user_id, modules_started, modules_completed) "
+        "SELECT user_id, COUNT(*), SUM(CASE WHEN completed THEN 1 ELSE 0 END) "
+        "FROM user_progress GROUP BY user_id"
+    )
+    op.execute(
+        "INSERT INTO user_course_progress (user_id, course_id, modules_started, modules_completed) "
+        "SELECT p.user_id, m.course_id, COUNT(*), SUM(CASE WHEN p.completed THEN 1 ELSE 0 END) "
+        "FROM user_progress p JOIN modules m ON m.id = p.module_id GROUP BY p.user_id, m.course_id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('user_course_progress')
+    op.drop_table('user_progress_summary')
@@ -0,0 +1,78 @@
+"""Código enviado deduplicado y comprimido en code_blobs
+
+Revision ID: 0004_code_blobs
+Revises: 0003_progress_aggregates
+Create Date: 2026-10-17 00:00:00.000000
+
+Solo cambia el esquema: los intentos existentes conservan su código en
+exercise_attempts.code_submitted y se siguen leyendo de ahí. Para moverlos a
+code_blobs en lotes, sin bloquear la tabla, ejecutar scripts/migrate_code_blobs.py.
+"""
+import zlib
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004_code_blobs'
+down_revision = '0003_progress_aggregates'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'code_blobs',
+        sa.Column('hash', sa.String(length=64), nullable=False),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint('hash'),
+    )
+    with op.batch_alter_table('exercise_attempts') as batch_op:
+        batch_op.add_column(sa.Column('code_hash', sa.String(length=64), nullable=True))
+        batch_op.create_foreign_key('fk_exercise_attempts_code_hash', 'code_blobs', ['code_hash'], ['hash'])
+        batch_op.alter_column('code_submitted', existing_type=sa.Text(), nullable=True)
+
+
+# Intentos que se devuelven a exercise_attempts.code_submitted por transacción del downgrade
+DOWNGRADE_BATCH_SIZE = 1000
+
+
+def _restore_code_from_blobs() -> None:
+    """Descomprimir el código de code_blobs en exercise_attempts.code_submitted, por lotes de id"""
+    bind = op.get_bind()
+    select_batch = sa.text(
+        "SELECT a.id, b.data FROM exercise_attempts a JOIN code_blobs b ON b.hash = a.code_hash "
+        "WHERE a.code_submitted IS NULL AND a.id > :after_id ORDER BY a.id LIMIT :batch_size"
+    )
+    restore = sa.text("UPDATE exercise_attempts SET code_submitted = :code WHERE id = :attempt_id")
+    after_id = 0
+    while True:
+        rows = bind.execute(select_batch, {"after_id": after_id, "batch_size": DOWNGRADE_BATCH_SIZE}).all()
+        if not rows:
+            break
+        bind.execute(restore, [
+            {"attempt_id": attempt_id, "code": zlib.decompress(data).decode("utf-8")} for attempt_id, data in rows
+        ])
+        after_id = rows[-1][0]
+
+    missing = bind.execute(sa.text("SELECT COUNT(*) FROM exercise_attempts WHERE code_submitted IS NULL")).scalar()
+    if missing:
+        raise RuntimeError(
+            f"{missing} intentos no tienen código ni en code_submitted ni en code_blobs: "
+            "no se puede volver a exigir NOT NULL sin perder datos"
+        )
+
+
+def downgrade() -> None:
+    # El código de code_blobs está comprimido: solo se puede devolver desde Python, con conexión
+    if context.is_offline_mode():
+        raise RuntimeError("El downgrade de 0004_code_blobs necesita conexión: no admite --sql")
+    _restore_code_from_blobs()
+    with op.batch_alter_table('exercise_attempts') as batch_op:
+        batch_op.alter_column('code_submitted', existing_type=sa.Text(), nullable=False)
+        batch_op.drop_constraint('fk_exercise_attempts_code_hash', type_='foreignkey')
+        batch_op.drop_column('code_hash')
+    op.drop_table('code_blobs')
@@ -0,0 +1,52 @@
+"""Resumen de intentos por usuario y lección
+
+Revision ID: 0005_attempt_summaries
+Revises: 0004_code_blobs
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005_attempt_summaries'
+down_revision = '0004_code_blobs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'attempt_summaries',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('lesson_id', sa.Integer(), nullable=False),
+        sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('correct_attempts', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('first_attempt_date', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('first_correct_date', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_attempt_date', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_is_correct', sa.Boolean(), nullable=True),
+        sa.ForeignKeyConstraint(['lesson_id'], ['lessons.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'lesson_id'),
+    )
+
+    # Rellenar el resumen con los intentos existentes
+    op.execute(
+        "INSERT INTO attempt_summaries (user_id, lesson_id, attempts, correct_attempts, "
+        "first_attempt_date, first_correct_date, last_attempt_date) "
+        "SELECT user_id, lesson_id, COUNT(*), SUM(CASE WHEN is_correct THEN 1 ELSE 0 END), "
+        "MIN(attempt_date), MIN(CASE WHEN is_correct THEN attempt_date END), MAX(attempt_date) "
+        "FROM exercise_attempts GROUP BY user_id, lesson_id"
+    )
+    op.execute(
+        "UPDATE attempt_summaries SET last_is_correct = ("
+        "SELECT e.is_correct FROM exercise_attempts e "
+        "WHERE e.user_id = attempt_summaries.user_id AND e.lesson_id = attempt_summaries.lesson_id "
+        "ORDER BY e.attempt_date DESC, e.id DESC LIMIT 1)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('attempt_summaries')
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey
+import zlib
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Index, LargeBinary
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
@@ -31,7 +32,7 @@ class Course(Base):
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     # Relationships
-    modules = relationship("Module", back_populates="course")
+    modules = relationship("Module", back_populates="course", order_by="Module.position")
 
 class Module(Base):
     __tablename__ = "modules"
@@ -44,9 +45,13 @@ class Module(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
+    __table_args__ = (
+        Index("ix_modules_course_position", "course_id", "position"),
+    )
+    
     # Relationships
     course = relationship("Course", back_populates="modules")
-    lessons = relationship("Lesson", back_populates="module")
+    lessons = relationship("Lesson", back_populates="module", order_by="Lesson.position")
     progress = relationship("UserProgress", back_populates="module")
 
 class Lesson(Base):
@@ -63,6 +68,10 @@ class Lesson(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
+    __table_args__ = (
+        Index("ix_lessons_module_position", "module_id", "position"),
+    )
+    
     # Relationships
     module = relationship("Module", back_populates="lessons")
     attempts = relationship("ExerciseAttempt", back_populates="lesson")
@@ -78,20 +87,89 @@ class UserProgress(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
+    __table_args__ = (
+        # Un único registro de progreso por usuario y módulo
+        Index("uq_user_progress_user_module", "user_id", "module_id", unique=True),
+        Index("ix_user_progress_user_completed", "user_id", "completed"),
+        Index("ix_user_progress_module_completed", "module_id", "completed"),
+        Index("ix_user_progress_completed", "completed"),
+        Index("ix_user_progress_completion_date", "completion_date"),
+    )
+    
     # Relationships
     user = relationship("User", back_populates="progress")
     module = relationship("Module", back_populates="progress")
 
+class UserProgressSummary(Base):
+    """Contadores de progreso por usuario, mantenidos por los handlers de /progreso"""
+    __tablename__ = "user_progress_summary"
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    modules_started = Column(Integer, nullable=False, server_default="0")
+    modules_completed = Column(Integer, nullable=False, server_default="0")
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class UserCourseProgress(Base):
+    """Contadores de progreso por usuario y curso, mantenidos por los handlers de /progreso"""
+    __tablename__ = "user_course_progress"
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    course_id = Column(String(20), ForeignKey("courses.id", ondelete="CASCADE"), primary_key=True)
+    modules_started = Column(Integer, nullable=False, server_default="0")
+    modules_completed = Column(Integer, nullable=False, server_default="0")
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class CodeBlob(Base):
+    """Código enviado, comprimido con zlib y direccionado por su sha256 (se guarda una vez)"""
+    __tablename__ = "code_blobs"
+    
+    hash = Column(String(64), primary_key=True)
+    data = Column(LargeBinary, nullable=False)
+    size = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    @property
+    def text(self) -> str:
+        return zlib.decompress(self.data).decode("utf-8")
+
+class AttemptSummary(Base):
+    """Resumen de intentos por usuario y lección, mantenido al insertar intentos"""
+    __tablename__ = "attempt_summaries"
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    lesson_id = Column(Integer, ForeignKey("lessons.id", ondelete="CASCADE"), primary_key=True)
+    attempts = Column(Integer, nullable=False, server_default="0")
+    correct_attempts = Column(Integer, nullable=False, server_default="0")
+    first_attempt_date = Column(DateTime(timezone=True))
+    first_correct_date = Column(DateTime(timezone=True))
+    last_attempt_date = Column(DateTime(timezone=True))
+    last_is_correct = Column(Boolean)
+
 class ExerciseAttempt(Base):
     __tablename__ = "exercise_attempts"
     
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     lesson_id = Column(Integer, ForeignKey("lessons.id"), nullable=False)
-    code_submitted = Column(Text, nullable=False)
+    # Texto de los intentos anteriores a code_blobs; scripts/migrate_code_blobs.py lo mueve y lo deja en NULL
+    legacy_code = Column("code_submitted", Text, nullable=True)
+    code_hash = Column(String(64), ForeignKey("code_blobs.hash"), nullable=True)
     is_correct = Column(Boolean, nullable=False)
     attempt_date = Column(DateTime(timezone=True), server_default=func.now())
     
+    __table_args__ = (
+        Index("ix_exercise_attempts_user_lesson_date", "user_id", "lesson_id", "attempt_date"),
+        Index("ix_exercise_attempts_user_id_id", "user_id", "id"),
+        Index("ix_exercise_attempts_lesson_id", "lesson_id"),
+        Index("ix_exercise_attempts_attempt_date", "attempt_date"),
+    )
+    
     # Relationships
     user = relationship("User", back_populates="attempts")
     lesson = relationship("Lesson", back_populates="attempts")
+    # selectin: los blobs repetidos en una página se cargan una sola vez
+    code_blob = relationship("CodeBlob", lazy="selectin")
+    
+    @property
+    def code_submitted(self) -> str:
+        return self.code_blob.text if self.code_blob is not None else self.legacy_code
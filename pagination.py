@@ -0,0 +1,67 @@
+import base64
+import json
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, or_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(*values) -> str:
+    """Cursor opaco con los valores de la clave de la última fila devuelta"""
+    return base64.urlsafe_b64encode(json.dumps(list(values), separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except ValueError:
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Cursor de paginación inválido")
+    return values
+
+
+def keyset_condition(key_columns, cursor: str):
+    """Condición "después del cursor" sobre key_columns (None si no hay cursor)"""
+    if not cursor:
+        return None
+    values = decode_cursor(cursor, len(key_columns))
+    return _after(key_columns, values)
+
+
+def finish_page(rows, key_columns, limit: int, response: Response):
+    """Recortar la fila extra y, si existía, publicar el cursor de la siguiente página"""
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(*(getattr(last, c.key) for c in key_columns))
+    return rows
+
+
+def paginate(query, key_columns, cursor: str, limit: int, response: Response, skip: int = 0):
+    """Paginación por clave (keyset) ascendente sobre key_columns.
+
+    El coste de cada página es el mismo sin importar su profundidad: se filtra por
+    la clave de la última fila en lugar de usar OFFSET. Si hay más filas, la cabecera
+    X-Next-Cursor contiene el cursor de la siguiente página. skip se mantiene solo por
+    compatibilidad con clientes que aún paginan por OFFSET.
+    """
+    condition = keyset_condition(key_columns, cursor)
+    if condition is not None:
+        query = query.filter(condition)
+    query = query.order_by(*key_columns)
+    if skip:
+        query = query.offset(skip)
+    rows = query.limit(limit + 1).all()
+    return finish_page(rows, key_columns, limit, response)
+
+
+def _after(key_columns, values):
+    """(a, b) > (x, y) expandido como a > x OR (a = x AND b > y), que ambos motores indexan bien"""
+    column, value = key_columns[0], values[0]
+    if len(key_columns) == 1:
+        return column > value
+    return or_(column > value, and_(column == value, _after(key_columns[1:], values[1:])))
@@ -0,0 +1,121 @@
+"""Perfilador de SQL por petición (modo depuración, SQL_PROFILER_ENABLED).
+
+Registra cada sentencia ejecutada durante la petición mediante los eventos
+before/after_cursor_execute, añade a la respuesta las cabeceras X-DB-Queries y
+X-DB-Time (ms), escribe en el log las sentencias más lentas que SQL_SLOW_QUERY_MS con
+sus parámetros y la ruta, y avisa de las formas de sentencia repetidas al menos
+SQL_N_PLUS_ONE_THRESHOLD veces en la misma petición (consultas N+1).
+"""
+import logging
+import re
+import time
+from contextvars import ContextVar
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+from metrics import registry as metrics_registry
+
+logger = logging.getLogger(__name__)
+
+QUERIES_HEADER = "X-DB-Queries"
+TIME_HEADER = "X-DB-Time"
+REPEATED_HEADER = "X-DB-Repeated"
+
+# Longitud máxima de los parámetros en el log
+MAX_PARAMETERS_LENGTH = 500
+
+_PLACEHOLDER = r"(?:\?|%s|%\(\w+\)s|:\w+)"
+# IN (?, ?, ?) y VALUES (?, ?), (?, ?) dan la misma forma sin importar el número de elementos
+_IN_LIST = re.compile(r"\(\s*" + _PLACEHOLDER + r"(?:\s*,\s*" + _PLACEHOLDER + r")*\s*\)")
+_VALUES_LIST = re.compile(r"(\(\?\))(?:\s*,\s*\(\?\))+")
+_SPACES = re.compile(r"\s+")
+
+_current = ContextVar("sql_profile", default=None)
+
+
+def statement_shape(statement: str) -> str:
+    shape = _SPACES.sub(" ", statement).strip()
+    shape = _IN_LIST.sub("(?)", shape)
+    return _VALUES_LIST.sub(r"\1", shape)
+
+
+class RequestProfile:
+    """Sentencias de una petición: recuento y tiempo por forma"""
+
+    def __init__(self, method: str, route: str):
+        self.method = method
+        self.route = route
+        self.queries = 0
+        self.seconds = 0.0
+        self.shapes = {}
+
+    def record(self, statement: str, seconds: float):
+        self.queries += 1
+        self.seconds += seconds
+        shape = statement_shape(statement)
+        self.shapes[shape] = self.shapes.get(shape, 0) + 1
+
+    def repeated(self, threshold: int) -> dict:
+        return {shape: count for shape, count in self.shapes.items() if count >= threshold}
+
+
+def instrument_engine(engine, slow_seconds: float):
+    """Registrar el perfilado en un engine (síncrono o asíncrono)"""
+    engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("profiler_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - conn.info["profiler_query_start"].pop()
+        profile = _current.get()
+        if profile is not None:
+            profile.record(statement, seconds)
+        if seconds >= slow_seconds:
+            where = f"{profile.method} {profile.route}" if profile is not None else "fuera de petición"
+            logger.warning(
+                "Consulta lenta (%.1f ms) en %s: %s | parámetros: %s",
+                seconds * 1000, where, _SPACES.sub(" ", statement).strip(), repr(parameters)[:MAX_PARAMETERS_LENGTH],
+            )
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        stack = context.connection.info.get("profiler_query_start") if context.connection is not None else None
+        if stack:
+            stack.pop()
+
+
+class ProfilerMiddleware:
+    """Middleware ASGI que abre un RequestProfile por petición y publica su resumen"""
+
+    def __init__(self, app, n_plus_one_threshold: int = 5):
+        self.app = app
+        self.threshold = n_plus_one_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        profile = RequestProfile(scope["method"], metrics_registry.route_for(scope["app"], scope))
+
+        async def send_with_summary(message):
+            if message["type"] == "http.response.start":
+                # Las consultas posteriores (respuestas en streaming) solo aparecen en el log
+                headers = MutableHeaders(scope=message)
+                headers[QUERIES_HEADER] = str(profile.queries)
+                headers[TIME_HEADER] = f"{profile.seconds * 1000:.3f}"
+                repeated = profile.repeated(self.threshold)
+                if repeated:
+                    headers[REPEATED_HEADER] = str(max(repeated.values()))
+            await send(message)
+
+        token = _current.set(profile)
+        try:
+            await self.app(scope, receive, send_with_summary)
+        finally:
+            _current.reset(token)
+            for shape, count in profile.repeated(self.threshold).items():
+                logger.warning(
+                    "Posible N+1 en %s %s: %s ejecuciones de %s", profile.method, profile.route, count, shape,
+                )
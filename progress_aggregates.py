@@ -0,0 +1,60 @@
+from sqlalchemy import case, delete, func, insert, select
+from sqlalchemy.orm import Session
+from models import Module, UserProgress, UserProgressSummary, UserCourseProgress
+from upsert import increment_counters
+
+_summary = UserProgressSummary.__table__
+_per_course = UserCourseProgress.__table__
+
+
+def apply_progress_deltas(db: Session, deltas: dict):
+    """Actualizar los contadores dentro de la transacción de db.
+
+    deltas: {(user_id, course_id): (modulos_iniciados, modulos_completados)}
+    """
+    per_course = [
+        {"user_id": user_id, "course_id": course_id, "modules_started": started, "modules_completed": completed}
+        for (user_id, course_id), (started, completed) in deltas.items() if started or completed
+    ]
+    if not per_course:
+        return
+    per_user = {}
+    for row in per_course:
+        total = per_user.setdefault(row["user_id"], {"user_id": row["user_id"], "modules_started": 0, "modules_completed": 0})
+        total["modules_started"] += row["modules_started"]
+        total["modules_completed"] += row["modules_completed"]
+    increment_counters(db, _summary, list(per_user.values()), ["user_id"])
+    increment_counters(db, _per_course, per_course, ["user_id", "course_id"])
+
+
+def apply_progress_delta(db: Session, user_id: int, course_id: str, started: int, completed: int):
+    """Actualizar los contadores de un usuario y curso dentro de la transacción de db"""
+    apply_progress_deltas(db, {(user_id, course_id): (started, completed)})
+
+
+def module_course_id(db: Session, module_id: str):
+    return db.query(Module.course_id).filter(Module.id == module_id).scalar()
+
+
+def rebuild_aggregates(db: Session, user_ids=None):
+    """Recalcular los contadores desde user_progress (todos los usuarios o solo user_ids)"""
+    started = func.count(UserProgress.id)
+    completed = func.coalesce(func.sum(case((UserProgress.completed == True, 1), else_=0)), 0)  # noqa: E712
+    por_usuario = select(UserProgress.user_id, started, completed).group_by(UserProgress.user_id)
+    por_curso = select(UserProgress.user_id, Module.course_id, started, completed).join(
+        Module, Module.id == UserProgress.module_id
+    ).group_by(UserProgress.user_id, Module.course_id)
+    borrar_usuario, borrar_curso = delete(_summary), delete(_per_course)
+    if user_ids is not None:
+        user_ids = list(user_ids)
+        por_usuario = por_usuario.where(UserProgress.user_id.in_(user_ids))
+        por_curso = por_curso.where(UserProgress.user_id.in_(user_ids))
+        borrar_usuario = borrar_usuario.where(_summary.c.user_id.in_(user_ids))
+        borrar_curso = borrar_curso.where(_per_course.c.user_id.in_(user_ids))
+    db.execute(borrar_usuario)
+    db.execute(borrar_curso)
+    db.execute(insert(_summary).from_select(["user_id", "modules_started", "modules_completed"], por_usuario))
+    db.execute(insert(_per_course).from_select(
+        ["user_id", "course_id", "modules_started", "modules_completed"], por_curso
+    ))
+
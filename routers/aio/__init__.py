@@ -0,0 +1,11 @@
+"""Routers CRUD para DB_ASYNC: mismas rutas que routers/ con handlers async def.
+
+Las escrituras (y las lecturas sin caché) ejecutan el handler síncrono de routers/
+con AsyncSession.run_sync, así que la lógica vive en un solo sitio. Las lecturas del
+catálogo usan cached_async con los mismos loaders que cached.
+"""
+
+
+async def run_sync(db, endpoint, *args, **kwargs):
+    """Ejecutar el handler síncrono endpoint con la Session síncrona de db"""
+    return await db.run_sync(lambda session: endpoint(*args, db=session, **kwargs))
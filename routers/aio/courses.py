@@ -0,0 +1,59 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from database import get_async_db, get_async_read_db
+from schemas import Course as CourseSchema, CourseCreate, CourseUpdate, CourseTree
+from functools import partial
+from catalog_cache import (
+    cached_async, course_key, course_tree_key, COURSES_KEY, load_courses, load_course, load_course_tree,
+)
+from conditional import conditional_response
+from routers import courses
+from routers.aio import run_sync
+
+router = APIRouter(prefix="/cursos", tags=["📚 Cursos"])
+
+@router.get("/", response_model=List[CourseSchema], summary="Obtener todos los cursos")
+async def obtener_cursos(request: Request, response: Response, db: AsyncSession = Depends(get_async_read_db)):
+    """Obtener lista de todos los cursos disponibles"""
+    cursos = await cached_async(COURSES_KEY, load_courses, db)
+    return conditional_response(request, response, COURSES_KEY, cursos)
+
+@router.get("/{course_id}", response_model=CourseSchema, summary="Obtener curso por ID")
+async def obtener_curso(
+    course_id: str, request: Request, response: Response, db: AsyncSession = Depends(get_async_read_db)
+):
+    """Obtener información de un curso específico por su ID"""
+    curso = await cached_async(course_key(course_id), partial(load_course, course_id=course_id), db)
+    if curso is None:
+        raise HTTPException(status_code=404, detail="Curso no encontrado")
+    return conditional_response(request, response, course_key(course_id), curso)
+
+@router.get("/{course_id}/arbol", response_model=CourseTree, summary="Obtener árbol del curso")
+async def obtener_arbol_curso(
+    course_id: str, request: Request, response: Response, db: AsyncSession = Depends(get_async_read_db)
+):
+    """Obtener el curso con sus módulos y lecciones ordenados por posición en una sola petición"""
+    arbol = await cached_async(course_tree_key(course_id), partial(load_course_tree, course_id=course_id), db)
+    if arbol is None:
+        raise HTTPException(status_code=404, detail="Curso no encontrado")
+    return conditional_response(request, response, course_tree_key(course_id), arbol)
+
+@router.post("/", response_model=CourseSchema, summary="Crear nuevo curso")
+async def crear_curso(curso: CourseCreate, db: AsyncSession = Depends(get_async_db)):
+    """Crear un nuevo curso (sin autenticación requerida)"""
+    return await run_sync(db, courses.crear_curso, curso)
+
+@router.put("/{course_id}", response_model=CourseSchema, summary="Actualizar curso")
+async def actualizar_curso(
+    course_id: str, 
+    course_update: CourseUpdate, 
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Actualizar información de cualquier curso (sin autenticación requerida)"""
+    return await run_sync(db, courses.actualizar_curso, course_id, course_update)
+
+@router.delete("/{course_id}", summary="Eliminar curso")
+async def eliminar_curso(course_id: str, db: AsyncSession = Depends(get_async_db)):
+    """Eliminar cualquier curso del sistema (sin autenticación requerida)"""
+    return await run_sync(db, courses.eliminar_curso, course_id)
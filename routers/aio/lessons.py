@@ -0,0 +1,67 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Union
+from database import get_async_db, get_async_read_db
+from schemas import Lesson as LessonSchema, LessonCreate, LessonUpdate, LessonSummary
+from functools import partial
+from catalog_cache import (
+    cached_async, lesson_key, module_lessons_key, module_lessons_summary_key, load_lesson, load_module_lessons,
+    load_module_lessons_summary,
+)
+from conditional import conditional_response
+from routers import lessons
+from routers.aio import run_sync
+
+router = APIRouter(prefix="/lecciones", tags=["📖 Lecciones"])
+
+@router.get(
+    "/modulos/{module_id}/lecciones/",
+    response_model=List[Union[LessonSchema, LessonSummary]],
+    summary="Obtener lecciones de un módulo",
+)
+async def obtener_lecciones_modulo(
+    module_id: str,
+    request: Request,
+    response: Response,
+    resumen: bool = Query(False, description="Solo id, título y posición, sin teoría ni código"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Obtener todas las lecciones de un módulo específico"""
+    if resumen:
+        key, loader = module_lessons_summary_key(module_id), load_module_lessons_summary
+    else:
+        key, loader = module_lessons_key(module_id), load_module_lessons
+    # None indica que el módulo no existe
+    lecciones = await cached_async(key, partial(loader, module_id=module_id), db)
+    if lecciones is None:
+        raise HTTPException(status_code=404, detail="Módulo no encontrado")
+    return conditional_response(request, response, key, lecciones)
+
+@router.get("/{lesson_id}", response_model=LessonSchema, summary="Obtener lección por ID")
+async def obtener_leccion(
+    lesson_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_read_db)
+):
+    """Obtener información de una lección específica por su ID"""
+    leccion = await cached_async(lesson_key(lesson_id), partial(load_lesson, lesson_id=lesson_id), db)
+    if leccion is None:
+        raise HTTPException(status_code=404, detail="Lección no encontrada")
+    return conditional_response(request, response, lesson_key(lesson_id), leccion)
+
+@router.post("/", response_model=LessonSchema, summary="Crear nueva lección")
+async def crear_leccion(leccion: LessonCreate, db: AsyncSession = Depends(get_async_db)):
+    """Crear una nueva lección (sin autenticación requerida)"""
+    return await run_sync(db, lessons.crear_leccion, leccion)
+
+@router.put("/{lesson_id}", response_model=LessonSchema, summary="Actualizar lección")
+async def actualizar_leccion(
+    lesson_id: int, 
+    lesson_update: LessonUpdate, 
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Actualizar información de cualquier lección (sin autenticación requerida)"""
+    return await run_sync(db, lessons.actualizar_leccion, lesson_id, lesson_update)
+
+@router.delete("/{lesson_id}", summary="Eliminar lección")
+async def eliminar_leccion(lesson_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Eliminar cualquier lección del sistema (sin autenticación requerida)"""
+    return await run_sync(db, lessons.eliminar_leccion, lesson_id)
@@ -0,0 +1,54 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from database import get_async_db, get_async_read_db
+from schemas import Module as ModuleSchema, ModuleCreate, ModuleUpdate
+from functools import partial
+from catalog_cache import (
+    cached_async, module_key, course_modules_key, load_module, load_course_modules,
+)
+from conditional import conditional_response
+from routers import modules
+from routers.aio import run_sync
+
+router = APIRouter(prefix="/modulos", tags=["🧩 Módulos"])
+
+@router.get("/cursos/{course_id}/modulos/", response_model=List[ModuleSchema], summary="Obtener módulos de un curso")
+async def obtener_modulos_curso(
+    course_id: str, request: Request, response: Response, db: AsyncSession = Depends(get_async_read_db)
+):
+    """Obtener todos los módulos de un curso específico"""
+    # None indica que el curso no existe
+    modulos = await cached_async(course_modules_key(course_id), partial(load_course_modules, course_id=course_id), db)
+    if modulos is None:
+        raise HTTPException(status_code=404, detail="Curso no encontrado")
+    return conditional_response(request, response, course_modules_key(course_id), modulos)
+
+@router.get("/{module_id}", response_model=ModuleSchema, summary="Obtener módulo por ID")
+async def obtener_modulo(
+    module_id: str, request: Request, response: Response, db: AsyncSession = Depends(get_async_read_db)
+):
+    """Obtener información de un módulo específico por su ID"""
+    modulo = await cached_async(module_key(module_id), partial(load_module, module_id=module_id), db)
+    if modulo is None:
+        raise HTTPException(status_code=404, detail="Módulo no encontrado")
+    return conditional_response(request, response, module_key(module_id), modulo)
+
+@router.post("/", response_model=ModuleSchema, summary="Crear nuevo módulo")
+async def crear_modulo(modulo: ModuleCreate, db: AsyncSession = Depends(get_async_db)):
+    """Crear un nuevo módulo (sin autenticación requerida)"""
+    return await run_sync(db, modules.crear_modulo, modulo)
+
+@router.put("/{module_id}", response_model=ModuleSchema, summary="Actualizar módulo")
+async def actualizar_modulo(
+    module_id: str, 
+    module_update: ModuleUpdate, 
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Actualizar información de cualquier módulo (sin autenticación requerida)"""
+    return await run_sync(db, modules.actualizar_modulo, module_id, module_update)
+
+@router.delete("/{module_id}", summary="Eliminar módulo")
+async def eliminar_modulo(module_id: str, db: AsyncSession = Depends(get_async_db)):
+    """Eliminar cualquier módulo del sistema (sin autenticación requerida)"""
+    return await run_sync(db, modules.eliminar_modulo, module_id)
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from database import get_async_db, get_async_read_db
+from schemas import User as UserSchema, UserUpdate
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from routers import users
+from routers.aio import run_sync
+
+router = APIRouter(prefix="/usuarios", tags=["👤 Usuarios"])
+
+@router.get("/", response_model=List[UserSchema], summary="Obtener todos los usuarios")
+async def obtener_usuarios(
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Cursor de la siguiente página (cabecera X-Next-Cursor)"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Obtener lista de los usuarios registrados, paginada por id"""
+    return await run_sync(db, users.obtener_usuarios, response, cursor, limit)
+
+@router.get("/{user_id}", response_model=UserSchema, summary="Obtener usuario por ID")
+async def obtener_usuario(user_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    """Obtener información de un usuario específico por su ID"""
+    return await run_sync(db, users.obtener_usuario, user_id)
+
+@router.put("/{user_id}", response_model=UserSchema, summary="Actualizar usuario")
+async def actualizar_usuario(
+    user_id: int, 
+    user_update: UserUpdate, 
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Actualizar información de cualquier usuario (sin restricciones de seguridad)"""
+    return await run_sync(db, users.actualizar_usuario, user_id, user_update)
+
+@router.delete("/{user_id}", summary="Eliminar usuario")
+async def eliminar_usuario(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Eliminar cualquier usuario del sistema (sin restricciones de seguridad)"""
+    return await run_sync(db, users.eliminar_usuario, user_id)
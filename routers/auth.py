@@ -1,18 +1,31 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from datetime import timedelta
 from database import get_db
 from models import User
 from schemas import UserCreate, UserLogin, Token, User as UserSchema
-from auth import get_password_hash, verify_password, create_access_token, get_current_user, ACCESS_TOKEN_EXPIRE_MINUTES
+from auth import get_password_hash, verify_password_and_update, create_user_access_token, get_current_user, invalidate_user, ACCESS_TOKEN_EXPIRE_MINUTES
 
 router = APIRouter(prefix="/auth", tags=["🔐 Autenticación"])
 
+# Los handlers que hashean son async: mientras bcrypt trabaja en el pool de procesos no
+# ocupan un hilo del threadpool; las consultas (síncronas) sí se ejecutan en él.
+
+def _find_user(db: Session, email: str):
+    return db.query(User).filter(User.email == email).first()
+
+def _save(db: Session, user: User):
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
 @router.post("/register", response_model=UserSchema, summary="Registrar nuevo usuario")
-def register(user: UserCreate, db: Session = Depends(get_db)):
+async def register(user: UserCreate, db: Session = Depends(get_db)):
     """Registrar un nuevo usuario en el sistema"""
     # Verificar si el usuario ya existe
-    db_user = db.query(User).filter(User.email == user.email).first()
+    db_user = await run_in_threadpool(_find_user, db, user.email)
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -20,33 +33,35 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Crear nuevo usuario
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash(user.password)
     db_user = User(
         name=user.name,
         email=user.email,
         password=hashed_password
     )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    return db_user
+    return await run_in_threadpool(_save, db, db_user)
 
 @router.post("/login", response_model=Token, summary="Iniciar sesión")
-def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
+async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
     """Iniciar sesión con email y contraseña"""
-    user = db.query(User).filter(User.email == user_credentials.email).first()
+    user = await run_in_threadpool(_find_user, db, user_credentials.email)
     
-    if not user or not verify_password(user_credentials.password, user.password):
+    valid, new_hash = await verify_password_and_update(user_credentials.password, user.password) if user else (False, None)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Correo electrónico o contraseña incorrectos",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Regenerar el hash si cambió el coste de bcrypt configurado (conserva la sal y la versión del token)
+    if new_hash:
+        user.password = new_hash
+        await run_in_threadpool(_save, db, user)
+        invalidate_user(user.id)
+    
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
-    )
+    access_token = create_user_access_token(user, expires_delta=access_token_expires)
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.get("/me", response_model=UserSchema, summary="Obtener información del usuario actual")
@@ -1,25 +1,38 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from typing import List
-from database import get_db
+from database import get_db, get_read_db
 from models import Course
-from schemas import Course as CourseSchema, CourseCreate, CourseUpdate
+from schemas import Course as CourseSchema, CourseCreate, CourseUpdate, CourseTree
+from functools import partial
+from catalog_cache import (
+    cached, invalidate_course, course_key, course_tree_key, COURSES_KEY, load_courses, load_course, load_course_tree,
+)
+from conditional import conditional_response
 
 router = APIRouter(prefix="/cursos", tags=["📚 Cursos"])
 
 @router.get("/", response_model=List[CourseSchema], summary="Obtener todos los cursos")
-def obtener_cursos( db: Session = Depends(get_db)):
+def obtener_cursos(request: Request, response: Response, db: Session = Depends(get_read_db)):
     """Obtener lista de todos los cursos disponibles"""
-    cursos = db.query(Course).all()
-    return cursos
+    cursos = cached(COURSES_KEY, load_courses, db)
+    return conditional_response(request, response, COURSES_KEY, cursos)
 
 @router.get("/{course_id}", response_model=CourseSchema, summary="Obtener curso por ID")
-def obtener_curso(course_id: str, db: Session = Depends(get_db)):
+def obtener_curso(course_id: str, request: Request, response: Response, db: Session = Depends(get_read_db)):
     """Obtener información de un curso específico por su ID"""
-    curso = db.query(Course).filter(Course.id == course_id).first()
+    curso = cached(course_key(course_id), partial(load_course, course_id=course_id), db)
     if curso is None:
         raise HTTPException(status_code=404, detail="Curso no encontrado")
-    return curso
+    return conditional_response(request, response, course_key(course_id), curso)
+
+@router.get("/{course_id}/arbol", response_model=CourseTree, summary="Obtener árbol del curso")
+def obtener_arbol_curso(course_id: str, request: Request, response: Response, db: Session = Depends(get_read_db)):
+    """Obtener el curso con sus módulos y lecciones ordenados por posición en una sola petición"""
+    arbol = cached(course_tree_key(course_id), partial(load_course_tree, course_id=course_id), db)
+    if arbol is None:
+        raise HTTPException(status_code=404, detail="Curso no encontrado")
+    return conditional_response(request, response, course_tree_key(course_id), arbol)
 
 @router.post("/", response_model=CourseSchema, summary="Crear nuevo curso")
 def crear_curso(curso: CourseCreate, db: Session = Depends(get_db)):
@@ -32,6 +45,7 @@ def crear_curso(curso: CourseCreate, db: Session = Depends(get_db)):
     db_curso = Course(**curso.dict())
     db.add(db_curso)
     db.commit()
+    invalidate_course(db_curso.id)
     db.refresh(db_curso)
     return db_curso
 
@@ -51,6 +65,7 @@ def actualizar_curso(
         setattr(curso, field, value)
     
     db.commit()
+    invalidate_course(course_id)
     db.refresh(curso)
     return curso
 
@@ -63,4 +78,5 @@ def eliminar_curso(course_id: str, db: Session = Depends(get_db)):
     
     db.delete(curso)
     db.commit()
+    invalidate_course(course_id)
     return {"mensaje": "Curso eliminado exitosamente"}
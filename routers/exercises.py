@@ -1,23 +1,48 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from database import get_db
-from models import ExerciseAttempt, Lesson, User
-from schemas import ExerciseAttempt as ExerciseAttemptSchema, ExerciseSubmission
+from sqlalchemy import select
+from functools import partial
+from typing import List, Optional, Literal
+from datetime import date, datetime, timedelta
+from database import get_db, get_read_db
+from models import AttemptSummary, CodeBlob, ExerciseAttempt, Lesson, User
+from schemas import (
+    ExerciseAttempt as ExerciseAttemptSchema, ExerciseAttemptAccepted, ExerciseSubmission,
+    AttemptSummary as AttemptSummarySchema,
+)
 from routers.auth import get_current_user
+from pagination import paginate, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from export import stream_export
+from fast_json import list_response
+from attempt_buffer import attempt_buffer, AttemptBufferFull
+from catalog_cache import cached, lesson_key, load_lesson
+from grader import grade, GradingOverloaded
+from code_store import store_code, decompress
+from attempt_rollup import record_attempts, forget_attempt
+from config import ATTEMPT_BUFFER_ENABLED, ATTEMPT_BUFFER_RETRY_AFTER_SECONDS, GRADER_TIMEOUT_SECONDS
 
 router = APIRouter(prefix="/ejercicios", tags=["🧪 Ejercicios / Intentos"])
 
-@router.post("/{lesson_id}/enviar", response_model=ExerciseAttemptSchema, summary="Enviar ejercicio")
+@router.post(
+    "/{lesson_id}/enviar",
+    response_model=ExerciseAttemptSchema,
+    responses={status.HTTP_202_ACCEPTED: {"model": ExerciseAttemptAccepted, "description": "Intento encolado (ATTEMPT_BUFFER_ENABLED)"}},
+    summary="Enviar ejercicio",
+)
 def enviar_ejercicio(
     lesson_id: int,
     submission: ExerciseSubmission,
     user_id: int,  # Ahora se pasa como parámetro en lugar de obtenerlo del token
     db: Session = Depends(get_db)
 ):
-    """Enviar un ejercicio para evaluación (sin autenticación requerida)"""
-    # Verificar que la lección existe
-    leccion = db.query(Lesson).filter(Lesson.id == lesson_id).first()
+    """Enviar un ejercicio para evaluación (sin autenticación requerida).
+    
+    Con ATTEMPT_BUFFER_ENABLED responde 202 sin id y el intento se guarda en el siguiente lote.
+    """
+    # La solución sale de la caché del catálogo: no se lee de la base de datos en cada envío
+    leccion = cached(lesson_key(lesson_id), partial(load_lesson, lesson_id=lesson_id), db)
     if leccion is None:
         raise HTTPException(status_code=404, detail="Lección no encontrada")
     
@@ -26,54 +51,142 @@ def enviar_ejercicio(
     if usuario is None:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
     
-    # Validación simple - verificar si el código enviado coincide con la solución
-    is_correct = submission.code_submitted.strip() == leccion.practice_solution.strip()
+    try:
+        is_correct = grade(lesson_id, submission.code_submitted, leccion.practice_solution)
+    except GradingOverloaded:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Demasiados ejercicios en corrección, reintenta en unos segundos",
+            headers={"Retry-After": str(GRADER_TIMEOUT_SECONDS)},
+        )
+    
+    if ATTEMPT_BUFFER_ENABLED:
+        intento = {
+            "user_id": user_id,
+            "lesson_id": lesson_id,
+            "code_submitted": submission.code_submitted,
+            "is_correct": is_correct,
+            "attempt_date": datetime.utcnow(),
+        }
+        try:
+            attempt_buffer.submit(intento)
+        except AttemptBufferFull:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Demasiados intentos pendientes de guardar, reintenta en unos segundos",
+                headers={"Retry-After": str(ATTEMPT_BUFFER_RETRY_AFTER_SECONDS)},
+            )
+        # JSONResponse propia: el response_model del decorador describe solo la respuesta 200
+        aceptado = ExerciseAttemptAccepted(**intento)
+        return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=jsonable_encoder(aceptado))
     
     # Crear intento de ejercicio
     intento = ExerciseAttempt(
         user_id=user_id,
         lesson_id=lesson_id,
-        code_submitted=submission.code_submitted,
-        is_correct=is_correct
+        code_hash=store_code(db, submission.code_submitted),
+        is_correct=is_correct,
+        attempt_date=datetime.utcnow(),
     )
     
     db.add(intento)
+    record_attempts(db, [{
+        "user_id": user_id, "lesson_id": lesson_id, "is_correct": is_correct, "attempt_date": intento.attempt_date,
+    }])
     db.commit()
     db.refresh(intento)
     return intento
 
 @router.get("/intentos", response_model=List[ExerciseAttemptSchema], summary="Obtener todos los intentos")
 def obtener_todos_intentos(
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Cursor de la siguiente página (cabecera X-Next-Cursor)"),
+    skip: int = Query(0, ge=0, description="Obsoleto: usar cursor"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     user_id: Optional[int] = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    """Obtener todos los intentos de ejercicios (opcionalmente filtrar por usuario)"""
+    """Obtener todos los intentos de ejercicios (opcionalmente filtrar por usuario), en orden de envío"""
     query = db.query(ExerciseAttempt)
     
     if user_id:
         query = query.filter(ExerciseAttempt.user_id == user_id)
     
-    intentos = query.offset(skip).limit(limit).all()
-    return intentos
+    # El id crece con attempt_date y evita comparar fechas con distinta precisión entre motores
+    intentos = paginate(query, (ExerciseAttempt.id,), cursor, limit, response, skip=skip)
+    return list_response(ExerciseAttemptSchema, intentos, response)
+
+@router.get("/intentos/exportar", summary="Exportar intentos (NDJSON/CSV)")
+def exportar_intentos(
+    request: Request,
+    formato: Literal["ndjson", "csv"] = "ndjson",
+    user_id: Optional[int] = None,
+    lesson_id: Optional[int] = None,
+    module_id: Optional[str] = None,
+    start_date: Optional[date] = Query(None, description="Fecha de inicio (YYYY-MM-DD)"),
+    end_date: Optional[date] = Query(None, description="Fecha de fin inclusive (YYYY-MM-DD)"),
+    incluir_codigo: bool = Query(False, description="Incluir el código enviado"),
+):
+    """Exportar intentos en streaming, con memoria constante sin importar el número de filas"""
+    columnas = [
+        ExerciseAttempt.id, ExerciseAttempt.user_id, ExerciseAttempt.lesson_id,
+        ExerciseAttempt.is_correct, ExerciseAttempt.attempt_date,
+    ]
+    query = select(*columnas)
+    if incluir_codigo:
+        # El código se descomprime al serializar; legacy_code cubre intentos aún sin migrar
+        query = query.add_columns(CodeBlob.data, ExerciseAttempt.legacy_code).outerjoin(
+            CodeBlob, CodeBlob.hash == ExerciseAttempt.code_hash
+        )
+    
+    if user_id is not None:
+        query = query.where(ExerciseAttempt.user_id == user_id)
+    if lesson_id is not None:
+        query = query.where(ExerciseAttempt.lesson_id == lesson_id)
+    if module_id is not None:
+        query = query.join(Lesson, Lesson.id == ExerciseAttempt.lesson_id).where(Lesson.module_id == module_id)
+    if start_date is not None:
+        query = query.where(ExerciseAttempt.attempt_date >= start_date)
+    if end_date is not None:
+        query = query.where(ExerciseAttempt.attempt_date < end_date + timedelta(days=1))
+    
+    if not incluir_codigo:
+        return stream_export(request, query.order_by(ExerciseAttempt.id), formato, "intentos")
+    nombres = [columna.key for columna in columnas] + ["code_submitted"]
+    return stream_export(
+        request, query.order_by(ExerciseAttempt.id), formato, "intentos", names=nombres,
+        transform=lambda fila: (*fila[:-2], decompress(fila[-2]) if fila[-2] is not None else fila[-1]),
+    )
+
+@router.get("/resumen", response_model=List[AttemptSummarySchema], summary="Resumen de intentos por lección")
+def obtener_resumen_intentos(user_id: int, db: Session = Depends(get_read_db)):
+    """Intentos, primera respuesta correcta y último intento de un usuario en cada lección"""
+    return db.query(AttemptSummary).filter(AttemptSummary.user_id == user_id).order_by(AttemptSummary.lesson_id).all()
+
+@router.get("/{lesson_id}/resumen", response_model=AttemptSummarySchema, summary="Resumen de intentos de una lección")
+def obtener_resumen_leccion(lesson_id: int, user_id: int, db: Session = Depends(get_read_db)):
+    """Intentos, primera respuesta correcta y último intento de un usuario en una lección"""
+    resumen = db.get(AttemptSummary, (user_id, lesson_id))
+    if resumen is None:
+        raise HTTPException(status_code=404, detail="No se encontraron intentos para esta lección")
+    return resumen
 
 @router.get("/{lesson_id}/ultimo-intento", response_model=ExerciseAttemptSchema, summary="Obtener último intento")
 def obtener_ultimo_intento(
     lesson_id: int,
     user_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Obtener el último intento de un usuario para una lección específica"""
     # Verificar que la lección existe
-    leccion = db.query(Lesson).filter(Lesson.id == lesson_id).first()
-    if leccion is None:
+    if cached(lesson_key(lesson_id), partial(load_lesson, lesson_id=lesson_id), db) is None:
         raise HTTPException(status_code=404, detail="Lección no encontrada")
     
+    # Una sola consulta por el índice (user_id, lesson_id, attempt_date)
     intento = db.query(ExerciseAttempt).filter(
         ExerciseAttempt.user_id == user_id,
         ExerciseAttempt.lesson_id == lesson_id
-    ).order_by(ExerciseAttempt.attempt_date.desc()).first()
+    ).order_by(ExerciseAttempt.attempt_date.desc(), ExerciseAttempt.id.desc()).first()
     
     if intento is None:
         raise HTTPException(status_code=404, detail="No se encontraron intentos para esta lección")
@@ -87,6 +200,7 @@ def eliminar_intento(attempt_id: int, db: Session = Depends(get_db)):
     if intento is None:
         raise HTTPException(status_code=404, detail="Intento no encontrado")
     
+    forget_attempt(db, intento)
     db.delete(intento)
     db.commit()
     return {"mensaje": "Intento eliminado exitosamente"}
@@ -1,30 +1,50 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, Query
 from sqlalchemy.orm import Session
-from typing import List
-from database import get_db
+from typing import List, Union
+from database import get_db, get_read_db
 from models import Lesson, Module
-from schemas import Lesson as LessonSchema, LessonCreate, LessonUpdate
+from schemas import Lesson as LessonSchema, LessonCreate, LessonUpdate, LessonSummary
+from functools import partial
+from catalog_cache import (
+    cached, invalidate_lesson, lesson_key, module_lessons_key, module_lessons_summary_key, load_lesson,
+    load_module_lessons, load_module_lessons_summary,
+)
+from conditional import conditional_response
 
 router = APIRouter(prefix="/lecciones", tags=["📖 Lecciones"])
 
-@router.get("/modulos/{module_id}/lecciones/", response_model=List[LessonSchema], summary="Obtener lecciones de un módulo")
-def obtener_lecciones_modulo(module_id: str, db: Session = Depends(get_db)):
+@router.get(
+    "/modulos/{module_id}/lecciones/",
+    response_model=List[Union[LessonSchema, LessonSummary]],
+    summary="Obtener lecciones de un módulo",
+)
+def obtener_lecciones_modulo(
+    module_id: str,
+    request: Request,
+    response: Response,
+    resumen: bool = Query(False, description="Solo id, título y posición, sin teoría ni código"),
+    db: Session = Depends(get_read_db)
+):
     """Obtener todas las lecciones de un módulo específico"""
-    # Verificar que el módulo existe
-    modulo = db.query(Module).filter(Module.id == module_id).first()
-    if modulo is None:
+    if resumen:
+        key, loader = module_lessons_summary_key(module_id), load_module_lessons_summary
+    else:
+        key, loader = module_lessons_key(module_id), load_module_lessons
+    # None indica que el módulo no existe
+    lecciones = cached(key, partial(loader, module_id=module_id), db)
+    if lecciones is None:
         raise HTTPException(status_code=404, detail="Módulo no encontrado")
-    
-    lecciones = db.query(Lesson).filter(Lesson.module_id == module_id).order_by(Lesson.position).all()
-    return lecciones
+    return conditional_response(request, response, key, lecciones)
 
 @router.get("/{lesson_id}", response_model=LessonSchema, summary="Obtener lección por ID")
-def obtener_leccion(lesson_id: int, db: Session = Depends(get_db)):
+def obtener_leccion(
+    lesson_id: int, request: Request, response: Response, db: Session = Depends(get_read_db)
+):
     """Obtener información de una lección específica por su ID"""
-    leccion = db.query(Lesson).filter(Lesson.id == lesson_id).first()
+    leccion = cached(lesson_key(lesson_id), partial(load_lesson, lesson_id=lesson_id), db)
     if leccion is None:
         raise HTTPException(status_code=404, detail="Lección no encontrada")
-    return leccion
+    return conditional_response(request, response, lesson_key(lesson_id), leccion)
 
 @router.post("/", response_model=LessonSchema, summary="Crear nueva lección")
 def crear_leccion(leccion: LessonCreate, db: Session = Depends(get_db)):
@@ -37,6 +57,7 @@ def crear_leccion(leccion: LessonCreate, db: Session = Depends(get_db)):
     db_leccion = Lesson(**leccion.dict())
     db.add(db_leccion)
     db.commit()
+    invalidate_lesson(db_leccion.id, db_leccion.module_id, modulo.course_id)
     db.refresh(db_leccion)
     return db_leccion
 
@@ -51,11 +72,13 @@ def actualizar_leccion(
     if leccion is None:
         raise HTTPException(status_code=404, detail="Lección no encontrada")
     
+    module_id, course_id = leccion.module_id, leccion.module.course_id
     update_data = lesson_update.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(leccion, field, value)
     
     db.commit()
+    invalidate_lesson(lesson_id, module_id, course_id)
     db.refresh(leccion)
     return leccion
 
@@ -66,6 +89,8 @@ def eliminar_leccion(lesson_id: int, db: Session = Depends(get_db)):
     if leccion is None:
         raise HTTPException(status_code=404, detail="Lección no encontrada")
     
+    module_id, course_id = leccion.module_id, leccion.module.course_id
     db.delete(leccion)
     db.commit()
+    invalidate_lesson(lesson_id, module_id, course_id)
     return {"mensaje": "Lección eliminada exitosamente"}
@@ -1,30 +1,37 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from typing import List
-from database import get_db
+from database import get_db, get_read_db
 from models import Module, Course
 from schemas import Module as ModuleSchema, ModuleCreate, ModuleUpdate
+from functools import partial
+from catalog_cache import (
+    cached, invalidate_module, module_key, course_modules_key, load_module, load_course_modules,
+)
+from conditional import conditional_response
 
 router = APIRouter(prefix="/modulos", tags=["🧩 Módulos"])
 
 @router.get("/cursos/{course_id}/modulos/", response_model=List[ModuleSchema], summary="Obtener módulos de un curso")
-def obtener_modulos_curso(course_id: str, db: Session = Depends(get_db)):
+def obtener_modulos_curso(
+    course_id: str, request: Request, response: Response, db: Session = Depends(get_read_db)
+):
     """Obtener todos los módulos de un curso específico"""
-    # Verificar que el curso existe
-    curso = db.query(Course).filter(Course.id == course_id).first()
-    if curso is None:
+    # None indica que el curso no existe
+    modulos = cached(course_modules_key(course_id), partial(load_course_modules, course_id=course_id), db)
+    if modulos is None:
         raise HTTPException(status_code=404, detail="Curso no encontrado")
-    
-    modulos = db.query(Module).filter(Module.course_id == course_id).order_by(Module.position).all()
-    return modulos
+    return conditional_response(request, response, course_modules_key(course_id), modulos)
 
 @router.get("/{module_id}", response_model=ModuleSchema, summary="Obtener módulo por ID")
-def obtener_modulo(module_id: str, db: Session = Depends(get_db)):
+def obtener_modulo(
+    module_id: str, request: Request, response: Response, db: Session = Depends(get_read_db)
+):
     """Obtener información de un módulo específico por su ID"""
-    modulo = db.query(Module).filter(Module.id == module_id).first()
+    modulo = cached(module_key(module_id), partial(load_module, module_id=module_id), db)
     if modulo is None:
         raise HTTPException(status_code=404, detail="Módulo no encontrado")
-    return modulo
+    return conditional_response(request, response, module_key(module_id), modulo)
 
 @router.post("/", response_model=ModuleSchema, summary="Crear nuevo módulo")
 def crear_modulo(modulo: ModuleCreate, db: Session = Depends(get_db)):
@@ -42,6 +49,7 @@ def crear_modulo(modulo: ModuleCreate, db: Session = Depends(get_db)):
     db_modulo = Module(**modulo.dict())
     db.add(db_modulo)
     db.commit()
+    invalidate_module(db_modulo.id, db_modulo.course_id)
     db.refresh(db_modulo)
     return db_modulo
 
@@ -61,6 +69,7 @@ def actualizar_modulo(
         setattr(modulo, field, value)
     
     db.commit()
+    invalidate_module(module_id, modulo.course_id)
     db.refresh(modulo)
     return modulo
 
@@ -71,6 +80,8 @@ def eliminar_modulo(module_id: str, db: Session = Depends(get_db)):
     if modulo is None:
         raise HTTPException(status_code=404, detail="Módulo no encontrado")
     
+    course_id = modulo.course_id
     db.delete(modulo)
     db.commit()
+    invalidate_module(module_id, course_id)
     return {"mensaje": "Módulo eliminado exitosamente"}
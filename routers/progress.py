@@ -1,23 +1,71 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
-from typing import List, Optional
-from datetime import datetime, date
-from database import get_db
-from models import UserProgress, User, Module
-from schemas import UserProgress as UserProgressSchema, UserProgressCreate, UserProgressUpdate
+from sqlalchemy import and_, func, select
+from sqlalchemy.exc import IntegrityError, OperationalError
+from collections import defaultdict
+from typing import List, Optional, Literal
+from datetime import datetime, date, timedelta
+from database import get_db, get_read_db
+from models import UserProgress, User, Module, Course, UserProgressSummary, UserCourseProgress
+from schemas import UserProgress as UserProgressSchema, UserProgressCreate, UserProgressUpdate, UserProgressBulkItem
+from pagination import paginate, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from export import stream_export
+from fast_json import list_response
+from progress_aggregates import apply_progress_delta, apply_progress_deltas, module_course_id
+from upsert import insert_ignore, is_transient_error, upsert_rows
 
 router = APIRouter(prefix="/progreso", tags=["🏁 Progreso"])
 
+# Máximo de registros aceptados por /progreso/lote
+BULK_MAX_ROWS = 1000
+# Repeticiones de /progreso/lote ante deadlocks o inserciones concurrentes
+BULK_RETRIES = 3
+
 # 🔍 Consultas (GET)
 @router.get("/", response_model=List[UserProgressSchema], summary="Obtener todo el progreso")
-def obtener_todo_progreso(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Obtener todo el progreso registrado en el sistema"""
-    progreso = db.query(UserProgress).offset(skip).limit(limit).all()
-    return progreso
+def obtener_todo_progreso(
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Cursor de la siguiente página (cabecera X-Next-Cursor)"),
+    skip: int = Query(0, ge=0, description="Obsoleto: usar cursor"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_read_db)
+):
+    """Obtener todo el progreso registrado en el sistema, paginado por id"""
+    progreso = paginate(db.query(UserProgress), (UserProgress.id,), cursor, limit, response, skip=skip)
+    return list_response(UserProgressSchema, progreso, response)
+
+# Declarado antes de /{user_id} para que "exportar" no se interprete como id
+@router.get("/exportar", summary="Exportar progreso (NDJSON/CSV)")
+def exportar_progreso(
+    request: Request,
+    formato: Literal["ndjson", "csv"] = "ndjson",
+    user_id: Optional[int] = None,
+    module_id: Optional[str] = None,
+    completed: Optional[bool] = None,
+    start_date: Optional[date] = Query(None, description="Fecha de finalización desde (YYYY-MM-DD)"),
+    end_date: Optional[date] = Query(None, description="Fecha de finalización hasta, inclusive (YYYY-MM-DD)"),
+):
+    """Exportar progreso en streaming, con memoria constante sin importar el número de filas"""
+    query = select(
+        UserProgress.id, UserProgress.user_id, UserProgress.module_id, UserProgress.completed,
+        UserProgress.completion_date, UserProgress.created_at, UserProgress.updated_at,
+    )
+    
+    if user_id is not None:
+        query = query.where(UserProgress.user_id == user_id)
+    if module_id is not None:
+        query = query.where(UserProgress.module_id == module_id)
+    if completed is not None:
+        query = query.where(UserProgress.completed == completed)
+    if start_date is not None:
+        query = query.where(UserProgress.completion_date >= start_date)
+    if end_date is not None:
+        query = query.where(UserProgress.completion_date < end_date + timedelta(days=1))
+    
+    return stream_export(request, query.order_by(UserProgress.id), formato, "progreso")
 
 @router.get("/{user_id}", response_model=List[UserProgressSchema], summary="Obtener progreso por usuario")
-def obtener_progreso_usuario(user_id: int, db: Session = Depends(get_db)):
+def obtener_progreso_usuario(user_id: int, db: Session = Depends(get_read_db)):
     """Obtener progreso por ID de usuario"""
     # Verificar que el usuario existe
     usuario = db.query(User).filter(User.id == user_id).first()
@@ -28,7 +76,7 @@ def obtener_progreso_usuario(user_id: int, db: Session = Depends(get_db)):
     return progreso
 
 @router.get("/curso/{module_id}", response_model=List[UserProgressSchema], summary="Obtener progreso por módulo")
-def obtener_progreso_modulo(module_id: str, db: Session = Depends(get_db)):
+def obtener_progreso_modulo(module_id: str, db: Session = Depends(get_read_db)):
     """Obtener progreso por módulo"""
     # Verificar que el módulo existe
     modulo = db.query(Module).filter(Module.id == module_id).first()
@@ -39,20 +87,20 @@ def obtener_progreso_modulo(module_id: str, db: Session = Depends(get_db)):
     return progreso
 
 @router.get("/estado/{estado}", response_model=List[UserProgressSchema], summary="Filtrar por estado")
-def obtener_progreso_por_estado(estado: int, db: Session = Depends(get_db)):
+def obtener_progreso_por_estado(estado: int, db: Session = Depends(get_read_db)):
     """Filtrar por estado (0: incompleto, 1: completo)"""
     if estado not in [0, 1]:
         raise HTTPException(status_code=400, detail="Estado debe ser 0 (incompleto) o 1 (completo)")
     
     completado = bool(estado)
     progreso = db.query(UserProgress).filter(UserProgress.completed == completado).all()
-    return progreso
+    return list_response(UserProgressSchema, progreso)
 
 @router.get("/rango-fechas", response_model=List[UserProgressSchema], summary="Buscar por rango de fechas")
 def obtener_progreso_por_fechas(
     start_date: date = Query(..., description="Fecha de inicio (YYYY-MM-DD)"),
     end_date: date = Query(..., description="Fecha de fin (YYYY-MM-DD)"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Buscar por rango de fechas"""
     progreso = db.query(UserProgress).filter(
@@ -64,7 +112,7 @@ def obtener_progreso_por_fechas(
     return progreso
 
 @router.get("/usuarios/completos/{module_id}", summary="Usuarios que completaron módulo")
-def obtener_usuarios_completos(module_id: str, db: Session = Depends(get_db)):
+def obtener_usuarios_completos(module_id: str, db: Session = Depends(get_read_db)):
     """Usuarios que completaron un módulo"""
     # Verificar que el módulo existe
     modulo = db.query(Module).filter(Module.id == module_id).first()
@@ -81,7 +129,7 @@ def obtener_usuarios_completos(module_id: str, db: Session = Depends(get_db)):
     return [{"user_id": usuario.id, "nombre": usuario.name, "email": usuario.email} for usuario in usuarios]
 
 @router.get("/usuarios/incompletos/{module_id}", summary="Usuarios que no completaron módulo")
-def obtener_usuarios_incompletos(module_id: str, db: Session = Depends(get_db)):
+def obtener_usuarios_incompletos(module_id: str, db: Session = Depends(get_read_db)):
     """Usuarios que no completaron un módulo"""
     # Verificar que el módulo existe
     modulo = db.query(Module).filter(Module.id == module_id).first()
@@ -99,28 +147,40 @@ def obtener_usuarios_incompletos(module_id: str, db: Session = Depends(get_db)):
     return [{"user_id": usuario.id, "nombre": usuario.name, "email": usuario.email} for usuario in usuarios]
 
 @router.get("/resumen/{user_id}", summary="Resumen de progreso del usuario")
-def obtener_resumen_usuario(user_id: int, db: Session = Depends(get_db)):
-    """Resumen general de progreso del usuario"""
-    # Verificar que el usuario existe
-    usuario = db.query(User).filter(User.id == user_id).first()
-    if usuario is None:
+def obtener_resumen_usuario(user_id: int, db: Session = Depends(get_read_db)):
+    """Resumen general de progreso del usuario, con el desglose por curso"""
+    # Los contadores se mantienen en cada escritura: aquí solo se leen por clave primaria
+    fila = db.query(
+        User.name, UserProgressSummary.modules_started, UserProgressSummary.modules_completed
+    ).outerjoin(UserProgressSummary, UserProgressSummary.user_id == User.id).filter(User.id == user_id).first()
+    if fila is None:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
     
-    # Obtener estadísticas de progreso
-    total_modulos = db.query(UserProgress).filter(UserProgress.user_id == user_id).count()
-    modulos_completados = db.query(UserProgress).filter(
-        and_(UserProgress.user_id == user_id, UserProgress.completed == True)
-    ).count()
-    
-    porcentaje_completado = (modulos_completados / total_modulos * 100) if total_modulos > 0 else 0
+    cursos = db.query(
+        UserCourseProgress.course_id, Course.title,
+        UserCourseProgress.modules_started, UserCourseProgress.modules_completed,
+    ).join(Course, Course.id == UserCourseProgress.course_id).filter(
+        UserCourseProgress.user_id == user_id, UserCourseProgress.modules_started > 0
+    ).order_by(UserCourseProgress.course_id).all()
     
     return {
         "user_id": user_id,
-        "nombre_usuario": usuario.name,
+        "nombre_usuario": fila.name,
+        **_contadores(fila.modules_started or 0, fila.modules_completed or 0),
+        "cursos": [
+            {"course_id": curso.course_id, "titulo": curso.title,
+             **_contadores(curso.modules_started, curso.modules_completed)}
+            for curso in cursos
+        ],
+    }
+
+def _contadores(total_modulos: int, modulos_completados: int) -> dict:
+    porcentaje_completado = (modulos_completados / total_modulos * 100) if total_modulos > 0 else 0
+    return {
         "total_modulos": total_modulos,
         "modulos_completados": modulos_completados,
         "modulos_incompletos": total_modulos - modulos_completados,
-        "porcentaje_completado": round(porcentaje_completado, 2)
+        "porcentaje_completado": round(porcentaje_completado, 2),
     }
 
 # 📝 Inserción (POST)
@@ -152,10 +212,114 @@ def crear_progreso(progreso: UserProgressCreate, db: Session = Depends(get_db)):
         db_progreso.completion_date = datetime.utcnow()
     
     db.add(db_progreso)
-    db.commit()
+    apply_progress_delta(db, progreso.user_id, modulo.course_id, 1, int(bool(db_progreso.completed)))
+    try:
+        db.commit()
+    except IntegrityError:
+        # Otra petición insertó el mismo (user_id, module_id) entre la comprobación y el commit
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Ya existe progreso para este usuario y módulo")
     db.refresh(db_progreso)
     return db_progreso
 
+class _NuevosEnConflicto(Exception):
+    """Otra transacción creó algunos de los registros nuevos del lote antes que esta"""
+
+
+def _aplicar_lote(db: Session, registros: List[UserProgressBulkItem]) -> list:
+    """Escribir el lote dentro de la transacción de db y devolver un resultado por registro.
+
+    Los registros existentes se bloquean con FOR UPDATE, pero un bloqueo no cubre filas que
+    aún no existen: los nuevos se insertan sin pisar nada y, si la base no los inserta todos,
+    otra transacción se adelantó y se lanza _NuevosEnConflicto para repetir el lote.
+    """
+    # Una consulta por tabla para validar claves foráneas y leer el progreso existente
+    usuarios = {user_id for (user_id,) in db.query(User.id).filter(User.id.in_({r.user_id for r in registros}))}
+    cursos = dict(db.query(Module.id, Module.course_id).filter(Module.id.in_({r.module_id for r in registros})))
+    existentes = {}
+    if usuarios and cursos:
+        existentes = {
+            (p.user_id, p.module_id): p
+            for p in db.query(
+                UserProgress.user_id, UserProgress.module_id, UserProgress.completed, UserProgress.completion_date
+            ).filter(UserProgress.user_id.in_(usuarios), UserProgress.module_id.in_(cursos)).with_for_update()
+        }
+    
+    ahora = datetime.utcnow()
+    resultados, nuevas, actualizadas, vistos = [], [], [], set()
+    deltas = defaultdict(lambda: [0, 0])
+    for indice, registro in enumerate(registros):
+        clave = (registro.user_id, registro.module_id)
+        resultado = {"indice": indice, "user_id": registro.user_id, "module_id": registro.module_id}
+        resultados.append(resultado)
+        if registro.user_id not in usuarios:
+            resultado.update(estado="error", detalle="Usuario no encontrado")
+            continue
+        if registro.module_id not in cursos:
+            resultado.update(estado="error", detalle="Módulo no encontrado")
+            continue
+        if clave in vistos:
+            resultado.update(estado="error", detalle="Registro duplicado en el lote")
+            continue
+        vistos.add(clave)
+        
+        anterior = existentes.get(clave)
+        estaba_completado = bool(anterior and anterior.completed)
+        completado = estaba_completado if registro.completed is None else registro.completed
+        # Un registro que vuelve a incompleto pierde su fecha de finalización
+        fecha = None
+        if completado:
+            fecha = registro.completion_date or (anterior.completion_date if estaba_completado else None) or ahora
+        fila = {"user_id": registro.user_id, "module_id": registro.module_id, "completed": completado, "completion_date": fecha}
+        (nuevas if anterior is None else actualizadas).append(fila)
+        
+        delta = deltas[(registro.user_id, cursos[registro.module_id])]
+        delta[0] += anterior is None
+        delta[1] += int(completado) - int(estaba_completado)
+        resultado["estado"] = "creado" if anterior is None else "actualizado"
+    
+    if nuevas and insert_ignore(db, UserProgress.__table__, nuevas) != len(nuevas):
+        raise _NuevosEnConflicto()
+    if actualizadas:
+        upsert_rows(db, UserProgress.__table__, actualizadas, ["user_id", "module_id"], ["completed", "completion_date"])
+    apply_progress_deltas(db, deltas)
+    return resultados
+
+
+@router.post("/lote", summary="Agregar o actualizar progreso en lote")
+def crear_progreso_lote(registros: List[UserProgressBulkItem], db: Session = Depends(get_db)):
+    """Insertar o actualizar muchos registros de progreso en pocas sentencias (sin autenticación requerida).
+    
+    Devuelve un resultado por registro, en el mismo orden: creado, actualizado o error. Si se
+    omite completed se conserva el estado actual. Ante un deadlock o una inserción concurrente
+    de los mismos registros el lote se repite entero hasta BULK_RETRIES veces.
+    """
+    if len(registros) > BULK_MAX_ROWS:
+        raise HTTPException(status_code=400, detail=f"El lote admite como máximo {BULK_MAX_ROWS} registros")
+    
+    for intento in range(1, BULK_RETRIES + 1):
+        try:
+            resultados = _aplicar_lote(db, registros)
+            db.commit()
+            break
+        except (_NuevosEnConflicto, OperationalError) as exc:
+            db.rollback()
+            if not isinstance(exc, _NuevosEnConflicto) and not is_transient_error(exc):
+                raise
+    else:
+        raise HTTPException(
+            status_code=503,
+            detail="Conflicto con otras escrituras del mismo progreso, reintenta en unos segundos",
+            headers={"Retry-After": "1"},
+        )
+    
+    return {
+        "creados": sum(r["estado"] == "creado" for r in resultados),
+        "actualizados": sum(r["estado"] == "actualizado" for r in resultados),
+        "errores": sum(r["estado"] == "error" for r in resultados),
+        "resultados": resultados,
+    }
+
 # 🔄 Actualización (PUT)
 @router.put("/", response_model=UserProgressSchema, summary="Actualizar progreso")
 def actualizar_progreso(
@@ -170,11 +334,12 @@ def actualizar_progreso(
             UserProgress.user_id == user_id,
             UserProgress.module_id == module_id
         )
-    ).first()
+    ).with_for_update().first()
     
     if progreso is None:
         raise HTTPException(status_code=404, detail="Progreso no encontrado")
     
+    estaba_completado = bool(progreso.completed)
     update_data = progress_update.dict(exclude_unset=True)
     
     # Si se marca como completado y no se proporciona fecha de finalización, establecerla ahora
@@ -184,6 +349,9 @@ def actualizar_progreso(
     for field, value in update_data.items():
         setattr(progreso, field, value)
     
+    delta = int(bool(progreso.completed)) - int(estaba_completado)
+    if delta:
+        apply_progress_delta(db, user_id, module_course_id(db, module_id), 0, delta)
     db.commit()
     db.refresh(progreso)
     return progreso
@@ -197,11 +365,12 @@ def eliminar_progreso(user_id: int, module_id: str, db: Session = Depends(get_db
             UserProgress.user_id == user_id,
             UserProgress.module_id == module_id
         )
-    ).first()
+    ).with_for_update().first()
     
     if progreso is None:
         raise HTTPException(status_code=404, detail="Progreso no encontrado")
     
+    apply_progress_delta(db, user_id, module_course_id(db, module_id), -1, -int(bool(progreso.completed)))
     db.delete(progreso)
     db.commit()
     return {"mensaje": "Progreso eliminado exitosamente"}
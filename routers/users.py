@@ -1,21 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
-from database import get_db
+from typing import List, Optional
+from database import get_db, get_read_db
 from models import User
 from schemas import User as UserSchema, UserUpdate
+from auth import invalidate_user
 from routers.auth import get_current_user
+from pagination import paginate, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from fast_json import list_response
 
 router = APIRouter(prefix="/usuarios", tags=["👤 Usuarios"])
 
 @router.get("/", response_model=List[UserSchema], summary="Obtener todos los usuarios")
-def obtener_usuarios( db: Session = Depends(get_db)):
-    """Obtener lista de todos los usuarios registrados"""
-    usuarios = db.query(User).all()
-    return usuarios
+def obtener_usuarios(
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Cursor de la siguiente página (cabecera X-Next-Cursor)"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_read_db)
+):
+    """Obtener lista de los usuarios registrados, paginada por id"""
+    return list_response(UserSchema, paginate(db.query(User), (User.id,), cursor, limit, response), response)
 
 @router.get("/{user_id}", response_model=UserSchema, summary="Obtener usuario por ID")
-def obtener_usuario(user_id: int, db: Session = Depends(get_db)):
+def obtener_usuario(user_id: int, db: Session = Depends(get_read_db)):
     """Obtener información de un usuario específico por su ID"""
     usuario = db.query(User).filter(User.id == user_id).first()
     if usuario is None:
@@ -38,6 +45,7 @@ def actualizar_usuario(
         setattr(usuario, field, value)
     
     db.commit()
+    invalidate_user(user_id)
     db.refresh(usuario)
     return usuario
 
@@ -50,4 +58,5 @@ def eliminar_usuario(user_id: int, db: Session = Depends(get_db)):
     
     db.delete(usuario)
     db.commit()
+    invalidate_user(user_id)
     return {"mensaje": "Usuario eliminado exitosamente"}
@@ -113,6 +113,25 @@ class Lesson(LessonBase):
     class Config:
         from_attributes = True
 
+# Proyección ligera para listados: sin teoría, código inicial ni solución
+class LessonSummary(BaseModel):
+    id: int
+    module_id: str
+    title: str
+    position: int
+    created_at: datetime
+    updated_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+# Course tree schemas (curso → módulos → lecciones)
+class ModuleTree(Module):
+    lessons: List[LessonSummary] = []
+
+class CourseTree(Course):
+    modules: List[ModuleTree] = []
+
 # Progress schemas
 class UserProgressBase(BaseModel):
     user_id: int
@@ -122,6 +141,11 @@ class UserProgressBase(BaseModel):
 class UserProgressCreate(UserProgressBase):
     pass
 
+class UserProgressBulkItem(UserProgressBase):
+    # Sin completed se conserva el estado actual (incompleto para registros nuevos)
+    completed: Optional[bool] = None
+    completion_date: Optional[datetime] = None
+
 class UserProgressUpdate(BaseModel):
     completed: Optional[bool] = None
     completion_date: Optional[datetime] = None
@@ -153,5 +177,26 @@ class ExerciseAttempt(ExerciseAttemptBase):
     class Config:
         from_attributes = True
 
+class ExerciseAttemptAccepted(BaseModel):
+    """Intento aceptado en modo write-behind, todavía sin id"""
+    user_id: int
+    lesson_id: int
+    is_correct: bool
+    attempt_date: datetime
+    encolado: bool = True
+
+class AttemptSummary(BaseModel):
+    user_id: int
+    lesson_id: int
+    attempts: int
+    correct_attempts: int
+    first_attempt_date: Optional[datetime] = None
+    first_correct_date: Optional[datetime] = None
+    last_attempt_date: Optional[datetime] = None
+    last_is_correct: Optional[bool] = None
+    
+    class Config:
+        from_attributes = True
+
 class ExerciseSubmission(BaseModel):
     code_submitted: str
@@ -0,0 +1,134 @@
+"""Comparar el rendimiento del modo síncrono y el asíncrono (DB_ASYNC) sobre SQLite.
+
+Levanta un servidor uvicorn por modo contra una base SQLite temporal, siembra el
+catálogo y lanza peticiones GET concurrentes con httpx.
+
+Uso:
+    python scripts/bench_async.py --requests 2000 --concurrency 100
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_server(async_mode: bool, db_path: str, port: int) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.update({
+        "DATABASE_URL": f"sqlite:///{db_path}",
+        "DB_ASYNC": "true" if async_mode else "false",
+    })
+    subprocess.run([sys.executable, os.path.join("scripts", "init_db.py"), "--create-all"],
+                   cwd=ROOT, env=env, check=True, capture_output=True)
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env,
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/", timeout=1)
+            return proc
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("El servidor no arrancó a tiempo")
+
+
+def _seed(base_url: str, courses: int, modules: int):
+    with httpx.Client(base_url=base_url) as client:
+        for c in range(courses):
+            client.post("/cursos/", json={
+                "id": f"c{c}", "title": f"Curso {c}", "description": "bench",
+                "icon": "i", "color_class": "c",
+            })
+            for m in range(modules):
+                client.post("/modulos/", json={
+                    "id": f"c{c}m{m}", "course_id": f"c{c}", "title": f"Módulo {m}",
+                    "description": "bench", "position": m,
+                })
+
+
+async def _run_load(base_url: str, paths: list, total: int, concurrency: int) -> dict:
+    latencies = []
+    errors = 0
+    queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(paths[i % len(paths)])
+
+    async def worker(client):
+        nonlocal errors
+        while True:
+            try:
+                path = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            start = time.perf_counter()
+            try:
+                response = await client.get(path)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "peticiones": total,
+        "errores": errors,
+        "rps": round(total / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 2),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 2),
+    }
+
+
+def bench(async_mode: bool, args) -> dict:
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    with tempfile.TemporaryDirectory() as tmp:
+        proc = _start_server(async_mode, os.path.join(tmp, "bench.db"), port)
+        try:
+            _seed(base_url, args.courses, args.modules)
+            paths = ["/cursos/"] + [f"/modulos/cursos/c{c}/modulos/" for c in range(args.courses)]
+            return asyncio.run(_run_load(base_url, paths, args.requests, args.concurrency))
+        finally:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--courses", type=int, default=10)
+    parser.add_argument("--modules", type=int, default=10)
+    args = parser.parse_args()
+
+    for label, async_mode in (("sync", False), ("async", True)):
+        print(label, bench(async_mode, args))
+
+
+if __name__ == "__main__":
+    main()
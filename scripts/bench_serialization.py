@@ -0,0 +1,84 @@
+"""Comparar la serialización de listas grandes: ruta de FastAPI frente a la ruta rápida.
+
+Construye N objetos ORM en memoria (sin base de datos) y mide, para cada esquema:
+  - fastapi: validación del response_model + JSONResponse (lo que hace FastAPI por defecto)
+  - orjson: validación del response_model + ORJSONResponse (si orjson está instalado)
+  - rapida: fast_json.dump_list (valores de las columnas sin revalidar, JSON en pydantic-core)
+
+Uso:
+    python scripts/bench_serialization.py --rows 10000 --repeat 5
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse, ORJSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+
+from fast_json import dump_list, orjson  # noqa: E402
+from models import User, UserProgress  # noqa: E402
+from schemas import User as UserSchema, UserProgress as UserProgressSchema  # noqa: E402
+
+
+def _users(n: int):
+    now = datetime.utcnow()
+    return [User(id=i, name=f"Usuario {i}", email=f"u{i}@example.com", image=None, created_at=now, updated_at=now)
+            for i in range(1, n + 1)]
+
+
+def _progress(n: int):
+    now = datetime.utcnow()
+    return [UserProgress(id=i, user_id=i, module_id=f"m{i % 50}", completed=bool(i % 2), completion_date=now,
+                         created_at=now, updated_at=now) for i in range(1, n + 1)]
+
+
+def _fastapi_path(schema, response_class):
+    field = create_response_field(name="respuesta", type_=List[schema])
+
+    def run(items):
+        content = asyncio.run(serialize_response(field=field, response_content=items, is_coroutine=False))
+        return response_class(content).body
+    return run
+
+
+def _time(fn, items, repeat: int):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = fn(items)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000, len(body)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for name, schema, items in (
+        ("usuarios", UserSchema, _users(args.rows)),
+        ("progreso", UserProgressSchema, _progress(args.rows)),
+    ):
+        paths = {"fastapi": _fastapi_path(schema, JSONResponse)}
+        if orjson is not None:
+            paths["orjson"] = _fastapi_path(schema, ORJSONResponse)
+        paths["rapida"] = lambda items, schema=schema: dump_list(schema, items)
+        base = None
+        for path, fn in paths.items():
+            ms, size = _time(fn, items, args.repeat)
+            base = base or ms
+            print(f"{name:9} {path:8} {ms:8.1f} ms  {size / 1024:8.0f} KiB  x{base / ms:4.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
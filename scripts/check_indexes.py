@@ -0,0 +1,84 @@
+"""Comprobar con EXPLAIN que las consultas de los routers usan un índice.
+
+Ejecuta EXPLAIN (MySQL) o EXPLAIN QUERY PLAN (SQLite) sobre las formas de consulta
+de los routers contra la base de DATABASE_URL (con las migraciones aplicadas) y
+termina con código 1 si alguna recorre la tabla completa.
+
+Uso:
+    alembic upgrade head && python scripts/check_indexes.py
+"""
+import os
+import sys
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import and_, text  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from database import engine  # noqa: E402
+from models import (  # noqa: E402
+    User, Module, Lesson, UserProgress, ExerciseAttempt, UserProgressSummary, UserCourseProgress,
+)
+
+
+def router_queries(db: Session):
+    """Formas de consulta de los routers (nombre, consulta) con valores de ejemplo"""
+    return [
+        ("progreso por usuario", db.query(UserProgress).filter(UserProgress.user_id == 1)),
+        ("progreso por módulo", db.query(UserProgress).filter(UserProgress.module_id == "m1")),
+        ("progreso por estado", db.query(UserProgress).filter(UserProgress.completed == True)),  # noqa: E712
+        ("progreso por rango de fechas", db.query(UserProgress).filter(and_(
+            UserProgress.completion_date >= date(2024, 1, 1), UserProgress.completion_date <= date(2024, 12, 31),
+        ))),
+        ("progreso existente (usuario, módulo)", db.query(UserProgress).filter(and_(
+            UserProgress.user_id == 1, UserProgress.module_id == "m1",
+        ))),
+        ("resumen: contadores del usuario", db.query(UserProgressSummary).filter(
+            UserProgressSummary.user_id == 1,
+        )),
+        ("resumen: contadores por curso", db.query(UserCourseProgress).filter(
+            UserCourseProgress.user_id == 1,
+        )),
+        ("usuarios que completaron módulo", db.query(User).join(UserProgress).filter(and_(
+            UserProgress.module_id == "m1", UserProgress.completed == True,  # noqa: E712
+        ))),
+        ("intentos por usuario (paginado)", db.query(ExerciseAttempt).filter(
+            ExerciseAttempt.user_id == 1, ExerciseAttempt.id > 100,
+        ).order_by(ExerciseAttempt.id).limit(101)),
+        ("último intento", db.query(ExerciseAttempt).filter(
+            ExerciseAttempt.user_id == 1, ExerciseAttempt.lesson_id == 1,
+        ).order_by(ExerciseAttempt.attempt_date.desc()).limit(1)),
+        ("exportar intentos por fecha", db.query(ExerciseAttempt.id).filter(
+            ExerciseAttempt.attempt_date >= date(2024, 1, 1),
+        )),
+        ("módulos de un curso", db.query(Module).filter(Module.course_id == "py").order_by(Module.position)),
+        ("lecciones de un módulo", db.query(Lesson).filter(Lesson.module_id == "m1").order_by(Lesson.position)),
+    ]
+
+
+def _explain(conn, sql: str):
+    """Devolver (usa_indice, detalle) según el plan del motor"""
+    if conn.dialect.name == "sqlite":
+        plan = [row[-1] for row in conn.execute(text("EXPLAIN QUERY PLAN " + sql))]
+        # "SCAN tabla" sin índice es un recorrido completo; "SEARCH ... USING INDEX" es correcto
+        full_scans = [p for p in plan if p.startswith("SCAN") and "INDEX" not in p]
+        return not full_scans, "; ".join(plan)
+    rows = conn.execute(text("EXPLAIN " + sql)).mappings().all()
+    full_scans = [r for r in rows if r["type"] == "ALL"]
+    return not full_scans, "; ".join(f"{r['table']}:{r['type']}:{r['key']}" for r in rows)
+
+
+def main() -> int:
+    failures = 0
+    with Session(engine) as db, engine.connect() as conn:
+        for name, query in router_queries(db):
+            sql = str(query.statement.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+            uses_index, detail = _explain(conn, sql)
+            print(f"[{'OK' if uses_index else 'FALLO'}] {name}: {detail}")
+            failures += not uses_index
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
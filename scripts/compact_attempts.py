@@ -0,0 +1,37 @@
+"""Archivar los intentos más antiguos que la ventana de retención.
+
+Pensado para ejecutarse periódicamente (cron o un job programado). Mueve los
+intentos a tablas exercise_attempts_archive_YYYYMM en lotes pequeños, con una pausa
+entre lotes; el último intento de cada usuario y lección se conserva siempre.
+
+Uso:
+    python scripts/compact_attempts.py --retention-days 180 --batch-size 500
+"""
+import argparse
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import SessionLocal  # noqa: E402
+from config import ATTEMPT_RETENTION_DAYS  # noqa: E402
+from compaction import compact  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--retention-days", type=int, default=ATTEMPT_RETENTION_DAYS)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--pausa-ms", type=int, default=100, help="espera entre lotes")
+    parser.add_argument("--max-lotes", type=int, default=None, help="detenerse tras este número de lotes")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    total = compact(SessionLocal, args.retention_days, args.batch_size, args.pausa_ms / 1000, args.max_lotes)
+    print(f"Terminado: {total} intentos archivados")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,41 @@
+"""Crear o actualizar el esquema de la base de datos de DATABASE_URL.
+
+La aplicación ya no crea las tablas al importarse: este script se ejecuta una vez
+por despliegue, antes de arrancar los workers.
+
+Uso:
+    python scripts/init_db.py               # alembic upgrade head
+    python scripts/init_db.py --create-all  # desarrollo: create_all y marcar la revisión actual
+"""
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from alembic import command  # noqa: E402
+from alembic.config import Config  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--create-all", action="store_true",
+                        help="crear las tablas con metadata.create_all en lugar de migrar")
+    args = parser.parse_args()
+
+    alembic_cfg = Config(os.path.join(ROOT, "alembic.ini"))
+    alembic_cfg.set_main_option("script_location", os.path.join(ROOT, "migrations"))
+    if args.create_all:
+        from database import engine, Base
+        import models  # noqa: F401  registra las tablas en Base.metadata
+
+        Base.metadata.create_all(bind=engine)
+        command.stamp(alembic_cfg, "head")
+    else:
+        command.upgrade(alembic_cfg, "head")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+"""Mover el código de los intentos existentes a code_blobs (deduplicado y comprimido).
+
+Recorre exercise_attempts por id en lotes pequeños, cada uno en su propia
+transacción, así que puede interrumpirse y volver a lanzarse (--desde-id) sin
+bloquear la tabla. Requiere la migración 0004_code_blobs.
+
+Uso:
+    python scripts/migrate_code_blobs.py --batch-size 1000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import SessionLocal  # noqa: E402
+from code_store import migrate_legacy_batch  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--desde-id", type=int, default=0, help="continuar después de este id")
+    parser.add_argument("--pausa-ms", type=int, default=0, help="espera entre lotes para no saturar el primario")
+    args = parser.parse_args()
+
+    movidos, ultimo_id = 0, args.desde_id
+    db = SessionLocal()
+    try:
+        while True:
+            resultado = migrate_legacy_batch(db, args.batch_size, ultimo_id)
+            if resultado is None:
+                break
+            n, ultimo_id = resultado
+            movidos += n
+            print(f"{movidos} intentos movidos (último id {ultimo_id})")
+            if args.pausa_ms:
+                time.sleep(args.pausa_ms / 1000)
+    finally:
+        db.close()
+    print(f"Terminado: {movidos} intentos movidos")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
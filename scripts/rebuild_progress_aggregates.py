@@ -0,0 +1,35 @@
+"""Recalcular los contadores de /progreso/resumen desde user_progress.
+
+Los handlers de /progreso mantienen los contadores en cada escritura; este script
+solo hace falta si se modificó user_progress directamente en la base de datos.
+
+Uso:
+    python scripts/rebuild_progress_aggregates.py [--user-id 1 --user-id 2]
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import SessionLocal  # noqa: E402
+from progress_aggregates import rebuild_aggregates  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--user-id", type=int, action="append", help="limitar a estos usuarios")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        rebuild_aggregates(db, args.user_id)
+        db.commit()
+    finally:
+        db.close()
+    print("Contadores recalculados")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,4 @@
 import uvicorn
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
 
 if __name__ == "__main__":
     uvicorn.run(
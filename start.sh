@@ -1,2 +1,4 @@
 #!/bin/bash
-uvicorn main:app --host 0.0.0.0 --port $PORT
+# --proxy-headers: la IP del cliente sale de X-Forwarded-For solo si la conexión viene de
+# FORWARDED_ALLOW_IPS (en Heroku el router es la única entrada: FORWARDED_ALLOW_IPS='*')
+uvicorn main:app --host 0.0.0.0 --port $PORT --proxy-headers --forwarded-allow-ips "${FORWARDED_ALLOW_IPS:-127.0.0.1}"
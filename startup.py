@@ -0,0 +1,61 @@
+import logging
+import time
+from sqlalchemy import text
+from database import engine, read_engine, ReadSessionLocal
+from catalog_cache import cached, COURSES_KEY, course_tree_key, load_courses, load_course_tree
+from functools import partial
+
+logger = logging.getLogger(__name__)
+
+# Estado de preparación que consulta /salud/listo
+readiness = {"precalentado": False, "duracion_ms": None}
+
+
+def warm_pool(target_engine, connections: int):
+    """Abrir varias conexiones a la vez para que el pool arranque lleno"""
+    conns = []
+    try:
+        for _ in range(max(connections, 1)):
+            conn = target_engine.connect()
+            conn.execute(text("SELECT 1"))
+            conns.append(conn)
+    finally:
+        for conn in conns:
+            conn.close()
+
+
+def warm_catalog():
+    """Cargar en la caché la lista de cursos y el árbol de cada curso"""
+    db = ReadSessionLocal()
+    try:
+        cursos = cached(COURSES_KEY, load_courses, db)
+        for curso in cursos:
+            cached(course_tree_key(curso.id), partial(load_course_tree, course_id=curso.id), db)
+        return len(cursos)
+    finally:
+        db.close()
+
+
+def warm_up(connections: int):
+    """Precalentar pools y catálogo; un fallo no impide arrancar, solo deja el proceso sin preparar"""
+    start = time.perf_counter()
+    try:
+        warm_pool(engine, connections)
+        if read_engine is not engine:
+            warm_pool(read_engine, connections)
+        cursos = warm_catalog()
+    except Exception:
+        logger.exception("No se pudo precalentar la conexión a la base de datos")
+        return
+    readiness["precalentado"] = True
+    readiness["duracion_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    logger.info("Precalentamiento completado: %s cursos en %s ms", cursos, readiness["duracion_ms"])
+
+
+def check_database() -> bool:
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        return True
+    except Exception:
+        return False
@@ -0,0 +1,94 @@
+"""Configuración común: primario y réplica en dos ficheros SQLite temporales.
+
+La configuración se lee del entorno al importar config.py, así que las variables se
+fijan antes de importar cualquier módulo de la aplicación.
+"""
+import os
+import sys
+import tempfile
+
+_tmp = tempfile.mkdtemp(prefix="codemastery-tests-")
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{os.path.join(_tmp, 'primario.db')}",
+    "DATABASE_READ_URL": f"sqlite:///{os.path.join(_tmp, 'replica.db')}",
+    "SECRET_KEY": "clave-de-pruebas",
+    "STARTUP_WARMUP": "false",
+    "BCRYPT_ROUNDS": "4",
+    "HASH_WORKERS": "0",
+    "ATTEMPT_BUFFER_ENABLED": "false",
+    "GRADER_WORKERS": "2",
+    "RATE_LIMITS": "",
+    "SQL_PROFILER_ENABLED": "false",
+})
+# DB_ASYNC=true ejecuta las mismas pruebas con los routers de routers/aio sobre aiosqlite
+os.environ.setdefault("DB_ASYNC", "false")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+import models  # noqa: E402,F401  registra las tablas en Base.metadata
+from models import Course, Lesson, Module, User  # noqa: E402
+from database import Base, engine, read_engine, SessionLocal  # noqa: E402
+from catalog_cache import catalog_cache  # noqa: E402
+from auth import token_cache, user_cache  # noqa: E402
+from grader import grade_cache  # noqa: E402
+import code_store  # noqa: E402
+import conditional  # noqa: E402
+import main  # noqa: E402
+
+Base.metadata.create_all(bind=engine)
+Base.metadata.create_all(bind=read_engine)
+
+
+def _empty(target_engine):
+    with target_engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    """Cada prueba empieza con las dos bases vacías y las cachés en memoria limpias"""
+    _empty(engine)
+    _empty(read_engine)
+    for cache in (catalog_cache, token_cache, user_cache, grade_cache, code_store._known_hashes,
+                  main.compressed_cache, conditional._etags):
+        cache.clear()
+    yield
+
+
+@pytest.fixture
+def client():
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def leccion(db):
+    """Curso py con el módulo m1, la lección 1 (solución print(1)) y el usuario 1"""
+    db.add(Course(id="py", title="Python", description="d", icon="i", color_class="c"))
+    db.add(Module(id="m1", course_id="py", title="M1", description="d", position=1))
+    db.add(Lesson(id=1, module_id="m1", title="L1", theory="t", practice_instructions="p",
+                  practice_initial_code="", practice_solution="print(1)", position=1))
+    db.add(User(id=1, name="Ana", email="ana@example.com", password="x"))
+    db.commit()
+
+
+def copy_to_replica(*tables):
+    """Simular la replicación: copiar las filas del primario a la réplica"""
+    with engine.connect() as source, read_engine.begin() as target:
+        for table in tables:
+            rows = [dict(row._mapping) for row in source.execute(table.select())]
+            target.execute(table.delete())
+            if rows:
+                target.execute(table.insert(), rows)
@@ -0,0 +1,45 @@
+import asyncio
+
+from admission import AdmissionControl, _match
+from config import ADMISSION_CONCURRENCY
+
+
+def _scope(client, forwarded=None):
+    headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded else []
+    return {"type": "http", "client": (client, 1234), "headers": headers}
+
+
+def test_x_forwarded_for_de_un_cliente_directo_se_ignora():
+    control = AdmissionControl(trusted_proxies=["10.0.0.0/8"])
+    assert control.client_key(_scope("203.0.113.7", "1.2.3.4")) == "203.0.113.7"
+
+
+def test_detras_de_un_proxy_de_confianza_vale_el_ultimo_salto():
+    control = AdmissionControl(trusted_proxies=["10.0.0.0/8"])
+    # El cliente puede inventarse los saltos de la izquierda, no el que añade el proxy
+    assert control.client_key(_scope("10.0.0.2", "1.2.3.4, 198.51.100.9")) == "198.51.100.9"
+    assert control.client_key(_scope("10.0.0.2", "198.51.100.9, 10.0.0.5")) == "198.51.100.9"
+    assert control.client_key(_scope("10.0.0.2")) == "10.0.0.2"
+
+
+def test_el_limite_de_login_no_afecta_a_auth_me():
+    control = AdmissionControl(rate_limits={"/auth/login": (1, 1)})
+    assert _match("/auth/me", control.rate_limits) is None
+    waits = [asyncio.run(control.store.take(("/auth/login", "ip"), 1, 1)) for _ in range(2)]
+    assert waits[0] == 0 and waits[1] > 0
+
+
+def test_las_exportaciones_no_ocupan_los_huecos_de_su_router():
+    control = AdmissionControl(concurrency=ADMISSION_CONCURRENCY)
+    assert _match("/progreso/exportar", control.limits) == "/progreso/exportar"
+    assert _match("/ejercicios/intentos/exportar", control.limits) == "/ejercicios/intentos/exportar"
+    assert _match("/progreso/usuario/1", control.limits) == "/progreso"
+
+    async def descarga_en_curso():
+        exportar = control.limits["/progreso/exportar"]
+        for _ in range(exportar.limit):
+            assert await exportar.acquire(0.01)
+        # Con todas las exportaciones en curso, /progreso sigue admitiendo sin esperar
+        assert not await exportar.acquire(0.01)
+        assert await control.limits["/progreso"].acquire(0.01)
+    asyncio.run(descarga_en_curso())
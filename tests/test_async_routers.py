@@ -0,0 +1,42 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from config import DB_ASYNC
+from routers import courses, lessons, modules, users
+from routers.aio import courses as aio_courses, lessons as aio_lessons, modules as aio_modules, users as aio_users
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Pruebas de los endpoints del catálogo y de usuarios que se repiten con DB_ASYNC=true
+_ASYNC_SUITE = ["tests/test_catalog_cache.py", "tests/test_pagination.py", "tests/test_read_routing.py",
+                "tests/test_compression.py"]
+
+
+def _rutas(router):
+    return [
+        (route.path, route.methods, route.response_model, route.summary, route.status_code,
+         sorted(param.name for param in route.dependant.query_params + route.dependant.path_params),
+         sorted(param.name for param in route.dependant.body_params))
+        for route in router.routes
+    ]
+
+
+@pytest.mark.parametrize("sync, aio", [
+    (users, aio_users), (courses, aio_courses), (modules, aio_modules), (lessons, aio_lessons),
+])
+def test_los_routers_asincronos_exponen_las_mismas_rutas(sync, aio):
+    assert aio.router.prefix == sync.router.prefix
+    assert _rutas(aio.router) == _rutas(sync.router)
+
+
+@pytest.mark.skipif(DB_ASYNC, reason="esta ejecución ya usa los routers asíncronos")
+def test_catalogo_y_usuarios_en_modo_asincrono():
+    pytest.importorskip("aiosqlite")
+    result = subprocess.run(
+        [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", *_ASYNC_SUITE],
+        cwd=_ROOT, env={**os.environ, "DB_ASYNC": "true"}, capture_output=True, text=True, timeout=300,
+    )
+    assert result.returncode == 0, result.stdout[-4000:]
@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select
+
+import compaction
+from attempt_rollup import rebuild_summaries, record_attempts
+from database import READ_PRIMARY_HEADER, SessionLocal, engine
+from models import AttemptSummary, ExerciseAttempt
+
+INICIO = datetime(2024, 1, 1)
+COLUMNAS = ("attempts", "correct_attempts", "first_attempt_date", "first_correct_date",
+            "last_attempt_date", "last_is_correct")
+
+
+def _intentos(db, *correctos, inicio=INICIO):
+    filas = [
+        {"user_id": 1, "lesson_id": 1, "is_correct": correcto, "attempt_date": inicio + timedelta(days=dia)}
+        for dia, correcto in enumerate(correctos)
+    ]
+    intentos = [ExerciseAttempt(**fila, legacy_code="print(0)") for fila in filas]
+    db.add_all(intentos)
+    record_attempts(db, filas)
+    db.commit()
+    return [intento.id for intento in intentos]
+
+
+def _resumen(db):
+    db.expire_all()
+    resumen = db.get(AttemptSummary, (1, 1))
+    return resumen and tuple(getattr(resumen, columna) for columna in COLUMNAS)
+
+
+def _recalculado():
+    with SessionLocal() as otra:
+        rebuild_summaries(otra)
+        otra.flush()
+        resultado = _resumen(otra)
+        otra.rollback()
+    return resultado
+
+
+@pytest.fixture
+def archivo():
+    yield
+    for tabla in compaction.archive_tables(engine):
+        tabla.drop(engine)
+
+
+def test_los_contadores_coinciden_con_un_recalculo(db, leccion):
+    _intentos(db, False, True, False)
+    _intentos(db, True, inicio=INICIO + timedelta(days=10))
+    assert _resumen(db) == (4, 2, INICIO, INICIO + timedelta(days=1), INICIO + timedelta(days=10), True)
+    assert _resumen(db) == _recalculado()
+
+
+def test_borrar_el_primer_intento_recalcula_las_fechas(client, db, leccion):
+    ids = _intentos(db, True, False, True, False)
+    assert client.delete(f"/ejercicios/intentos/{ids[0]}").status_code == 200
+    assert _resumen(db) == (3, 1, INICIO + timedelta(days=1), INICIO + timedelta(days=2),
+                            INICIO + timedelta(days=3), False)
+    assert _resumen(db) == _recalculado()
+
+    client.delete(f"/ejercicios/intentos/{ids[3]}")
+    client.delete(f"/ejercicios/intentos/{ids[2]}")
+    assert _resumen(db) == (1, 0, INICIO + timedelta(days=1), None, INICIO + timedelta(days=1), False)
+    assert _resumen(db) == _recalculado()
+
+
+def test_el_archivado_conserva_el_ultimo_intento(client, db, leccion, archivo):
+    ids = _intentos(db, False, False, True)
+    assert compaction.compact(SessionLocal, retention_days=1, pause=0) == 2
+    tabla = compaction.archive_table(INICIO.strftime("%Y%m"))
+    assert db.execute(select(func.count()).select_from(tabla)).scalar() == 2
+    assert [i for (i,) in db.execute(select(ExerciseAttempt.id))] == [ids[2]]
+    ultimo = client.get("/ejercicios/1/ultimo-intento", params={"user_id": 1},
+                        headers={READ_PRIMARY_HEADER: "true"}).json()
+    assert ultimo["id"] == ids[2]
+    assert _resumen(db)[0] == 3
+
+
+def test_el_archivado_sigue_desde_el_lote_anterior(db, leccion, archivo):
+    ids = _intentos(db, False, True, False, True)
+    corte = INICIO + timedelta(days=30)
+    primero = db.execute(compaction._candidates(corte, 1)).all()
+    assert [i for i, _ in primero] == [ids[0]]
+    siguientes = db.execute(compaction._candidates(corte, 10, (primero[0][1], primero[0][0]))).all()
+    assert [i for i, _ in siguientes] == ids[1:3]
+
+    assert compaction.compact(SessionLocal, retention_days=1, batch_size=1, pause=0) == 3
+    assert [i for (i,) in db.execute(select(ExerciseAttempt.id))] == [ids[3]]
+
+
+def test_borrar_tras_archivar_tiene_en_cuenta_el_archivo(client, db, leccion, archivo):
+    ids = _intentos(db, False, True, False, True)
+    assert compaction.compact(SessionLocal, retention_days=1, pause=0) == 3
+    assert _resumen(db) == _recalculado()
+
+    # El intento anterior al último ya solo está en el archivo
+    assert client.delete(f"/ejercicios/intentos/{ids[3]}").status_code == 200
+    assert _resumen(db) == (3, 1, INICIO, INICIO + timedelta(days=1), INICIO + timedelta(days=2), False)
+    assert _resumen(db) == _recalculado()
+
+
+def test_borrar_el_primero_tras_archivar_busca_en_el_archivo(client, db, leccion, archivo):
+    # El último por id es el más antiguo por fecha: se queda en la tabla y el otro se archiva
+    _intentos(db, True, inicio=INICIO + timedelta(days=5))
+    (primero,) = _intentos(db, False)
+    assert compaction.compact(SessionLocal, retention_days=1, pause=0) == 1
+
+    assert client.delete(f"/ejercicios/intentos/{primero}").status_code == 200
+    cinco = INICIO + timedelta(days=5)
+    assert _resumen(db) == (1, 1, cinco, cinco, cinco, True)
+    assert _resumen(db) == _recalculado()
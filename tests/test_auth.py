@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+
+import hashing
+from auth import user_token_version
+from models import User
+
+
+def _register(client, email="luis@example.com", password="secreto123"):
+    response = client.post("/auth/register", json={"name": "Luis", "email": email, "password": password})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _login(client, email="luis@example.com", password="secreto123"):
+    return client.post("/auth/login", json={"email": email, "password": password})
+
+
+def test_registro_login_y_me(client):
+    _register(client)
+    assert _login(client, password="otra").status_code == 401
+    token = _login(client).json()["access_token"]
+    me = client.get("/auth/me", headers={"Authorization": f"Bearer {token}"})
+    assert me.status_code == 200 and me.json()["email"] == "luis@example.com"
+
+
+def test_regenerar_hash_no_cierra_otras_sesiones(client, db, monkeypatch):
+    _register(client)
+    token = _login(client).json()["access_token"]
+    old_hash = db.query(User).one().password
+
+    # Subir el coste: el siguiente login regenera el hash
+    monkeypatch.setattr(hashing, "BCRYPT_ROUNDS", 5)
+    assert _login(client).status_code == 200
+    db.expire_all()
+    user = db.query(User).one()
+    assert user.password != old_hash and user.password.startswith("$2b$05$")
+
+    # El token emitido antes de la regeneración sigue siendo válido
+    me = client.get("/auth/me", headers={"Authorization": f"Bearer {token}"})
+    assert me.status_code == 200, me.text
+
+
+def test_cambiar_contrasena_cambia_la_version():
+    first = hashing._hash("uno", 4)
+    second = hashing._hash("dos", 4)
+    assert user_token_version(User(email="a@b.c", password=first)) != user_token_version(
+        User(email="a@b.c", password=second)
+    )
+
+
+def test_pool_saturado_rechaza_sin_esperar():
+    pool = hashing.HashingPool(workers=0, max_pending=1)
+    assert pool._slots.acquire(blocking=False)
+    with pytest.raises(hashing.HashingOverloaded):
+        asyncio.run(pool.run_async(hashing._hash, "x", 4))
@@ -0,0 +1,79 @@
+import catalog_cache
+from models import Course
+from tests.conftest import copy_to_replica
+
+CURSO = {"id": "py", "title": "Python", "description": "d", "icon": "i", "color_class": "c"}
+
+
+def test_tras_una_escritura_la_cache_se_llena_desde_el_primario(client):
+    assert client.post("/cursos/", json=CURSO).status_code == 200
+    client.cookies.clear()
+    # La réplica no tiene el curso, pero la clave recién invalidada se carga del primario
+    assert client.get("/cursos/py").json()["title"] == "Python"
+
+    copy_to_replica(Course.__table__)
+    assert client.put("/cursos/py", json={"title": "Python 3"}).status_code == 200
+    client.cookies.clear()
+    assert client.get("/cursos/py").json()["title"] == "Python 3"
+    assert client.get("/cursos/").json()[0]["title"] == "Python 3"
+
+
+def test_sin_escrituras_recientes_se_lee_de_la_replica(client):
+    assert client.post("/cursos/", json=CURSO).status_code == 200
+    client.cookies.clear()
+    catalog_cache._written.clear()
+    catalog_cache.catalog_cache.clear()
+    assert client.get("/cursos/py").status_code == 404
+
+
+def test_la_cache_sirve_hasta_la_invalidacion(client, db):
+    client.post("/cursos/", json=CURSO)
+    assert client.get("/cursos/py").json()["title"] == "Python"
+    # Un cambio por fuera de la API no se ve hasta que se invalida la clave
+    db.query(Course).filter(Course.id == "py").update({"title": "Directo"})
+    db.commit()
+    assert client.get("/cursos/py").json()["title"] == "Python"
+    catalog_cache.invalidate_course("py")
+    assert client.get("/cursos/py").json()["title"] == "Directo"
+
+
+def test_invalidar_modulo_refresca_el_arbol(client):
+    client.post("/cursos/", json=CURSO)
+    client.post("/modulos/", json={"id": "m1", "course_id": "py", "title": "M1", "description": "d", "position": 1})
+    assert [m["id"] for m in client.get("/cursos/py/arbol").json()["modules"]] == ["m1"]
+    client.post("/modulos/", json={"id": "m2", "course_id": "py", "title": "M2", "description": "d", "position": 2})
+    assert [m["id"] for m in client.get("/cursos/py/arbol").json()["modules"]] == ["m1", "m2"]
+    client.delete("/modulos/m1")
+    assert [m["id"] for m in client.get("/cursos/py/arbol").json()["modules"]] == ["m2"]
+
+
+def test_la_etag_cambia_con_una_escritura_en_el_mismo_segundo(client):
+    client.post("/cursos/", json=CURSO)
+    primera = client.get("/cursos/py")
+    etag = primera.headers["ETag"]
+    assert client.get("/cursos/py", headers={"If-None-Match": etag}).status_code == 304
+
+    # updated_at tiene precisión de segundos: la ETag no puede depender solo de él
+    client.put("/cursos/py", json={"title": "Python 3"})
+    segunda = client.get("/cursos/py", headers={"If-None-Match": etag})
+    assert segunda.status_code == 200 and segunda.json()["title"] == "Python 3"
+    assert segunda.headers["ETag"] != etag
+    assert client.get("/cursos/py", headers={"If-None-Match": segunda.headers["ETag"]}).status_code == 304
+    assert client.get("/cursos/", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_borrar_un_modulo_invalida_la_lista_con_if_modified_since(client):
+    client.post("/cursos/", json=CURSO)
+    for posicion, module_id in enumerate(("m1", "m2", "m3"), start=1):
+        client.post("/modulos/", json={"id": module_id, "course_id": "py", "title": module_id,
+                                       "description": "d", "position": posicion})
+    lista = client.get("/modulos/cursos/py/modulos/")
+    assert "Last-Modified" not in lista.headers
+    momento = client.get("/modulos/m3").headers["Last-Modified"]
+
+    assert client.delete("/modulos/m2").status_code == 200
+    respuesta = client.get("/modulos/cursos/py/modulos/", headers={"If-Modified-Since": momento})
+    assert respuesta.status_code == 200
+    assert [m["id"] for m in respuesta.json()] == ["m1", "m3"]
+    arbol = client.get("/cursos/py/arbol", headers={"If-Modified-Since": momento})
+    assert arbol.status_code == 200 and len(arbol.json()["modules"]) == 2
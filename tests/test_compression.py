@@ -0,0 +1,40 @@
+import pytest
+
+from cache import TTLCache
+from compression import accepts_gzip
+
+
+@pytest.mark.parametrize("cabecera, esperado", [
+    ("gzip, deflate, br", True),
+    ("br;q=1.0, gzip;q=0.5", True),
+    ("gzip;q=0", False),
+    ("gzip;q=0.0, *;q=1", False),
+    ("*", True),
+    ("identity", False),
+    ("", False),
+    ("GZIP ; Q=0.1", True),
+])
+def test_accept_encoding_con_valores_q(cabecera, esperado):
+    assert accepts_gzip(cabecera) is esperado
+
+
+def test_la_cache_se_acota_por_bytes():
+    cache = TTLCache(None, 60, max_bytes=100)
+    for clave in range(5):
+        cache.set(clave, b"x" * 40)
+    assert cache.stats()["bytes"] == 80
+    assert [cache.get(clave) is not None for clave in range(5)] == [False, False, False, True, True]
+    cache.set("grande", b"x" * 101)
+    assert cache.get("grande") is None
+    cache.set(4, b"x" * 10)
+    assert cache.stats()["bytes"] == 50
+
+
+def test_gzip_q0_no_comprime(client):
+    client.post("/cursos/", json={"id": "py", "title": "Python", "description": "d" * 2000,
+                                  "icon": "i", "color_class": "c"})
+    comprimida = client.get("/cursos/py", headers={"Accept-Encoding": "gzip"})
+    assert comprimida.headers.get("content-encoding") == "gzip"
+    sin_gzip = client.get("/cursos/py", headers={"Accept-Encoding": "gzip;q=0"})
+    assert "content-encoding" not in sin_gzip.headers
+    assert sin_gzip.json()["id"] == "py"
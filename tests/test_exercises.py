@@ -0,0 +1,63 @@
+from datetime import datetime
+
+import code_store
+import routers.exercises
+from attempt_buffer import AttemptBuffer
+from code_store import code_hash, store_code
+from models import CodeBlob, ExerciseAttempt
+
+
+def test_envio_sincrono_devuelve_el_intento(client, leccion):
+    respuesta = client.post("/ejercicios/1/enviar", params={"user_id": 1}, json={"code_submitted": "print(1)"})
+    assert respuesta.status_code == 200
+    cuerpo = respuesta.json()
+    assert cuerpo["is_correct"] is True and cuerpo["code_submitted"] == "print(1)" and "id" in cuerpo
+
+
+def test_envio_encolado_responde_202(client, leccion, monkeypatch):
+    encolados = []
+    monkeypatch.setattr(routers.exercises, "ATTEMPT_BUFFER_ENABLED", True)
+    monkeypatch.setattr(routers.exercises.attempt_buffer, "submit", encolados.append)
+    respuesta = client.post("/ejercicios/1/enviar", params={"user_id": 1}, json={"code_submitted": "print(2)"})
+    assert respuesta.status_code == 202
+    assert respuesta.json()["encolado"] is True and respuesta.json()["is_correct"] is False
+    assert len(encolados) == 1
+
+
+def test_openapi_documenta_las_dos_respuestas(client):
+    respuestas = client.get("/openapi.json").json()["paths"]["/ejercicios/{lesson_id}/enviar"]["post"]["responses"]
+    assert respuestas["200"]["content"]["application/json"]["schema"]["$ref"].endswith("/ExerciseAttempt")
+    assert respuestas["202"]["content"]["application/json"]["schema"]["$ref"].endswith("/ExerciseAttemptAccepted")
+
+
+def test_el_mismo_codigo_se_guarda_una_vez(client, db, leccion):
+    for _ in range(2):
+        client.post("/ejercicios/1/enviar", params={"user_id": 1}, json={"code_submitted": "print(3)"})
+    assert db.query(CodeBlob).count() == 1
+    assert db.query(ExerciseAttempt).count() == 2
+
+
+def test_un_rollback_no_marca_el_hash_como_guardado(db, leccion):
+    digest = store_code(db, "print(4)")
+    db.rollback()
+    assert code_store._known_hashes.get(digest) is None
+    store_code(db, "print(4)")
+    db.commit()
+    assert code_store._known_hashes.get(digest) is True
+    assert db.get(CodeBlob, digest) is not None
+
+
+def test_fila_fallida_del_buffer_no_deja_code_hash_colgando(db, leccion):
+    buffer = AttemptBuffer(batch_size=10, flush_interval=0.01, max_pending=10)
+    buffer.WRITE_RETRIES = 1
+    valido = {"user_id": 1, "lesson_id": 1, "code_submitted": "print(5)", "is_correct": False,
+              "attempt_date": datetime.utcnow()}
+    # user_id NULL incumple NOT NULL: el lote falla y luego solo esa fila
+    invalido = {**valido, "user_id": None, "code_submitted": "print(6)"}
+    buffer._write([valido, invalido])
+    assert buffer.stats()["escritos"] == 1 and buffer.stats()["descartados"] == 1
+    assert code_store._known_hashes.get(code_hash("print(6)")) is None
+
+    buffer._write([{**valido, "code_submitted": "print(6)"}])
+    intento = db.query(ExerciseAttempt).filter_by(code_hash=code_hash("print(6)")).one()
+    assert db.get(CodeBlob, intento.code_hash) is not None
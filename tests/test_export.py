@@ -0,0 +1,98 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+import export
+from code_store import store_code
+from database import READ_PRIMARY_HEADER
+from models import ExerciseAttempt, Lesson, Module, User, UserProgress
+from tests.conftest import copy_to_replica
+
+PRIMARIO = {READ_PRIMARY_HEADER: "true"}
+
+
+def _ndjson(respuesta):
+    return [json.loads(linea) for linea in respuesta.text.splitlines()]
+
+
+def _csv(respuesta):
+    return list(csv.DictReader(io.StringIO(respuesta.text)))
+
+
+def _progreso(db):
+    db.add(Module(id="m2", course_id="py", title="M2", description="d", position=2))
+    db.add(User(id=2, name="Íñigo", email="inigo@example.com", password="x"))
+    db.add_all([
+        UserProgress(user_id=1, module_id="m1", completed=True, completion_date=datetime(2024, 3, 1, 10)),
+        UserProgress(user_id=1, module_id="m2", completed=False),
+        UserProgress(user_id=2, module_id="m1", completed=True, completion_date=datetime(2024, 3, 5, 23, 59)),
+    ])
+    db.commit()
+
+
+def test_exportar_progreso_en_ndjson_con_filtros(client, db, leccion):
+    _progreso(db)
+    respuesta = client.get("/progreso/exportar", headers=PRIMARIO)
+    assert respuesta.headers["content-type"].startswith("application/x-ndjson")
+    assert respuesta.headers["content-disposition"] == 'attachment; filename="progreso.ndjson"'
+    filas = _ndjson(respuesta)
+    assert [(f["user_id"], f["module_id"], f["completed"]) for f in filas] == [(1, "m1", True), (1, "m2", False), (2, "m1", True)]
+    assert filas[0]["completion_date"].startswith("2024-03-01T10:00:00") and filas[1]["completion_date"] is None
+
+    completados = _ndjson(client.get("/progreso/exportar", params={"completed": True, "user_id": 1}, headers=PRIMARIO))
+    assert [f["module_id"] for f in completados] == ["m1"]
+    # end_date incluye todo el día
+    por_fecha = _ndjson(client.get("/progreso/exportar", params={"start_date": "2024-03-02", "end_date": "2024-03-05"},
+                                   headers=PRIMARIO))
+    assert [f["user_id"] for f in por_fecha] == [2]
+
+
+def test_exportar_intentos_en_csv_con_codigo(client, db, leccion):
+    db.add_all([
+        ExerciseAttempt(user_id=1, lesson_id=1, is_correct=False, attempt_date=datetime(2024, 1, 1),
+                        legacy_code="print('antiguo')"),
+        ExerciseAttempt(user_id=1, lesson_id=1, is_correct=True, attempt_date=datetime(2024, 1, 2),
+                        code_hash=store_code(db, "print('año')")),
+    ])
+    db.commit()
+    respuesta = client.get("/ejercicios/intentos/exportar",
+                           params={"formato": "csv", "incluir_codigo": True, "start_date": "2024-01-01"}, headers=PRIMARIO)
+    assert respuesta.headers["content-type"].startswith("text/csv")
+    filas = _csv(respuesta)
+    assert list(filas[0]) == ["id", "user_id", "lesson_id", "is_correct", "attempt_date", "code_submitted"]
+    assert [(f["is_correct"], f["code_submitted"]) for f in filas] == [("False", "print('antiguo')"), ("True", "print('año')")]
+
+    sin_codigo = _csv(client.get("/ejercicios/intentos/exportar",
+                                 params={"formato": "csv", "module_id": "m1", "end_date": "2024-01-01"}, headers=PRIMARIO))
+    assert [(f["is_correct"], "code_submitted" in f) for f in sin_codigo] == [("False", False)]
+
+
+def test_la_exportacion_recorre_el_cursor_en_lotes(client, db, leccion, monkeypatch):
+    db.add_all([User(id=i, name=f"U{i}", email=f"u{i}@example.com", password="x") for i in range(2, 8)])
+    db.add_all([UserProgress(user_id=i, module_id="m1") for i in range(1, 8)])
+    db.commit()
+    monkeypatch.setattr(export, "EXPORT_BATCH_SIZE", 2)
+    lotes = []
+    real = export._iter_batches
+
+    def contar(statement, factory):
+        for lote in real(statement, factory):
+            lotes.append(len(lote))
+            yield lote
+    monkeypatch.setattr(export, "_iter_batches", contar)
+
+    filas = _csv(client.get("/progreso/exportar", params={"formato": "csv"}, headers=PRIMARIO))
+    assert [int(f["user_id"]) for f in filas] == list(range(1, 8))
+    assert lotes == [2, 2, 2, 1]
+
+
+def test_la_exportacion_lee_del_primario_tras_una_escritura(client, db, leccion):
+    copy_to_replica(*(model.__table__ for model in (User, Module, Lesson)))
+    assert _ndjson(client.get("/progreso/exportar")) == []
+    assert client.post("/progreso/", json={"user_id": 1, "module_id": "m1"}).status_code == 200
+    # La cookie de la escritura lleva la exportación al primario, como a get_read_db
+    assert [f["module_id"] for f in _ndjson(client.get("/progreso/exportar"))] == ["m1"]
+    client.cookies.clear()
+    assert _ndjson(client.get("/progreso/exportar")) == []
+    assert len(_ndjson(client.get("/progreso/exportar", headers=PRIMARIO))) == 1
@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import schemas
+from catalog_cache import load_course_tree
+from fast_json import dump_list
+from models import Lesson, Module, User, UserProgress
+
+MARCA = datetime(2024, 2, 29, 23, 59, 58, 123456)
+
+
+def _como_fastapi(schema, items) -> bytes:
+    """JSON que produce FastAPI para items con response_model=List[schema]"""
+    app = FastAPI()
+
+    @app.get("/", response_model=List[schema])
+    def listar():
+        return items
+
+    with TestClient(app) as client:
+        return client.get("/").content
+
+
+@pytest.fixture
+def usuarios(db, leccion):
+    db.add_all([
+        User(id=2, name="Íñigo Muñoz 🐍", email="inigo@EXAMPLE.com", password="x", image="https://e.jp/画像.png",
+             created_at=MARCA, updated_at=MARCA + timedelta(seconds=1)),
+        User(id=3, name='Zoë "la del\\ salto"\n', email="zoe@example.com", password="x",
+             created_at=MARCA.replace(tzinfo=timezone.utc), updated_at=MARCA.replace(tzinfo=timezone(timedelta(hours=-5)))),
+    ])
+    db.add(Module(id="m2", course_id="py", title="Módulo 2 — ñandú", description="d", position=2))
+    db.add_all([
+        UserProgress(user_id=2, module_id="m1", completed=True, completion_date=MARCA),
+        UserProgress(user_id=3, module_id="m2", completed=False, completion_date=None),
+    ])
+    db.add(Lesson(id=2, module_id="m2", title="Lección «dos»", theory="t", practice_instructions="p",
+                  practice_initial_code="", practice_solution="", position=1))
+    db.commit()
+    return db
+
+
+@pytest.mark.parametrize("schema, model", [(schemas.User, User), (schemas.UserProgress, UserProgress)])
+def test_dump_list_coincide_con_response_model(usuarios, schema, model):
+    items = usuarios.query(model).order_by(model.id).all()
+    assert len(items) > 1
+    assert dump_list(schema, items) == _como_fastapi(schema, items)
+
+
+def test_dump_list_coincide_con_objetos_sin_guardar():
+    # Fechas con zona horaria y microsegundos, tal como las deja el ORM antes de recargar
+    items = [
+        User(id=1, name="Ñ", email="a@b.co", image=None, created_at=MARCA.replace(tzinfo=timezone.utc),
+             updated_at=MARCA),
+        UserProgress(id=1, user_id=1, module_id="m1", completed=False, completion_date=None,
+                     created_at=MARCA, updated_at=MARCA.replace(tzinfo=timezone(timedelta(hours=2)))),
+    ]
+    assert dump_list(schemas.User, items[:1]) == _como_fastapi(schemas.User, items[:1])
+    assert dump_list(schemas.UserProgress, items[1:]) == _como_fastapi(schemas.UserProgress, items[1:])
+
+
+def test_dump_list_coincide_con_modelos_anidados(usuarios):
+    arbol = load_course_tree(usuarios, "py")
+    assert [len(modulo.lessons) for modulo in arbol.modules] == [1, 1]
+    assert dump_list(schemas.CourseTree, [arbol]) == _como_fastapi(schemas.CourseTree, [arbol])
+
+
+def test_lista_vacia():
+    assert dump_list(schemas.User, []) == _como_fastapi(schemas.User, []) == b"[]"
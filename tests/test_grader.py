@@ -0,0 +1,57 @@
+import os
+import time
+
+import pytest
+
+import grader
+from config import GRADER_MEMORY_MB
+
+
+def test_normalizar_quita_espacios_finales_y_lineas_vacias():
+    assert grader.normalize_code("def f():  \r\n\r\n    return 1   \n") == "def f():\n    return 1"
+
+
+def test_normalizar_conserva_las_cadenas_de_varias_lineas():
+    con_linea_vacia = 'x = """a  \n\nb"""\nprint(x)\n'
+    sin_linea_vacia = 'x = """a\nb"""\nprint(x)\n'
+    assert grader.normalize_code(con_linea_vacia) == 'x = """a  \n\nb"""\nprint(x)'
+    assert grader.normalize_code(con_linea_vacia) != grader.normalize_code(sin_linea_vacia)
+    assert grader.grade(1, con_linea_vacia, sin_linea_vacia) is False
+
+
+@pytest.mark.skipif(grader.resource is None, reason="sin límites de recursos en esta plataforma")
+def test_el_sandbox_aplica_los_limites():
+    salida = grader.sandbox.run("import resource; print(resource.getrlimit(resource.RLIMIT_AS)[0])")
+    assert int(salida) == GRADER_MEMORY_MB * 1024 * 1024
+    assert grader.sandbox.run("x = bytearray(%d)" % (GRADER_MEMORY_MB * 2 * 1024 * 1024)) is None
+
+
+def _vivo(pid: int) -> bool:
+    try:
+        with open(f"/proc/{pid}/stat") as stat:
+            return stat.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc"), reason="requiere /proc")
+def test_ningun_proceso_sobrevive_al_envio():
+    # El nieto cierra su salida para que la ejecución termine sin esperarlo
+    codigo = (
+        "import os, time\n"
+        "pid = os.fork()\n"
+        "if pid == 0:\n"
+        "    os.close(1); os.close(2)\n"
+        "    time.sleep(30)\n"
+        "    os._exit(0)\n"
+        "print(pid)\n"
+    )
+    salida = grader.sandbox.run(codigo)
+    if salida is None:
+        # RLIMIT_NPROC impidió el fork (servidor sin privilegios de root)
+        return
+    pid = int(salida)
+    deadline = time.monotonic() + 2
+    while _vivo(pid) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not _vivo(pid)
@@ -0,0 +1,13 @@
+import importlib.util
+import os
+
+_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts", "check_import_time.py")
+_spec = importlib.util.spec_from_file_location("check_import_time", _SCRIPT)
+check_import_time = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(check_import_time)
+
+
+def test_importar_main_es_rapido_y_no_conecta():
+    elapsed_ms, output, error = check_import_time.measure_import()
+    assert error is None, output[-2000:]
+    assert elapsed_ms <= check_import_time.BUDGET_MS, check_import_time._slowest(output)
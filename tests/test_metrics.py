@@ -0,0 +1,119 @@
+import re
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from metrics import (
+    LATENCY_BUCKETS, QUERIES_PER_REQUEST_BUCKETS, UNMATCHED_ROUTE, MetricsMiddleware, MetricsRegistry, instrument_engine,
+)
+
+# nombre{etiquetas} valor
+_SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{((?:[a-zA-Z_]\w*="(?:[^"\\]|\\.)*",?)*)\})? (\S+)$')
+_LABEL = re.compile(r'([a-zA-Z_]\w*)="((?:[^"\\]|\\.)*)"')
+
+
+def _parse(exposition: str) -> dict:
+    """{(nombre, etiquetas): valor}; falla si alguna línea no sigue el formato de texto de Prometheus"""
+    assert exposition.endswith("\n")
+    samples, types = {}, {}
+    for line in exposition.splitlines():
+        if line.startswith("# HELP "):
+            continue
+        if line.startswith("# TYPE "):
+            _, _, name, kind = line.split(" ")
+            assert kind in ("counter", "gauge", "histogram") and name not in types
+            types[name] = kind
+            continue
+        match = _SAMPLE.match(line)
+        assert match, line
+        name, labels, value = match.groups()
+        family = re.sub(r"_(bucket|sum|count)$", "", name) if name not in types else name
+        assert family in types, f"{name} sin # TYPE"
+        key = (name, tuple(sorted(_LABEL.findall(labels or ""))))
+        assert key not in samples, f"serie repetida: {key}"
+        samples[key] = float(value)
+    return samples
+
+
+@pytest.fixture
+def metricas():
+    registry = MetricsRegistry()
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    instrument_engine(engine, "prueba", registry)
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    def item(item_id: int, consultas: int = 2):
+        with engine.connect() as conn:
+            for _ in range(consultas):
+                conn.execute(text("SELECT 1"))
+        return {"id": item_id}
+
+    app.add_middleware(MetricsMiddleware, metrics=registry)
+    with TestClient(app) as client:
+        yield client, registry
+    engine.dispose()
+
+
+def _series(samples, name):
+    return {labels: value for (sample, labels), value in samples.items() if sample == name}
+
+
+def test_contadores_e_histogramas(metricas):
+    client, registry = metricas
+    for item_id in (1, 2, 3):
+        assert client.get(f"/items/{item_id}").status_code == 200
+    client.get("/items/4", params={"consultas": 7})
+    client.get("/items/no-es-un-numero")
+    samples = _parse(registry.render())
+
+    ruta = (("method", "GET"), ("route", "/items/{item_id}"))
+    assert _series(samples, "http_requests_total") == {ruta + (("status", "200"),): 4, ruta + (("status", "422"),): 1}
+    assert _series(samples, "http_requests_in_flight") == {ruta: 0}
+    assert _series(samples, "db_queries_total") == {(("engine", "prueba"),): 13}
+    assert _series(samples, "db_pool_checkouts_total") == {(("engine", "prueba"),): 4}
+
+    # Consultas por petición: tres con 2, una con 7 y la 422 sin ninguna
+    buckets = {float(dict(labels)["le"]): value
+               for labels, value in _series(samples, "http_request_db_queries_bucket").items()}
+    assert [buckets[le] for le in (0, 1, 2, 5, 10, float("inf"))] == [1, 1, 4, 4, 5, 5]
+    assert len(buckets) == len(QUERIES_PER_REQUEST_BUCKETS) + 1
+    assert _series(samples, "http_request_db_queries_sum") == {ruta: 13.0}
+    assert _series(samples, "http_request_db_queries_count") == {ruta: 5}
+
+    # Los buckets de latencia son acumulativos y +Inf coincide con el recuento
+    latencia = [value for labels, value in sorted(
+        _series(samples, "http_request_duration_seconds_bucket").items(),
+        key=lambda item: float(dict(item[0])["le"]),
+    )]
+    assert len(latencia) == len(LATENCY_BUCKETS) + 1
+    assert latencia == sorted(latencia) and latencia[-1] == 5
+    assert _series(samples, "http_request_duration_seconds_sum")[ruta] > 0
+
+
+def test_la_cardinalidad_no_crece_con_los_ids_ni_las_rutas_desconocidas(metricas):
+    client, registry = metricas
+    for item_id in range(50):
+        client.get(f"/items/{item_id}")
+    for intento in range(50):
+        assert client.get(f"/no-existe/{intento}").status_code == 404
+    samples = _parse(registry.render())
+
+    assert set(_series(samples, "http_requests_total")) == {
+        (("method", "GET"), ("route", "/items/{item_id}"), ("status", "200")),
+        (("method", "GET"), ("route", UNMATCHED_ROUTE), ("status", "404")),
+    }
+    rutas = {dict(labels)["route"] for (name, labels) in samples if "route" in dict(labels)}
+    assert rutas == {"/items/{item_id}", UNMATCHED_ROUTE}
+
+
+def test_metrics_de_la_aplicacion(client):
+    client.get("/cursos/")
+    respuesta = client.get("/metrics")
+    assert respuesta.headers["content-type"].startswith("text/plain; version=0.0.4")
+    samples = _parse(respuesta.text)
+    assert samples[("http_requests_total", (("method", "GET"), ("route", "/cursos/"), ("status", "200")))] >= 1
+    assert ("db_pool_connections_in_use", (("engine", "primario"),)) in samples
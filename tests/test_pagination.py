@@ -0,0 +1,28 @@
+from models import User
+from pagination import DEFAULT_PAGE_SIZE, NEXT_CURSOR_HEADER
+from tests.conftest import copy_to_replica
+
+
+def _usuarios(db, total):
+    db.add_all([User(name=f"Usuario {i}", email=f"u{i}@example.com", password="x") for i in range(total)])
+    db.commit()
+    copy_to_replica(User.__table__)
+
+
+def test_sin_parametros_devuelve_la_primera_pagina(client, db):
+    _usuarios(db, DEFAULT_PAGE_SIZE + 20)
+    response = client.get("/usuarios/")
+    assert len(response.json()) == DEFAULT_PAGE_SIZE
+    rest = client.get("/usuarios/", params={"cursor": response.headers[NEXT_CURSOR_HEADER]})
+    assert [u["email"] for u in rest.json()] == [f"u{i}@example.com" for i in range(DEFAULT_PAGE_SIZE, DEFAULT_PAGE_SIZE + 20)]
+    assert NEXT_CURSOR_HEADER not in rest.headers
+
+
+def test_limit_pagina_por_cursor(client, db):
+    _usuarios(db, 5)
+    first = client.get("/usuarios/", params={"limit": 3})
+    assert len(first.json()) == 3
+    cursor = first.headers[NEXT_CURSOR_HEADER]
+    second = client.get("/usuarios/", params={"cursor": cursor})
+    assert [u["email"] for u in second.json()] == ["u3@example.com", "u4@example.com"]
+    assert NEXT_CURSOR_HEADER not in second.headers
@@ -0,0 +1,76 @@
+import logging
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from profiler import QUERIES_HEADER, REPEATED_HEADER, TIME_HEADER, ProfilerMiddleware, instrument_engine, statement_shape
+
+UMBRAL = 3
+
+
+def _engine(slow_seconds):
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    instrument_engine(engine, slow_seconds)
+    return engine
+
+
+@pytest.fixture
+def perfilado():
+    rapido, lento = _engine(slow_seconds=60), _engine(slow_seconds=0)
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    def item(item_id: int, repeticiones: int = 0):
+        with rapido.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            # Una consulta por elemento (N+1) con la misma forma y distintos parámetros
+            for elemento in range(repeticiones):
+                conn.execute(text("SELECT :id + 0 AS x"), {"id": elemento})
+        return {"id": item_id}
+
+    @app.get("/lento")
+    def consulta_lenta():
+        with lento.connect() as conn:
+            conn.execute(text("SELECT :nombre"), {"nombre": "ñandú"})
+        return {}
+
+    app.add_middleware(ProfilerMiddleware, n_plus_one_threshold=UMBRAL)
+    with TestClient(app) as client:
+        yield client
+    rapido.dispose()
+    lento.dispose()
+
+
+def test_cabeceras_con_las_consultas_de_la_peticion(perfilado):
+    respuesta = perfilado.get("/items/1", params={"repeticiones": 2})
+    assert respuesta.headers[QUERIES_HEADER] == "3"
+    assert float(respuesta.headers[TIME_HEADER]) >= 0
+    # Por debajo del umbral no hay aviso de N+1
+    assert REPEATED_HEADER not in respuesta.headers
+    # Cada petición cuenta solo sus consultas
+    assert perfilado.get("/items/2").headers[QUERIES_HEADER] == "1"
+
+
+def test_n_mas_1_desde_el_umbral(perfilado, caplog):
+    with caplog.at_level(logging.WARNING, logger="profiler"):
+        respuesta = perfilado.get("/items/1", params={"repeticiones": UMBRAL})
+    assert respuesta.headers[QUERIES_HEADER] == str(UMBRAL + 1)
+    assert respuesta.headers[REPEATED_HEADER] == str(UMBRAL)
+    avisos = [r.getMessage() for r in caplog.records if "N+1" in r.getMessage()]
+    assert avisos == [f"Posible N+1 en GET /items/{{item_id}}: {UMBRAL} ejecuciones de SELECT ? + 0 AS x"]
+
+
+def test_consultas_lentas_en_el_log_con_la_ruta(perfilado, caplog):
+    with caplog.at_level(logging.WARNING, logger="profiler"):
+        perfilado.get("/lento")
+    (aviso,) = [r.getMessage() for r in caplog.records if "Consulta lenta" in r.getMessage()]
+    assert "en GET /lento: SELECT ?" in aviso and "ñandú" in aviso
+
+
+def test_forma_de_las_sentencias():
+    assert statement_shape("SELECT a\n  FROM t WHERE id IN (?, ?, ?)") == "SELECT a FROM t WHERE id IN (?)"
+    assert statement_shape("SELECT a FROM t WHERE id IN (%(id_1)s, %(id_2)s)") == "SELECT a FROM t WHERE id IN (?)"
+    assert statement_shape("INSERT INTO t (a) VALUES (?), (?), (?)") == "INSERT INTO t (a) VALUES (?)"
@@ -0,0 +1,83 @@
+import pytest
+
+from database import SessionLocal
+from models import Course, Module, User, UserProgress, UserProgressSummary, UserCourseProgress
+from progress_aggregates import apply_progress_delta
+import routers.progress
+
+
+@pytest.fixture
+def catalogo(db):
+    db.add(Course(id="py", title="Python", description="d", icon="i", color_class="c"))
+    db.add_all([Module(id=f"m{i}", course_id="py", title=f"M{i}", description="d", position=i) for i in (1, 2)])
+    db.add(User(id=1, name="Ana", email="ana@example.com", password="x"))
+    db.commit()
+
+
+def _contadores(db):
+    db.expire_all()
+    resumen = db.get(UserProgressSummary, 1)
+    por_curso = db.get(UserCourseProgress, (1, "py"))
+    return (resumen.modules_started, resumen.modules_completed), (por_curso.modules_started, por_curso.modules_completed)
+
+
+def _progreso(db, module_id):
+    db.expire_all()
+    return db.query(UserProgress).filter_by(user_id=1, module_id=module_id).one()
+
+
+def test_crea_actualiza_y_mantiene_los_contadores(client, db, catalogo):
+    respuesta = client.post("/progreso/lote", json=[
+        {"user_id": 1, "module_id": "m1", "completed": True},
+        {"user_id": 1, "module_id": "m2"},
+        {"user_id": 1, "module_id": "m2"},
+        {"user_id": 2, "module_id": "m1"},
+    ]).json()
+    assert (respuesta["creados"], respuesta["actualizados"], respuesta["errores"]) == (2, 0, 2)
+    assert _contadores(db) == ((2, 1), (2, 1))
+    assert _progreso(db, "m2").completed is False
+
+    respuesta = client.post("/progreso/lote", json=[{"user_id": 1, "module_id": "m2", "completed": True}]).json()
+    assert (respuesta["creados"], respuesta["actualizados"]) == (0, 1)
+    assert _contadores(db) == ((2, 2), (2, 2))
+
+
+def test_sin_completed_se_conserva_el_estado(client, db, catalogo):
+    client.post("/progreso/lote", json=[{"user_id": 1, "module_id": "m1", "completed": True}])
+    fecha = _progreso(db, "m1").completion_date
+    client.post("/progreso/lote", json=[{"user_id": 1, "module_id": "m1"}])
+    progreso = _progreso(db, "m1")
+    assert progreso.completed is True and progreso.completion_date == fecha
+    assert _contadores(db) == ((1, 1), (1, 1))
+
+
+def test_volver_a_incompleto_borra_la_fecha(client, db, catalogo):
+    client.post("/progreso/lote", json=[{"user_id": 1, "module_id": "m1", "completed": True}])
+    client.post("/progreso/lote", json=[{"user_id": 1, "module_id": "m1", "completed": False}])
+    progreso = _progreso(db, "m1")
+    assert progreso.completed is False and progreso.completion_date is None
+    assert _contadores(db) == ((1, 0), (1, 0))
+
+
+def test_insercion_concurrente_se_cuenta_una_sola_vez(client, db, catalogo, monkeypatch):
+    insert_ignore = routers.progress.insert_ignore
+    llamadas = []
+
+    def adelantarse(session, table, rows):
+        # Otro lote crea el mismo registro después del FOR UPDATE y antes de la inserción
+        if not llamadas:
+            with SessionLocal() as otra:
+                otra.add(UserProgress(user_id=1, module_id="m1", completed=False))
+                apply_progress_delta(otra, 1, "py", 1, 0)
+                otra.commit()
+        llamadas.append(len(rows))
+        return insert_ignore(session, table, rows)
+
+    monkeypatch.setattr(routers.progress, "insert_ignore", adelantarse)
+    respuesta = client.post("/progreso/lote", json=[
+        {"user_id": 1, "module_id": "m1", "completed": True},
+        {"user_id": 1, "module_id": "m2", "completed": True},
+    ]).json()
+    assert llamadas == [2, 1]
+    assert [r["estado"] for r in respuesta["resultados"]] == ["actualizado", "creado"]
+    assert _contadores(db) == ((2, 2), (2, 2))
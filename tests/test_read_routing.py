@@ -0,0 +1,45 @@
+from database import READ_PRIMARY_COOKIE, READ_PRIMARY_HEADER
+from models import User
+from tests.conftest import copy_to_replica
+
+
+def _register(client, email="ana@example.com"):
+    response = client.post("/auth/register", json={"name": "Ana", "email": email, "password": "secreto123"})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_lecturas_van_a_la_replica(client):
+    user = _register(client)
+    client.cookies.clear()
+    # La réplica aún no tiene la fila
+    assert client.get(f"/usuarios/{user['id']}").status_code == 404
+    copy_to_replica(User.__table__)
+    assert client.get(f"/usuarios/{user['id']}").json()["email"] == "ana@example.com"
+
+
+def test_escritura_fija_la_cookie_de_lectura_en_el_primario(client):
+    user = _register(client)
+    assert READ_PRIMARY_COOKIE in client.cookies
+    # Con la cookie de la escritura reciente se lee del primario aunque la réplica vaya atrasada
+    assert client.get(f"/usuarios/{user['id']}").status_code == 200
+
+
+def test_cookie_caducada_vuelve_a_la_replica(client):
+    user = _register(client)
+    client.cookies.set(READ_PRIMARY_COOKIE, "0")
+    assert client.get(f"/usuarios/{user['id']}").status_code == 404
+
+
+def test_cabecera_explicita_lee_del_primario(client):
+    user = _register(client)
+    client.cookies.clear()
+    assert client.get(f"/usuarios/{user['id']}", headers={READ_PRIMARY_HEADER: "true"}).status_code == 200
+
+
+def test_escritura_fallida_no_fija_la_cookie(client):
+    _register(client)
+    client.cookies.clear()
+    response = client.post("/auth/register", json={"name": "Ana", "email": "ana@example.com", "password": "x"})
+    assert response.status_code == 400
+    assert READ_PRIMARY_COOKIE not in client.cookies
@@ -0,0 +1,78 @@
+from sqlalchemy import func
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+# Errores de MySQL que se resuelven repitiendo la transacción: espera de bloqueo agotada y deadlock
+_TRANSIENT_MYSQL_ERRORS = {1205, 1213}
+
+
+def is_transient_error(exc: Exception) -> bool:
+    """True si la transacción falló por un conflicto de bloqueos y puede repetirse entera"""
+    if not isinstance(exc, OperationalError):
+        return False
+    args = getattr(exc.orig, "args", ())
+    return (bool(args) and args[0] in _TRANSIENT_MYSQL_ERRORS) or "database is locked" in str(exc.orig)
+
+
+def dialect_insert(db: Session):
+    """insert() del dialecto de la sesión, que admite ON DUPLICATE KEY / ON CONFLICT"""
+    name = db.get_bind().dialect.name
+    if name == "mysql":
+        from sqlalchemy.dialects.mysql import insert
+    elif name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    elif name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        raise NotImplementedError(f"Upsert no soportado para el dialecto {name}")
+    return insert
+
+
+def _on_conflict(db: Session, stmt, key_columns, set_):
+    """Añadir la cláusula de conflicto; set_ recibe la pseudo-tabla con los valores propuestos"""
+    if db.get_bind().dialect.name == "mysql":
+        return stmt.on_duplicate_key_update(set_(stmt.inserted))
+    return stmt.on_conflict_do_update(index_elements=list(key_columns), set_=set_(stmt.excluded))
+
+
+def insert_ignore(db: Session, table, rows: list) -> int:
+    """Insertar rows omitiendo las que ya existen (misma clave primaria o única); devuelve las insertadas"""
+    stmt = dialect_insert(db)(table).values(rows)
+    if db.get_bind().dialect.name == "mysql":
+        stmt = stmt.prefix_with("IGNORE")
+    else:
+        stmt = stmt.on_conflict_do_nothing()
+    return db.execute(stmt).rowcount
+
+
+def upsert(db: Session, table, rows: list, key_columns, set_):
+    """Insertar rows en una sola sentencia; en las que chocan con key_columns se aplica set_(propuestos).
+
+    set_ recibe la pseudo-tabla con los valores propuestos (inserted/excluded según el
+    dialecto) y devuelve {columna: expresión}.
+    """
+    stmt = dialect_insert(db)(table).values(rows)
+    db.execute(_on_conflict(db, stmt, key_columns, set_))
+
+
+def upsert_rows(db: Session, table, rows: list, key_columns, update_columns):
+    """Insertar rows en una sola sentencia; las que chocan con key_columns actualizan update_columns"""
+    def set_(proposed):
+        values = {name: proposed[name] for name in update_columns}
+        if "updated_at" in table.c:
+            values["updated_at"] = func.now()
+        return values
+
+    upsert(db, table, rows, key_columns, set_)
+
+
+def increment_counters(db: Session, table, rows: list, key_columns):
+    """Sumar los contadores de cada fila a la existente con la misma clave, creándola si no existe.
+
+    Es una única sentencia, así que dos transacciones concurrentes no pierden incrementos.
+    """
+    counters = [name for name in rows[0] if name not in key_columns]
+    upsert(db, table, rows, key_columns, lambda proposed: {
+        **{name: table.c[name] + proposed[name] for name in counters},
+        **({"updated_at": func.now()} if "updated_at" in table.c else {}),
+    })